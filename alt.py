@@ -0,0 +1,127 @@
+## Heuristica ALT (A*, Landmarks e desigualdade Triangular)
+## Escolhe k nós de referência (landmarks) e guarda a distância de cada
+## landmark até todos os nós e de todos os nós até cada landmark.
+## Pela desigualdade triangular, para qualquer landmark L:
+##   d(v, t) >= d(L, t) - d(L, v)   e   d(v, t) >= d(v, L) - d(t, L)
+## o maior desses limites é uma heurística admissível e consistente
+## para o a_star, calculada só com leituras de array.
+##
+##   landmarks = Landmarks(mapa, k=4)
+##   trajeto, custo = a_star(mapa, source, dest, landmarks)
+
+from __future__ import annotations
+from array import array
+from typing import override
+
+from grafo_compilado import GrafoCompilado
+from main import MarcaCustos, Node, Vertice, dijkstra
+
+# Distância guardada para nós que não alcançam / não são alcançados pelo landmark
+INALCANCAVEL = -1
+
+
+class Landmarks():
+    """
+    Tabelas de distâncias dos landmarks, em arrays planos de k * n posições
+
+    - landmarks: ids dos nós escolhidos
+    - partindo[l * n + v]: custo do landmark l até v
+    - chegando[l * n + v]: custo de v até o landmark l
+
+    A instância é a própria heurística: pode ser passada como h_func do a_star.
+    As distâncias são as do momento da criação: se algum custo da lista de
+    nós diminuir (alterar_custos) a heurística deixaria de ser admissível,
+    então as tabelas são recalculadas na próxima chamada; aumentos não
+    atrapalham. Um GrafoCompilado não muda de custo.
+    """
+
+    # Para o CacheHeuristicas descartar os vetores quando um custo diminui
+    depende_dos_custos = True
+
+    def __init__(self, _mapa: list[Node] | GrafoCompilado, k: int = 4, inicial: int = 0):
+        if isinstance(_mapa, GrafoCompilado):
+            nos: list[Vertice] = list(range(len(_mapa)))
+        else:
+            nos = list(_mapa)
+        self.n: int = len(nos)
+        if self.n == 0:
+            raise ValueError('Mapa vazio')
+        self._mapa = _mapa
+        self._nos: list[Vertice] = nos
+        # Node -> id (no GrafoCompilado o próprio nó já é o id)
+        self._ids: dict[Vertice, int] | None = None if isinstance(_mapa, GrafoCompilado) else {no: i for i, no in enumerate(nos)}
+
+        self._marca: MarcaCustos | None = None if isinstance(_mapa, GrafoCompilado) else MarcaCustos(_mapa)
+        self._k: int = min(k, self.n)
+        self._inicial: int = inicial
+
+        self.landmarks: list[int] = []
+        self.partindo: array[int] = array('q')
+        self.chegando: array[int] = array('q')
+        self._escolher(self._k, inicial)
+
+    def recalcular(self) -> None:
+        """Refaz a escolha e as tabelas com os custos atuais"""
+        self.landmarks = []
+        self.partindo = array('q')
+        self.chegando = array('q')
+        self._escolher(self._k, self._inicial)
+        if self._marca is not None:
+            self._marca.limpar()
+
+    def _id(self, no: Vertice) -> int:
+        return no if self._ids is None else self._ids[no]  # type: ignore[return-value]
+
+    def _distancias(self, landmark: int, reverso: bool) -> array[int]:
+        custos, _, _ = dijkstra(self._mapa, self._nos[landmark], reverso)
+        linha = array('q', [INALCANCAVEL]) * self.n
+        for no, custo in custos.items():
+            linha[self._id(no)] = custo
+        return linha
+
+    def _escolher(self, k: int, inicial: int) -> None:
+        """
+        Seleção pelo ponto mais distante: cada novo landmark é o nó cuja
+        menor distância aos landmarks já escolhidos é a maior
+        (o primeiro é o mais distante do nó inicial)
+        """
+        # Menor distância de cada nó aos landmarks escolhidos até agora
+        # (nós não alcançados ficam com INALCANCAVEL e só são escolhidos por último)
+        menor = self._distancias(inicial, reverso=False)
+        escolhidos: set[int] = set()
+        while len(self.landmarks) < k:
+            landmark = max((v for v in range(self.n) if v not in escolhidos), key=lambda v: menor[v])
+            partindo = self._distancias(landmark, reverso=False)
+            self.landmarks.append(landmark)
+            escolhidos.add(landmark)
+            self.partindo.extend(partindo)
+            self.chegando.extend(self._distancias(landmark, reverso=True))
+            for v, d in enumerate(partindo):
+                if d != INALCANCAVEL and (menor[v] == INALCANCAVEL or d < menor[v]):
+                    menor[v] = d
+
+    def estimativa(self, no: int, destino: int) -> int:
+        """Limite inferior do custo de no até destino (ids)"""
+        melhor = 0
+        n = self.n
+        partindo, chegando = self.partindo, self.chegando
+        for l in range(len(self.landmarks)):
+            base = l * n
+            d_lt, d_lv = partindo[base + destino], partindo[base + no]
+            if d_lt != INALCANCAVEL and d_lv != INALCANCAVEL and d_lt - d_lv > melhor:
+                melhor = d_lt - d_lv
+            d_vl, d_tl = chegando[base + no], chegando[base + destino]
+            if d_vl != INALCANCAVEL and d_tl != INALCANCAVEL and d_vl - d_tl > melhor:
+                melhor = d_vl - d_tl
+        return melhor
+
+    def __call__(self, trajeto: list[Vertice], destino: Vertice) -> int:
+        if self._marca is not None and self._marca.reducao:
+            self.recalcular()
+        if not trajeto:
+            return 0
+        return self.estimativa(self._id(trajeto[-1]), self._id(destino))
+
+    @override
+    def __repr__(self) -> str:
+        return f'Landmarks(k={len(self.landmarks)}, n={self.n})'
@@ -0,0 +1,146 @@
+## Rotas alternativas (k menores caminhos sem ciclos, algoritmo de Yen)
+## Cada nova rota desvia de uma já encontrada num nó de desvio: mantém o
+## começo dela (a raiz) e procura o menor caminho do nó de desvio ao destino
+## sem repetir a raiz nem as arestas que as rotas anteriores com a mesma raiz
+## já usaram. O melhor candidato ainda não usado é a próxima rota.
+##
+## Para não refazer trabalho entre as iterações:
+##   - a árvore de caminhos mínimos até o destino (um Dijkstra reverso) é
+##     calculada uma vez só; quando o caminho da árvore a partir do nó de desvio
+##     não passa por nada proibido ele já é o desvio, sem busca nenhuma
+##   - quando precisa de busca, a distância da árvore é a heurística do A*
+##     (exata no grafo inteiro, e remover nós e arestas só aumenta as distâncias)
+##   - cada rota só desvia a partir do ponto em que ela mesma desviou
+##     (os desvios anteriores já foram gerados pela rota de onde ela saiu)
+##
+##   for trajeto, custo in rotas_alternativas(mapa, source, dest):
+##       ...   # rotas em ordem crescente de custo, calculadas sob demanda
+##
+## uso: python alternativas.py origem destino [-k 5]
+
+from __future__ import annotations
+import argparse
+import heapq
+from itertools import count, islice
+from typing import Callable, Iterable, Iterator
+
+from grafo_compilado import GrafoCompilado
+from main import Node, Vertice, dijkstra, get_conexoes, get_graph, resolver_cidade
+
+
+def _custos_acumulados(conexoes: Callable[[Vertice], Iterable[tuple[Vertice, int]]], trajeto: list[Vertice]) -> list[int]:
+    """Custo de source até cada nó do trajeto (a aresta mais barata, se houver paralelas)"""
+    acumulados = [0]
+    for u, v in zip(trajeto, trajeto[1:]):
+        acumulados.append(acumulados[-1] + min(custo for conn, custo in conexoes(u) if conn == v))
+    return acumulados
+
+
+def _desvio(conexoes: Callable[[Vertice], Iterable[tuple[Vertice, int]]], inicio: Vertice, dest: Vertice,
+            ate_dest: dict[Vertice, int], proximo: dict[Vertice, Vertice | None],
+            nos_proibidos: set[Vertice], arestas_proibidas: set[Vertice]) -> list[Vertice] | None:
+    """
+    Menor caminho de inicio a dest sem passar por nos_proibidos nem usar
+    as arestas inicio -> arestas_proibidas (None se não houver)
+    """
+    if inicio not in ate_dest:
+        return None
+
+    # Caminho da árvore: vale se a primeira aresta e os nós estão liberados
+    # (as arestas proibidas saem todas de inicio)
+    trajeto = [inicio]
+    atual = proximo[inicio]
+    if atual not in arestas_proibidas:
+        while atual is not None and atual not in nos_proibidos:
+            trajeto.append(atual)
+            atual = proximo[atual]
+        if trajeto[-1] == dest:
+            return trajeto
+
+    # A* com a distância da árvore como heurística
+    melhor_g: dict[Vertice, int] = {inicio: 0}
+    pais: dict[Vertice, Vertice | None] = {inicio: None}
+    desempate = count()
+    fronteira: list[tuple[int, int, int, Vertice]] = [(ate_dest[inicio], next(desempate), 0, inicio)]
+    while fronteira:
+        _, _, g, atual = heapq.heappop(fronteira)
+        if g > melhor_g[atual]:
+            continue
+        if atual == dest:
+            trajeto = []
+            no: Vertice | None = atual
+            while no is not None:
+                trajeto.append(no)
+                no = pais[no]
+            trajeto.reverse()
+            return trajeto
+        for conn, custo in conexoes(atual):
+            if conn in nos_proibidos or conn not in ate_dest or (atual == inicio and conn in arestas_proibidas):
+                continue
+            novo_g = g + custo
+            if novo_g >= melhor_g.get(conn, novo_g + 1):
+                continue
+            melhor_g[conn] = novo_g
+            pais[conn] = atual
+            heapq.heappush(fronteira, (novo_g + ate_dest[conn], next(desempate), novo_g, conn))
+    return None
+
+
+def rotas_alternativas(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice) -> Iterator[tuple[list[Vertice], int]]:
+    """
+    Gera as rotas sem ciclos de source a dest em ordem crescente de custo
+    (trajeto, custo), calculando cada uma só quando é pedida.
+    Para as k primeiras: itertools.islice(rotas_alternativas(...), k)
+    """
+    conexoes = get_conexoes(_mapa)
+    # Árvore de caminhos mínimos até dest: custo de cada nó até dest e o próximo nó
+    ate_dest, proximo, _ = dijkstra(_mapa, dest, reverso=True)
+    primeira = _desvio(conexoes, source, dest, ate_dest, proximo, set(), set())
+    if primeira is None:
+        return
+
+    # Rotas já entregues: (trajeto, custos acumulados, índice do nó de desvio)
+    encontradas: list[tuple[list[Vertice], list[int], int]] = []
+    candidatos: list[tuple[int, int, list[Vertice], list[int], int]] = []
+    vistos: set[tuple[Vertice, ...]] = {tuple(primeira)}
+    desempate = count()
+    acumulados = _custos_acumulados(conexoes, primeira)
+    heapq.heappush(candidatos, (acumulados[-1], next(desempate), primeira, acumulados, 0))
+
+    while candidatos:
+        custo, _, trajeto, acumulados, indice_desvio = heapq.heappop(candidatos)
+        encontradas.append((trajeto, acumulados, indice_desvio))
+        yield list(trajeto), custo
+
+        for i in range(indice_desvio, len(trajeto) - 1):
+            raiz = trajeto[:i + 1]
+            no_desvio = trajeto[i]
+            # Próximos nós já usados depois desta mesma raiz
+            arestas_proibidas = {t[i + 1] for t, _, _ in encontradas if len(t) > i + 1 and t[:i + 1] == raiz}
+            desvio = _desvio(conexoes, no_desvio, dest, ate_dest, proximo, set(raiz[:-1]), arestas_proibidas)
+            if desvio is None:
+                continue
+            novo = raiz[:-1] + desvio
+            chave = tuple(novo)
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            novos_acumulados = acumulados[:i + 1] + [acumulados[i] + c for c in _custos_acumulados(conexoes, desvio)[1:]]
+            heapq.heappush(candidatos, (novos_acumulados[-1], next(desempate), novo, novos_acumulados, i))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Rotas alternativas entre duas capitais')
+    parser.add_argument('origem', help='capital ou UF')
+    parser.add_argument('destino', help='capital ou UF')
+    parser.add_argument('-k', type=int, default=5, help='número de rotas')
+    args = parser.parse_args()
+
+    mapa = get_graph()
+    source, dest = mapa[resolver_cidade(args.origem)], mapa[resolver_cidade(args.destino)]
+    for i, (trajeto, custo) in enumerate(islice(rotas_alternativas(mapa, source, dest), args.k), start=1):
+        print(f"{i:2}. {custo:6}  {'->'.join(no.name for no in trajeto)}")  # type: ignore[union-attr]
+
+
+if __name__ == '__main__':
+    main()
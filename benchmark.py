@@ -0,0 +1,286 @@
+## Benchmark das buscas
+## Roda todos os algoritmos em todos os pares de capitais e em grafos gerados
+## (cada forma do gerador) de tamanho crescente, medindo latência (percentis),
+## nós expandidos, pico da fronteira e pico de memória por consulta, além do
+## tempo de import do main. O resultado pode ser salvo como base (JSON) e comparado nas próximas
+## execuções para achar regressões.
+## Também compara quantos nós o a_star expande com cada heurística.
+##
+## uso: python benchmark.py [--salvar-base arquivo.json] [--comparar arquivo.json]
+##                          [--tamanhos 1000,4000,16000] [--pares 50] [--tolerancia 0.2]
+
+from __future__ import annotations
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from alt import Landmarks
+from gerador import GERADORES
+from grafo_compilado import GrafoCompilado
+from hierarquias import HierarquiaContracao
+from main import (CacheHeuristicas, EstatisticasBusca, Vertice, a_star, a_star_bidirecional, create_mapa, dijkstra,
+                  h_func_beleza, h_func_distancia_aerea, ida_star, largura, largura_bidirecional,
+                  profundidade, profundidade_iterativa)
+from tabela_rotas import TabelaRotas
+
+# (origem, destino, estatisticas) -> (trajeto, custo)
+Consulta = Callable[[int, int, EstatisticasBusca | None], tuple[list[Vertice], int]]
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil p dos valores (nan se não houver nenhum)"""
+    if not valores:
+        return math.nan
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def motores(grafo: GrafoCompilado, capitais: bool) -> tuple[dict[str, Consulta], dict[str, float]]:
+    """
+    Algoritmos a medir num grafo, e o tempo de pré-processamento (s)
+    dos que precisam de um
+    """
+    def zero(trajeto: list[Vertice], destino: Vertice) -> int:
+        return 0
+
+    consultas: dict[str, Consulta] = {
+        'largura': lambda s, d, e: largura(grafo, s, d, estatisticas=e),
+        'profundidade': lambda s, d, e: profundidade(grafo, s, d, estatisticas=e),
+        'dijkstra': lambda s, d, e: a_star(grafo, s, d, zero, estatisticas=e),
+        'largura_bidirecional': lambda s, d, e: largura_bidirecional(grafo, s, d, estatisticas=e),
+        'a_star_bidirecional': lambda s, d, e: a_star_bidirecional(grafo, s, d, estatisticas=e),
+    }
+    if capitais:
+        # As heurísticas de beleza e distância aérea só existem para as capitais
+        consultas['a_star'] = lambda s, d, e: a_star(grafo, s, d, h_func_beleza, estatisticas=e)
+        consultas['a_star_aerea'] = lambda s, d, e: a_star(grafo, s, d, h_func_distancia_aerea, estatisticas=e)
+        heuristicas = CacheHeuristicas(len(grafo))
+        consultas['a_star_aerea_vetor'] = lambda s, d, e: a_star(grafo, s, d, h_func_distancia_aerea, estatisticas=e,
+                                                                 heuristicas=heuristicas)
+        # Os de aprofundamento iterativo reexpandem demais para os grafos gerados
+        consultas['profundidade_iterativa'] = lambda s, d, e: profundidade_iterativa(grafo, s, d, estatisticas=e)
+
+    preparo: dict[str, float] = {}
+    inicio = time.perf_counter()
+    landmarks = Landmarks(grafo, k=8)
+    preparo['alt'] = time.perf_counter() - inicio
+    consultas['alt'] = lambda s, d, e: a_star(grafo, s, d, landmarks, estatisticas=e)
+    if capitais:
+        consultas['ida_star_alt'] = lambda s, d, e: ida_star(grafo, s, d, landmarks, estatisticas=e)
+
+    inicio = time.perf_counter()
+    hierarquia = HierarquiaContracao(grafo)
+    preparo['hierarquias'] = time.perf_counter() - inicio
+    consultas['hierarquias'] = hierarquia.rota
+
+    if capitais:
+        # Tabela n x n: só cabe em grafos pequenos
+        inicio = time.perf_counter()
+        tabela = TabelaRotas.calcular(grafo)
+        preparo['tabela'] = time.perf_counter() - inicio
+        consultas['tabela'] = tabela.rota  # type: ignore[assignment]
+
+    return consultas, preparo
+
+
+def medir(consulta: Consulta, pares: list[tuple[int, int]], pares_memoria: int = 20) -> dict[str, float]:
+    """
+    Latência (ms), nós expandidos, pico da fronteira e de memória (KB) de uma consulta
+    Os nós expandidos e a fronteira vêm das EstatisticasBusca, numa rodada à
+    parte para a contagem não entrar na latência.
+    """
+    latencias: list[float] = []
+    for s, d in pares:
+        inicio = time.perf_counter()
+        consulta(s, d, None)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+    expandidos: list[int] = []
+    picos: list[int] = []
+    for s, d in pares:
+        estatisticas = EstatisticasBusca()
+        consulta(s, d, estatisticas)
+        expandidos.append(estatisticas.expandidos)
+        picos.append(estatisticas.pico_fronteira)
+
+    # Memória medida à parte (tracemalloc deixa tudo mais lento)
+    memoria = 0
+    tracemalloc.start()
+    for s, d in pares[:pares_memoria]:
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        consulta(s, d, None)
+        memoria = max(memoria, tracemalloc.get_traced_memory()[1] - antes)
+    tracemalloc.stop()
+
+    return {
+        'p50_ms': percentil(latencias, 50),
+        'p90_ms': percentil(latencias, 90),
+        'p99_ms': percentil(latencias, 99),
+        'max_ms': max(latencias),
+        'expandidos_medio': sum(expandidos) / len(expandidos),
+        'pico_fronteira': max(picos),
+        'memoria_kb': memoria / 1024,
+    }
+
+
+def medir_importacao(repeticoes: int = 7) -> dict[str, float]:
+    """
+    Tempo (ms) de importar main num processo novo, lido do -X importtime.
+    O grafo só é montado no primeiro get_graph(), então esse tempo não
+    deve crescer com o número de nós.
+    """
+    tempos: list[float] = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                               capture_output=True, text=True, check=True, cwd=Path(__file__).parent).stderr
+        # import time: self [us] | cumulative [us] | módulo
+        for linha in saida.splitlines():
+            campos = linha.split('|')
+            if len(campos) == 3 and campos[2].strip() == 'main':
+                tempos.append(int(campos[1]) / 1000)
+    return {'p50_ms': percentil(tempos, 50), 'p90_ms': percentil(tempos, 90)}
+
+
+def rodar(tamanhos: list[int], numero_pares: int) -> dict[str, dict[str, dict[str, float]]]:
+    """Resultados por conjunto (capitais, forma_N de cada gerador) e por algoritmo"""
+    conjuntos: list[tuple[str, GrafoCompilado, list[tuple[int, int]], bool]] = []
+
+    grafo = GrafoCompilado.compilar(create_mapa())
+    n = len(grafo)
+    conjuntos.append(('capitais', grafo, [(i, j) for i in range(n) for j in range(n)], True))
+
+    rnd = random.Random(0)
+    for forma, gerar in GERADORES.items():
+        for tamanho in tamanhos:
+            grafo = gerar(tamanho, 0)
+            n = len(grafo)
+            pares = [(rnd.randrange(n), rnd.randrange(n)) for _ in range(numero_pares)]
+            conjuntos.append((f'{forma}_{n}', grafo, pares, False))
+
+    resultados: dict[str, dict[str, dict[str, float]]] = {}
+    importacao = medir_importacao()
+    resultados['importacao'] = {'main': importacao}
+    print(f"\nimport main: p50 {importacao['p50_ms']:.1f} ms, p90 {importacao['p90_ms']:.1f} ms")
+    for nome, grafo, pares, capitais in conjuntos:
+        consultas, preparo = motores(grafo, capitais)
+        print(f'\n{nome}: {len(grafo)} nós, {len(grafo.destinos)} arestas, {len(pares)} consultas')
+        print('{:<22} {:>9} {:>9} {:>9} {:>11} {:>9} {:>11} {:>10}'.format(
+            'algoritmo', 'p50 ms', 'p90 ms', 'p99 ms', 'expandidos', 'fronteira', 'memória KB', 'preparo s'))
+        resultados[nome] = {}
+        for algoritmo, consulta in consultas.items():
+            r = medir(consulta, pares)
+            if algoritmo in preparo:
+                r['preparo_s'] = preparo[algoritmo]
+            resultados[nome][algoritmo] = r
+            print('{:<22} {:>9.3f} {:>9.3f} {:>9.3f} {:>11.1f} {:>9} {:>11.1f} {:>10}'.format(
+                algoritmo, r['p50_ms'], r['p90_ms'], r['p99_ms'], r['expandidos_medio'],
+                r['pico_fronteira'], r['memoria_kb'],
+                f"{r['preparo_s']:.3f}" if 'preparo_s' in r else '-'))
+    return resultados
+
+
+def comparar(resultados: dict[str, dict[str, dict[str, float]]],
+             base: dict[str, dict[str, dict[str, float]]], tolerancia: float) -> int:
+    """
+    Compara com uma execução base. É regressão a latência p50 ou p90 crescer
+    mais que a tolerância (e mais de 0,01 ms) ou os nós expandidos aumentarem.
+    O tempo de import entra como um conjunto à parte, só com latência.
+
+    retorna o número de regressões
+    """
+    regressoes = 0
+    for conjunto, algoritmos in resultados.items():
+        for algoritmo, atual in algoritmos.items():
+            anterior = base.get(conjunto, {}).get(algoritmo)
+            if anterior is None:
+                continue
+            problemas = []
+            for chave in ('p50_ms', 'p90_ms'):
+                if atual[chave] > anterior[chave] * (1 + tolerancia) and atual[chave] - anterior[chave] > 0.01:
+                    problemas.append(f'{chave} {anterior[chave]:.3f} -> {atual[chave]:.3f}')
+            if 'expandidos_medio' in atual and 'expandidos_medio' in anterior \
+                    and atual['expandidos_medio'] > anterior['expandidos_medio']:
+                problemas.append(f"expandidos {anterior['expandidos_medio']:.1f} -> {atual['expandidos_medio']:.1f}")
+            if problemas:
+                regressoes += 1
+                print(f'REGRESSÃO {conjunto}/{algoritmo}: ' + ', '.join(problemas))
+    if not regressoes:
+        print('Nenhuma regressão em relação à base')
+    return regressoes
+
+
+def comparar_heuristicas() -> None:
+    """
+    Roda o a_star com cada heurística em todos os pares de capitais e mostra
+    o total de nós expandidos, quantas rotas saíram com o custo mínimo
+    e a redução de nós expandidos em relação ao Dijkstra (heurística zero)
+    """
+    grafo = GrafoCompilado.compilar(create_mapa())
+    n = len(grafo)
+    minimos = [dijkstra(grafo, i)[0] for i in range(n)]
+
+    def zero(trajeto: list[Vertice], destino: Vertice) -> int:
+        return 0
+
+    heuristicas: list[tuple[str, Callable[[list[Vertice], Vertice], int]]] = [
+        ('dijkstra (h = 0)', zero),
+        ('beleza', h_func_beleza),
+        ('distancia aerea', h_func_distancia_aerea),
+        ('ALT k=4', Landmarks(grafo, k=4)),
+        ('ALT k=8', Landmarks(grafo, k=8)),
+    ]
+
+    print('{:<18} {:>11} {:>10} {:>13}'.format('heurística', 'expandidos', 'redução', 'custo mínimo'))
+    expandidos_dijkstra = 0
+    for nome, h_func in heuristicas:
+        expandidos = 0
+        otimos = 0
+        for i in range(n):
+            for j in range(n):
+                estatisticas = EstatisticasBusca()
+                _, custo = a_star(grafo, i, j, h_func, estatisticas=estatisticas)
+                expandidos += estatisticas.expandidos
+                otimos += custo == minimos[i][j]
+        if not expandidos_dijkstra:
+            expandidos_dijkstra = expandidos
+        reducao = 1 - expandidos / expandidos_dijkstra
+        print('{:<18} {:>11} {:>9.1%} {:>9}/{}'.format(nome, expandidos, reducao, otimos, n * n))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark dos algoritmos de busca')
+    parser.add_argument('--tamanhos', default='1000,4000,16000',
+                        help='número de nós dos grafos gerados (de cada forma do gerador), separados por vírgula')
+    parser.add_argument('--pares', type=int, default=50, help='consultas por grafo gerado')
+    parser.add_argument('--salvar-base', metavar='ARQUIVO', help='salva os resultados como base em JSON')
+    parser.add_argument('--comparar', metavar='ARQUIVO', help='compara com uma base salva antes')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='aumento relativo de latência aceito antes de acusar regressão')
+    args = parser.parse_args()
+
+    comparar_heuristicas()
+    resultados = rodar([int(t) for t in args.tamanhos.split(',') if t], args.pares)
+
+    if args.salvar_base:
+        with open(args.salvar_base, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f'\nBase salva em {args.salvar_base}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        print()
+        if comparar(resultados, base, args.tolerancia):
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+## Cache de rotas
+## Guarda o resultado das buscas por (grafo, origem, destino, algoritmo, heurística),
+## com tamanho máximo e remoção do item usado há mais tempo (LRU).
+##
+##   cache = CacheRotas(tamanho_maximo=1024)
+##   trajeto, custo = cache.buscar(a_star, mapa, source, dest, h_func=h_func_distancia_aerea)
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Callable, Hashable, override
+
+import main
+from grafo_compilado import GrafoCompilado
+from main import Node, OuvinteCustos, Vertice, identidade_funcao
+
+Busca = Callable[..., tuple[list[Vertice], int]]
+
+
+def _alcancam(nos: list[Node]) -> set[Node]:
+    """Nós que alcançam algum dos nós (eles inclusive), pelas arestas ao contrário"""
+    alcancam = set(nos)
+    pilha = list(alcancam)
+    while pilha:
+        for anterior, _ in pilha.pop().reverse_connections:
+            if anterior not in alcancam:
+                alcancam.add(anterior)
+                pilha.append(anterior)
+    return alcancam
+
+
+class CacheRotas(OuvinteCustos):
+    """
+    Cache LRU na frente das funções de busca
+
+    - tamanho_maximo: número máximo de rotas guardadas
+    - acertos / falhas: contadores de consultas respondidas pelo cache ou não
+
+    Quando create_mapa() monta um grafo novo o cache é esvaziado, já que
+    os Nodes antigos não valem mais. Depois de alterar_custos() só saem
+    as rotas de Nodes que podem ter mudado (rotas de um GrafoCompilado não
+    mudam, ele é uma foto dos custos):
+    - custo aumentou: as rotas que passam pela aresta
+    - custo diminuiu: as rotas que saem de um nó que alcança a aresta e são
+        mais caras que o custo novo dela (uma rota que custa no máximo isso
+        não tem como ser batida por um caminho que use a aresta)
+    """
+
+    def __init__(self, tamanho_maximo: int = 1024):
+        if tamanho_maximo < 1:
+            raise ValueError('tamanho_maximo deve ser positivo')
+        self.tamanho_maximo: int = tamanho_maximo
+        self.acertos: int = 0
+        self.falhas: int = 0
+        self._rotas: OrderedDict[Hashable, tuple[list[Vertice], int]] = OrderedDict()
+        self._geracao: int = main.geracao_mapa
+        main.ouvintes_custos.add(self)
+
+    def __len__(self) -> int:
+        return len(self._rotas)
+
+    def invalidar(self) -> None:
+        """Esvazia o cache (os contadores continuam)"""
+        self._rotas.clear()
+        self._geracao = main.geracao_mapa
+
+    @override
+    def custos_alterados(self, alteracoes: list[tuple[Node, Node, int, int]]) -> None:
+        self.invalidar_custos(alteracoes)
+
+    def invalidar_custos(self, alteracoes: list[tuple[Node, Node, int, int]]) -> int:
+        """
+        Remove só as rotas afetadas pelas alterações de custo
+        (origem, destino, custo antigo, custo novo)
+
+        retorna quantas rotas foram removidas
+        """
+        aumentos = {(u, v) for u, v, antigo, novo in alteracoes if novo > antigo}
+        reducoes = [(u, novo) for u, _, antigo, novo in alteracoes if novo < antigo]
+        menor_reducao = min((novo for _, novo in reducoes), default=0)
+        # Só quem alcança a origem de uma aresta mais barata pode passar por ela
+        alcancam = _alcancam([u for u, _ in reducoes])
+        removidas = [
+            chave for chave, (trajeto, custo) in self._rotas.items()
+            if trajeto and chave[0] is None and (  # type: ignore[index]
+                (trajeto[0] in alcancam and custo > menor_reducao)
+                or (aumentos and any(aresta in aumentos for aresta in zip(trajeto, trajeto[1:]))))
+        ]
+        for chave in removidas:
+            del self._rotas[chave]
+        return len(removidas)
+
+    def chave(self, busca: Busca, _mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+              h_func: Callable[..., int] | None = None) -> Hashable:
+        # Ids inteiros só têm sentido junto com o grafo compilado de onde vieram
+        grafo = _mapa if isinstance(_mapa, GrafoCompilado) else None
+        heuristica = None if h_func is None else identidade_funcao(h_func)
+        return (grafo, source, dest, identidade_funcao(busca), heuristica)
+
+    def buscar(self, busca: Busca, _mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+               h_func: Callable[..., int] | None = None) -> tuple[list[Vertice], int]:
+        """
+        Mesmo resultado de busca(_mapa, source, dest[, h_func]),
+        mas consulta o cache antes de buscar
+        """
+        if self._geracao != main.geracao_mapa:
+            self.invalidar()
+
+        chave = self.chave(busca, _mapa, source, dest, h_func)
+        resultado = self._rotas.get(chave)
+        if resultado is not None:
+            self.acertos += 1
+            self._rotas.move_to_end(chave)
+        else:
+            self.falhas += 1
+            if h_func is None:
+                resultado = busca(_mapa, source, dest)
+            else:
+                resultado = busca(_mapa, source, dest, h_func)
+            self._rotas[chave] = resultado
+            if len(self._rotas) > self.tamanho_maximo:
+                # Remove o usado há mais tempo
+                self._rotas.popitem(last=False)
+
+        trajeto, custo = resultado
+        # Cópia, para quem chamou não alterar o trajeto guardado
+        return list(trajeto), custo
+
+    def estatisticas(self) -> dict[str, int | float]:
+        consultas = self.acertos + self.falhas
+        return {
+            'tamanho': len(self._rotas),
+            'tamanho_maximo': self.tamanho_maximo,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+        }
@@ -0,0 +1,77 @@
+## Cliente do serviço de rotas (só biblioteca padrão, não precisa do resto do projeto)
+##
+##   rota = consultar('AC', 'RS', algoritmo='a_star')
+##   print(rota['trajeto'], rota['custo'])
+##
+## uso: python cliente.py origem destino [-a algoritmo] [--url http://127.0.0.1:8080]
+##      python cliente.py --metricas | --saude
+
+from __future__ import annotations
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+URL_PADRAO = 'http://127.0.0.1:8080'
+
+
+def _get(url: str, timeout: float) -> dict[str, object]:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resposta:
+            return json.load(resposta)
+    except urllib.error.HTTPError as e:
+        # Erros de consulta (400, 404) também vêm em JSON
+        corpo = e.read()
+        try:
+            erro = json.loads(corpo)
+        except ValueError:
+            raise e from None
+        raise ValueError(erro.get('erro', corpo.decode())) from None
+
+
+def consultar(origem: str, destino: str, algoritmo: str | None = None, url: str = URL_PADRAO,
+              timeout: float = 10.0) -> dict[str, object]:
+    """Rota de origem a destino (nome da capital ou UF); ValueError se o serviço recusar a consulta"""
+    parametros = {'origem': origem, 'destino': destino}
+    if algoritmo is not None:
+        parametros['algoritmo'] = algoritmo
+    return _get(f'{url}/rota?{urlencode(parametros)}', timeout)
+
+
+def metricas(url: str = URL_PADRAO, timeout: float = 10.0) -> dict[str, object]:
+    return _get(f'{url}/metricas', timeout)
+
+
+def saude(url: str = URL_PADRAO, timeout: float = 10.0) -> dict[str, object]:
+    return _get(f'{url}/saude', timeout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Consulta o serviço de rotas')
+    parser.add_argument('origem', nargs='?')
+    parser.add_argument('destino', nargs='?')
+    parser.add_argument('-a', '--algoritmo')
+    parser.add_argument('--url', default=URL_PADRAO)
+    parser.add_argument('--metricas', action='store_true')
+    parser.add_argument('--saude', action='store_true')
+    args = parser.parse_args()
+
+    if args.metricas:
+        print(json.dumps(metricas(args.url), indent=2, ensure_ascii=False))
+    elif args.saude:
+        print(json.dumps(saude(args.url), indent=2, ensure_ascii=False))
+    elif args.origem and args.destino:
+        try:
+            rota = consultar(args.origem, args.destino, args.algoritmo, args.url)
+        except ValueError as e:
+            sys.exit(f'Erro: {e}')
+        print('Trajeto: {}'.format('->'.join(rota['trajeto'])))  # type: ignore[arg-type]
+        print(f"Custo: {rota['custo']}")
+    else:
+        parser.error('informe origem e destino, --metricas ou --saude')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+## Gerador de grafos sintéticos
+## Grafos de tamanho e forma configuráveis para testar as buscas em escala
+## (10³ a 10⁶ nós), já como GrafoCompilado e com coordenadas:
+##   - grade: grade lado x lado, vizinhos de cima, baixo, esquerda e direita
+##   - geometrico: pontos aleatórios ligados aos que estão a menos de um raio
+##   - rodoviario: malha planar parecida com estradas (ruas locais tortuosas e
+##     rodovias retas a cada tantas linhas/colunas), sempre conexa
+##
+## Todas as arestas custam pelo menos a distância em linha reta entre os nós
+## (custo = teto(distância x fator), fator >= 1), então DistanciaAerea, que
+## arredonda a distância em linha reta para baixo, é uma heurística admissível
+## e consistente para o a_star em qualquer grafo gerado aqui.
+##
+##   grafo = rodoviario(100_000, seed=1)
+##   trajeto, custo = a_star(grafo, 0, len(grafo) - 1, DistanciaAerea(grafo))
+##
+## uso: python gerador.py {grade,geometrico,rodoviario} n [-s seed] [-o arquivo.grf]
+
+from __future__ import annotations
+import argparse
+import math
+import random
+from array import array
+from typing import TYPE_CHECKING, override
+
+from grafo_compilado import GrafoCompilado
+from main import Node, Vertice
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Distância entre nós vizinhos da grade (as coordenadas ficam em "km")
+ESPACAMENTO = 100.0
+
+
+def _compilar(nomes: list[str], coordenadas: array[float], arestas: list[tuple[int, int, int]]) -> GrafoCompilado:
+    """
+    Monta o GrafoCompilado a partir de arestas (origem, destino, custo),
+    nos dois sentidos, ordenando por origem (counting sort)
+    """
+    n = len(nomes)
+    grau = array('q', [0]) * (n + 1)
+    for u, v, _ in arestas:
+        grau[u + 1] += 1
+        grau[v + 1] += 1
+    for i in range(n):
+        grau[i + 1] += grau[i]
+    offsets = array('q', grau)
+    proxima = array('q', grau[:n])
+    destinos = array('i', [0]) * (2 * len(arestas))
+    pesos = array('i', [0]) * (2 * len(arestas))
+    for u, v, custo in arestas:
+        destinos[proxima[u]], pesos[proxima[u]] = v, custo
+        proxima[u] += 1
+        destinos[proxima[v]], pesos[proxima[v]] = u, custo
+        proxima[v] += 1
+    return GrafoCompilado(nomes, offsets, destinos, pesos, coordenadas)
+
+
+def _custo(coordenadas: array[float], u: int, v: int, fator: float) -> int:
+    distancia = math.hypot(coordenadas[2 * u] - coordenadas[2 * v], coordenadas[2 * u + 1] - coordenadas[2 * v + 1])
+    return max(1, math.ceil(distancia * fator))
+
+
+def grade(lado: int, seed: int = 0, fator_maximo: float = 1.5) -> GrafoCompilado:
+    """
+    Grade lado x lado (ids linha a linha), com custo de cada aresta entre
+    1 e fator_maximo vezes a distância entre os nós
+    """
+    rnd = random.Random(seed)
+    n = lado * lado
+    coordenadas = array('d', [0.0]) * (2 * n)
+    for i in range(lado):
+        for j in range(lado):
+            coordenadas[2 * (i * lado + j)] = j * ESPACAMENTO
+            coordenadas[2 * (i * lado + j) + 1] = i * ESPACAMENTO
+
+    arestas: list[tuple[int, int, int]] = []
+    for i in range(lado):
+        for j in range(lado):
+            u = i * lado + j
+            if j + 1 < lado:
+                arestas.append((u, u + 1, _custo(coordenadas, u, u + 1, rnd.uniform(1, fator_maximo))))
+            if i + 1 < lado:
+                arestas.append((u, u + lado, _custo(coordenadas, u, u + lado, rnd.uniform(1, fator_maximo))))
+    nomes = [f'{i},{j}' for i in range(lado) for j in range(lado)]
+    return _compilar(nomes, coordenadas, arestas)
+
+
+def geometrico(n: int, seed: int = 0, raio: float | None = None, fator_maximo: float = 1.5) -> GrafoCompilado:
+    """
+    n pontos uniformes num quadrado de lado √n x ESPACAMENTO (densidade de um
+    ponto por célula da grade), cada um ligado aos que estão a menos de raio.
+    O raio padrão, √(ln n / π) células, fica perto do limiar de conectividade
+    (grau médio em torno de ln n): quase tudo numa componente só, mas pode
+    haver nós isolados, o que também testa destinos inalcançáveis.
+    """
+    rnd = random.Random(seed)
+    lado = math.sqrt(n) * ESPACAMENTO
+    if raio is None:
+        raio = math.sqrt(math.log(max(n, 2)) / math.pi) * ESPACAMENTO
+    coordenadas = array('d', (rnd.uniform(0, lado) for _ in range(2 * n)))
+
+    # Baldes de raio x raio: os vizinhos de um ponto só podem estar no
+    # balde dele ou nos 8 em volta
+    baldes: dict[tuple[int, int], list[int]] = {}
+    for u in range(n):
+        baldes.setdefault((int(coordenadas[2 * u] // raio), int(coordenadas[2 * u + 1] // raio)), []).append(u)
+
+    arestas: list[tuple[int, int, int]] = []
+    raio2 = raio * raio
+    for (bx, by), pontos in baldes.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            outros = baldes.get((bx + dx, by + dy))
+            if outros is None:
+                continue
+            for a, u in enumerate(pontos):
+                ux, uy = coordenadas[2 * u], coordenadas[2 * u + 1]
+                # No mesmo balde, cada par uma vez só
+                for v in (pontos[a + 1:] if dx == dy == 0 else outros):
+                    if (coordenadas[2 * v] - ux) ** 2 + (coordenadas[2 * v + 1] - uy) ** 2 <= raio2:
+                        arestas.append((u, v, _custo(coordenadas, u, v, rnd.uniform(1, fator_maximo))))
+    return _compilar([f'p{u}' for u in range(n)], coordenadas, arestas)
+
+
+def rodoviario(n: int, seed: int = 0, rodovia_a_cada: int = 8, remover: float = 0.3) -> GrafoCompilado:
+    """
+    Malha planar de cerca de n nós (o lado é arredondado): pontos de uma
+    grade deslocados ao acaso (menos de meia célula, então as arestas não se
+    cruzam), ligados aos vizinhos da grade.
+
+    - rodovia_a_cada: linhas e colunas múltiplas disso são rodovias, com custo
+        próximo da distância em linha reta; nas ruas locais o custo é de 1,2
+        a 2 vezes a distância
+    - remover: fração das ruas locais tiradas ao acaso, sem desconectar o grafo
+    """
+    rnd = random.Random(seed)
+    lado = max(2, round(math.sqrt(n)))
+    n = lado * lado
+    coordenadas = array('d', [0.0]) * (2 * n)
+    for i in range(lado):
+        for j in range(lado):
+            u = i * lado + j
+            coordenadas[2 * u] = (j + rnd.uniform(-0.3, 0.3)) * ESPACAMENTO
+            coordenadas[2 * u + 1] = (i + rnd.uniform(-0.3, 0.3)) * ESPACAMENTO
+
+    rodovias: list[tuple[int, int, int]] = []
+    locais: list[tuple[int, int, int]] = []
+    for i in range(lado):
+        for j in range(lado):
+            u = i * lado + j
+            if j + 1 < lado:
+                if i % rodovia_a_cada == 0:
+                    rodovias.append((u, u + 1, _custo(coordenadas, u, u + 1, rnd.uniform(1, 1.05))))
+                else:
+                    locais.append((u, u + 1, _custo(coordenadas, u, u + 1, rnd.uniform(1.2, 2))))
+            if i + 1 < lado:
+                if j % rodovia_a_cada == 0:
+                    rodovias.append((u, u + lado, _custo(coordenadas, u, u + lado, rnd.uniform(1, 1.05))))
+                else:
+                    locais.append((u, u + lado, _custo(coordenadas, u, u + lado, rnd.uniform(1.2, 2))))
+
+    # Árvore geradora aleatória (Kruskal, rodovias primeiro) garante que o
+    # grafo continua conexo; das ruas que sobram, uma fração é removida
+    pai = array('q', range(n))
+
+    def raiz(u: int) -> int:
+        while pai[u] != u:
+            pai[u] = pai[pai[u]]
+            u = pai[u]
+        return u
+
+    rnd.shuffle(locais)
+    arestas: list[tuple[int, int, int]] = []
+    for u, v, custo in rodovias + locais:
+        ru, rv = raiz(u), raiz(v)
+        if ru != rv:
+            pai[ru] = rv
+            arestas.append((u, v, custo))
+        elif rnd.random() >= remover:
+            arestas.append((u, v, custo))
+    nomes = [f'{i},{j}' for i in range(lado) for j in range(lado)]
+    return _compilar(nomes, coordenadas, arestas)
+
+
+def para_nodes(grafo: GrafoCompilado) -> list[Node]:
+    """Lista de Nodes equivalente ao grafo compilado (mesma ordem de ids e de arestas)"""
+    nos = [Node(nome) for nome in grafo.nomes]
+    for u, no in enumerate(nos):
+        for v, custo in grafo.vizinhos(u):
+            no.add_connection_node(nos[v], custo)
+    return nos
+
+
+class DistanciaAerea():
+    """
+    Heurística de distância em linha reta (arredondada para baixo) a partir
+    das coordenadas de um grafo gerado. Serve como h_func do a_star tanto no
+    GrafoCompilado (ids) quanto na lista de Nodes de para_nodes (pelo nome).
+    """
+
+    def __init__(self, grafo: GrafoCompilado):
+        if grafo.coordenadas is None:
+            raise ValueError('O grafo não tem coordenadas')
+        self.grafo: GrafoCompilado = grafo
+        self._coordenadas = grafo.coordenadas
+
+    def _id(self, no: Vertice) -> int:
+        return no if isinstance(no, int) else self.grafo.id(no.name)
+
+    def estimativa(self, no: int, destino: int) -> int:
+        c = self._coordenadas
+        return int(math.hypot(c[2 * no] - c[2 * destino], c[2 * no + 1] - c[2 * destino + 1]))
+
+    def __call__(self, trajeto: list[Vertice], destino: Vertice) -> int:
+        if not trajeto:
+            return 0
+        return self.estimativa(self._id(trajeto[-1]), self._id(destino))
+
+    def compilar(self, _mapa: list[Node] | GrafoCompilado, destino: Vertice) -> list[int] | None:
+        """
+        Estimativa de todos os nós até destino de uma vez (numpy), usada
+        por compilar_heuristica / CacheHeuristicas do main
+        """
+        if _mapa is not self.grafo:
+            return None
+        import numpy as np
+
+        n = len(self.grafo)
+        d = self._id(destino)
+        xy = np.frombuffer(self._coordenadas, dtype=np.float64).reshape(n, 2)
+        return np.hypot(xy[:, 0] - xy[d, 0], xy[:, 1] - xy[d, 1]).astype(np.int64).tolist()
+
+    def tabela(self, limite: int = 20_000) -> np.ndarray:
+        """
+        Matriz n x n de distâncias aéreas (como get_matriz_distancias_aereas
+        das capitais). São n² inteiros, por isso só para grafos até limite nós.
+        """
+        import numpy as np
+
+        n = len(self.grafo)
+        if n > limite:
+            raise ValueError(f'{n} nós: tabela de {n * n} distâncias é grande demais, use estimativa()')
+        xy = np.frombuffer(self._coordenadas, dtype=np.float64).reshape(n, 2)
+        return np.hypot(xy[:, None, 0] - xy[None, :, 0], xy[:, None, 1] - xy[None, :, 1]).astype(np.int64)
+
+    @override
+    def __repr__(self) -> str:
+        return f'DistanciaAerea({self.grafo!r})'
+
+
+GERADORES = {
+    'grade': lambda n, seed: grade(max(1, round(math.sqrt(n))), seed),
+    'geometrico': geometrico,
+    'rodoviario': rodoviario,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Gera um grafo sintético e salva no formato do GrafoCompilado')
+    parser.add_argument('forma', choices=list(GERADORES))
+    parser.add_argument('n', type=int, help='número (aproximado) de nós')
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('-o', '--saida', help='arquivo .grf (padrão forma_n.grf)')
+    args = parser.parse_args()
+
+    grafo = GERADORES[args.forma](args.n, args.seed)
+    caminho = args.saida or f'{args.forma}_{len(grafo)}.grf'
+    grafo.salvar(caminho)
+    print(f'{grafo} salvo em {caminho}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+## Grafo compilado
+## Versão imutável do grafo de Nodes, guardada em arrays no formato CSR
+## (compressed sparse row): os vizinhos do nó i ficam em
+## destinos[offsets[i]:offsets[i + 1]], com os custos na mesma posição de pesos
+##
+## O grafo também pode ser salvo num arquivo binário e aberto com mmap: os arrays
+## passam a ser memoryviews direto sobre o arquivo (sem cópia), então abrir um
+## grafo grande não custa tempo nem memória proporcional ao tamanho dele.
+##
+## uso: python grafo_compilado.py [arquivo]   (salva o mapa das capitais)
+
+from __future__ import annotations
+import mmap
+import struct
+import sys
+from array import array
+from typing import TYPE_CHECKING, Iterator, Sequence, overload, override
+
+if TYPE_CHECKING:
+    from main import MarcaCustos, Node
+
+
+# Formato do arquivo (little-endian, cada seção alinhada em 8 bytes):
+#   cabeçalho: marca, versão, flags, n (nós), m (arestas), bytes dos nomes
+#   offsets (n + 1 x int64), destinos (m x int32), pesos (m x int32),
+#   coordenadas (2n x float64, se a flag estiver ligada),
+#   início dos nomes (n + 1 x int64), nomes em utf-8
+_MARCA = b'GRFC'
+_VERSAO = 1
+_COM_COORDENADAS = 1
+_CABECALHO = struct.Struct('<4sHHQQQ')
+
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + 7) & ~7
+
+
+class _NomesMapeados(Sequence[str]):
+    """Nomes dos nós lidos do arquivo mapeado, decodificados só quando acessados"""
+
+    def __init__(self, inicios: memoryview, texto: memoryview):
+        self._inicios = inicios
+        self._texto = texto
+
+    def __len__(self) -> int:
+        return len(self._inicios) - 1
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+    @overload
+    def __getitem__(self, i: slice) -> list[str]: ...
+    def __getitem__(self, i: int | slice) -> str | list[str]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self._texto[self._inicios[i]:self._inicios[i + 1]], 'utf-8')
+
+
+class GrafoCompilado():
+    """
+    Grafo imutável com nós identificados por inteiros (0..n-1)
+
+    - nomes: nome de cada nó, na ordem dos ids
+    - offsets: n + 1 posições, início das arestas de cada nó
+    - destinos: id do nó de chegada de cada aresta
+    - pesos: custo de cada aresta
+    - coordenadas: (x, y) de cada nó intercalados, ou None
+
+    Os arrays podem ser array.array ou memoryview (grafo aberto de arquivo).
+    Compilado de uma lista de Nodes, o grafo é uma foto dos custos do
+    momento: depois de um alterar_custos() nesses Nodes, desatualizado
+    fica True e o grafo deve ser compilado de novo.
+    """
+
+    def __init__(self, nomes: Sequence[str], offsets: array[int] | memoryview,
+                 destinos: array[int] | memoryview, pesos: array[int] | memoryview,
+                 coordenadas: array[float] | memoryview | None = None):
+        if len(offsets) != len(nomes) + 1:
+            raise ValueError('offsets deve ter um elemento a mais que nomes')
+        if len(destinos) != len(pesos):
+            raise ValueError('destinos e pesos devem ter o mesmo tamanho')
+        if coordenadas is not None and len(coordenadas) != 2 * len(nomes):
+            raise ValueError('coordenadas deve ter 2 valores por nó')
+        self.nomes: Sequence[str] = nomes
+        self.offsets: array[int] | memoryview = offsets
+        self.destinos: array[int] | memoryview = destinos
+        self.pesos: array[int] | memoryview = pesos
+        self.coordenadas: array[float] | memoryview | None = coordenadas
+        # Nome -> id, só é montado se alguém pedir id()
+        self._ids: dict[str, int] | None = None
+        # Índice (origem, destino) -> custo, só é montado se alguém pedir custo()
+        self._custos: dict[int, int] | None = None
+        # Adjacência reversa (offsets, origens, pesos), montada na primeira
+        # chamada de vizinhos_reversos()
+        self._reverso: tuple[array[int], array[int], array[int]] | None = None
+        # Arquivo de onde o grafo foi aberto (mmap), se for o caso
+        self._arquivo: str | None = None
+        self._mmap: mmap.mmap | None = None
+        # Quem diz se os Nodes de onde o grafo foi compilado mudaram de custo
+        self.marca_custos: MarcaCustos | None = None
+
+    @classmethod
+    def compilar(cls, mapa: list[Node]) -> GrafoCompilado:
+        """
+        Compila uma lista de Nodes. O id de cada nó é a sua posição na lista
+        e a ordem das arestas de cada nó é mantida, assim as buscas dão os
+        mesmos trajetos no grafo compilado e no de Nodes.
+        """
+        ids = {no: i for i, no in enumerate(mapa)}
+        offsets = array('i', [0])
+        destinos = array('i')
+        pesos = array('i')
+        for no in mapa:
+            for conn, custo in no.connections:
+                if conn not in ids:
+                    raise ValueError(f'{conn} não faz parte do mapa')
+                destinos.append(ids[conn])
+                pesos.append(custo)
+            offsets.append(len(destinos))
+        grafo = cls([no.name for no in mapa], offsets, destinos, pesos)
+        # Importado aqui: o main importa este módulo
+        from main import MarcaCustos
+        grafo.marca_custos = MarcaCustos(mapa)
+        return grafo
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    @property
+    def desatualizado(self) -> bool:
+        """Algum custo dos Nodes de onde o grafo foi compilado mudou"""
+        return self.marca_custos is not None and self.marca_custos.desatualizado
+
+    @override
+    def __repr__(self) -> str:
+        return f'GrafoCompilado({len(self)} nós, {len(self.destinos)} arestas)'
+
+    def assinatura(self) -> bytes:
+        """
+        Hash sha256 do grafo (nomes, arestas e custos), usado para saber
+        se tabelas calculadas a partir dele ainda valem
+        """
+        # Importado aqui, só quem usa tabelas paga o import
+        import hashlib
+        h = hashlib.sha256()
+        h.update('\0'.join(self.nomes).encode())
+        # Os offsets mudam de tipo no arquivo, então entram como números
+        h.update(array('q', self.offsets).tobytes())
+        for arr in (self.destinos, self.pesos):
+            h.update(array('i', arr).tobytes())
+        return h.digest()
+
+    def id(self, nome: str) -> int:
+        """Id do nó com esse nome"""
+        if self._ids is None:
+            self._ids = {n: i for i, n in enumerate(self.nomes)}
+        if nome not in self._ids:
+            raise ValueError(f'Cidade {nome} não encontrada')
+        return self._ids[nome]
+
+    def vizinhos(self, no: int) -> Iterator[tuple[int, int]]:
+        """Pares (vizinho, custo) de um nó, na ordem em que foram conectados"""
+        inicio, fim = self.offsets[no], self.offsets[no + 1]
+        return zip(self.destinos[inicio:fim], self.pesos[inicio:fim])
+
+    def vizinhos_reversos(self, no: int) -> Iterator[tuple[int, int]]:
+        """Pares (origem, custo) das arestas que chegam no nó"""
+        if self._reverso is None:
+            self._reverso = self._montar_reverso()
+        offsets, origens, pesos = self._reverso
+        inicio, fim = offsets[no], offsets[no + 1]
+        return zip(origens[inicio:fim], pesos[inicio:fim])
+
+    def _montar_reverso(self) -> tuple[array[int], array[int], array[int]]:
+        # Counting sort das arestas pelo destino, mantendo a ordem das origens
+        n = len(self)
+        m = len(self.destinos)
+        offsets = array('q', [0]) * (n + 1)
+        for d in self.destinos:
+            offsets[d + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        proximo = array('q', offsets[:n])
+        origens = array('i', [0]) * m
+        pesos = array('i', [0]) * m
+        for u in range(n):
+            for e in range(self.offsets[u], self.offsets[u + 1]):
+                d = self.destinos[e]
+                origens[proximo[d]] = u
+                pesos[proximo[d]] = self.pesos[e]
+                proximo[d] += 1
+        return offsets, origens, pesos
+
+    def custo(self, origem: int, destino: int) -> int | None:
+        """Custo da aresta origem -> destino em O(1), None se não houver aresta"""
+        if self._custos is None:
+            n = len(self)
+            self._custos = {}
+            for u in range(n):
+                for e in range(self.offsets[u], self.offsets[u + 1]):
+                    self._custos[u * n + self.destinos[e]] = self.pesos[e]
+        return self._custos.get(origem * len(self) + destino)
+
+    def coordenada(self, no: int) -> tuple[float, float] | None:
+        if self.coordenadas is None:
+            return None
+        return self.coordenadas[2 * no], self.coordenadas[2 * no + 1]
+
+    def salvar(self, caminho: str) -> None:
+        """Salva o grafo no formato binário que abrir() lê com mmap"""
+        n = len(self)
+        m = len(self.destinos)
+        nomes = [nome.encode('utf-8') for nome in self.nomes]
+        inicios = array('q', [0])
+        for nome in nomes:
+            inicios.append(inicios[-1] + len(nome))
+        flags = _COM_COORDENADAS if self.coordenadas is not None else 0
+
+        secoes = [
+            array('q', self.offsets).tobytes(),
+            array('i', self.destinos).tobytes(),
+            array('i', self.pesos).tobytes(),
+        ]
+        if self.coordenadas is not None:
+            secoes.append(array('d', self.coordenadas).tobytes())
+        secoes.append(inicios.tobytes())
+        secoes.append(b''.join(nomes))
+
+        with open(caminho, 'wb') as f:
+            f.write(_CABECALHO.pack(_MARCA, _VERSAO, flags, n, m, inicios[-1]))
+            posicao = _CABECALHO.size
+            for secao in secoes:
+                preenchimento = _alinhar(posicao) - posicao
+                f.write(b'\0' * preenchimento)
+                f.write(secao)
+                posicao += preenchimento + len(secao)
+
+    @classmethod
+    def abrir(cls, caminho: str) -> GrafoCompilado:
+        """
+        Abre um grafo salvo com salvar() mapeando o arquivo na memória.
+        Nada é copiado: offsets, destinos, pesos e coordenadas são
+        memoryviews sobre o arquivo e os nomes são lidos sob demanda.
+        """
+        if sys.byteorder != 'little':
+            raise ValueError('Formato de grafo só suportado em máquinas little-endian')
+
+        with open(caminho, 'rb') as f:
+            dados = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(dados) < _CABECALHO.size:
+            raise ValueError(f'{caminho} não é um grafo compilado')
+        marca, versao, flags, n, m, tamanho_nomes = _CABECALHO.unpack_from(dados)
+        if marca != _MARCA:
+            raise ValueError(f'{caminho} não é um grafo compilado')
+        if versao != _VERSAO:
+            raise ValueError(f'Versão {versao} do formato não suportada')
+
+        visao = memoryview(dados)
+        posicao = _CABECALHO.size
+
+        def secao(tipo: str, quantidade: int) -> memoryview:
+            nonlocal posicao
+            inicio = _alinhar(posicao)
+            posicao = inicio + quantidade * struct.calcsize(tipo)
+            if posicao > len(visao):
+                raise ValueError(f'{caminho} está truncado')
+            return visao[inicio:posicao].cast(tipo)
+
+        offsets = secao('q', n + 1)
+        destinos = secao('i', m)
+        pesos = secao('i', m)
+        coordenadas = secao('d', 2 * n) if flags & _COM_COORDENADAS else None
+        inicios = secao('q', n + 1)
+        texto = secao('B', tamanho_nomes)
+
+        grafo = cls(_NomesMapeados(inicios, texto), offsets, destinos, pesos, coordenadas)
+        grafo._arquivo = caminho
+        grafo._mmap = dados
+        return grafo
+
+    def __reduce__(self) -> tuple[object, ...]:
+        # Um grafo aberto de arquivo é reaberto (e não copiado) em outro processo
+        if self._arquivo is not None:
+            return (GrafoCompilado.abrir, (self._arquivo,))
+        return (GrafoCompilado, (list(self.nomes), self.offsets, self.destinos, self.pesos, self.coordenadas))
+
+
+def main() -> None:
+    from main import create_mapa
+
+    caminho = sys.argv[1] if len(sys.argv) > 1 else 'capitais.grf'
+    grafo = GrafoCompilado.compilar(create_mapa())
+    grafo.salvar(caminho)
+    print(f'{grafo} salvo em {caminho}')
+
+
+if __name__ == '__main__':
+    main()
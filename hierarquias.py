@@ -0,0 +1,260 @@
+## Contraction hierarchies
+## Pré-processamento: os nós são contraídos um a um, do menos para o mais
+## importante. Ao contrair v, para cada par u -> v -> w sem caminho alternativo
+## tão barato (busca de testemunha), é criado o atalho u -> w, lembrando que
+## ele passa por v. Cada nó termina só com arestas para nós contraídos depois.
+##
+## Consulta: Dijkstra bidirecional que só sobe na hierarquia (para frente a partir
+## da origem e para trás a partir do destino). Os atalhos do trajeto encontrado
+## são desempacotados de volta para as arestas originais.
+##
+##   ch = HierarquiaContracao(mapa)
+##   trajeto, custo = ch.rota(source, dest)
+
+from __future__ import annotations
+import heapq
+import time
+from array import array
+from typing import override
+
+from grafo_compilado import GrafoCompilado
+from main import DESTINO_NAO_ENCONTRADO, EstatisticasBusca, MarcaCustos, Node, Vertice, get_conexoes
+
+
+class HierarquiaContracao():
+    """
+    Grafo de busca da contraction hierarchy, em arrays CSR
+
+    - nivel[v]: ordem em que v foi contraído
+    - subida: arestas v -> w com nivel[w] > nivel[v] (busca a partir da origem)
+    - descida: arestas u -> v com nivel[u] > nivel[v], guardadas em v
+        (busca para trás a partir do destino)
+    - meio: atalho u -> w (chave u * n + w) -> nó contraído que ele pula
+    """
+
+    def __init__(self, _mapa: list[Node] | GrafoCompilado, limite_testemunha: int = 50):
+        if isinstance(_mapa, GrafoCompilado):
+            nos: list[Vertice] = list(range(len(_mapa)))
+        else:
+            nos = list(_mapa)
+        self.n: int = len(nos)
+        self._nos: list[Vertice] = nos
+        self._ids: dict[Vertice, int] | None = None if isinstance(_mapa, GrafoCompilado) else {no: i for i, no in enumerate(nos)}
+        self.limite_testemunha: int = limite_testemunha
+        # Os atalhos guardam custos: depois de alterar_custos() a hierarquia não vale mais
+        self._marca: MarcaCustos | None = _mapa.marca_custos if isinstance(_mapa, GrafoCompilado) else MarcaCustos(_mapa)
+
+        # Grafo restante durante a contração (menor custo entre cada par)
+        self._saida: list[dict[int, int]] = [{} for _ in range(self.n)]
+        self._entrada: list[dict[int, int]] = [{} for _ in range(self.n)]
+        conexoes = get_conexoes(_mapa)
+        for u, no in enumerate(nos):
+            for conn, custo in conexoes(no):
+                w = self._id(conn)
+                if w != u and custo < self._saida[u].get(w, custo + 1):
+                    self._saida[u][w] = custo
+                    self._entrada[w][u] = custo
+
+        self.nivel: array[int] = array('i', [0]) * self.n
+        self.meio: dict[int, int] = {}
+        self.atalhos: int = 0
+        self._contrair()
+
+        # Depois da contração cada nó só tem arestas para nós de nível maior
+        self.subida = self._csr(self._saida)
+        self.descida = self._csr(self._entrada)
+        del self._saida, self._entrada
+
+    def _id(self, no: Vertice) -> int:
+        return no if self._ids is None else self._ids[no]  # type: ignore[return-value]
+
+    @staticmethod
+    def _csr(adjacencia: list[dict[int, int]]) -> tuple[array[int], array[int], array[int]]:
+        offsets = array('q', [0])
+        destinos = array('i')
+        pesos = array('q')
+        for arestas in adjacencia:
+            for w, custo in arestas.items():
+                destinos.append(w)
+                pesos.append(custo)
+            offsets.append(len(destinos))
+        return offsets, destinos, pesos
+
+    def _testemunhas(self, u: int, evitar: int, limite: int) -> dict[int, int]:
+        """
+        Dijkstra local a partir de u no grafo restante, sem passar por evitar,
+        parando no custo limite ou depois de limite_testemunha nós fechados
+        """
+        custos = {u: 0}
+        fronteira = [(0, u)]
+        fechados = 0
+        while fronteira and fechados < self.limite_testemunha:
+            g, atual = heapq.heappop(fronteira)
+            if g > custos[atual]:
+                continue
+            if g > limite:
+                break
+            fechados += 1
+            for w, custo in self._saida[atual].items():
+                if w == evitar:
+                    continue
+                novo_g = g + custo
+                if novo_g < custos.get(w, novo_g + 1):
+                    custos[w] = novo_g
+                    heapq.heappush(fronteira, (novo_g, w))
+        return custos
+
+    def _atalhos_necessarios(self, v: int) -> list[tuple[int, int, int]]:
+        """Atalhos (u, w, custo) que a contração de v exige"""
+        atalhos: list[tuple[int, int, int]] = []
+        saida = self._saida[v]
+        if not saida:
+            return atalhos
+        maior_saida = max(saida.values())
+        for u, custo_uv in self._entrada[v].items():
+            testemunhas = self._testemunhas(u, v, custo_uv + maior_saida)
+            for w, custo_vw in saida.items():
+                if w == u:
+                    continue
+                via_v = custo_uv + custo_vw
+                if testemunhas.get(w, via_v + 1) > via_v:
+                    atalhos.append((u, w, via_v))
+        return atalhos
+
+    def _prioridade(self, v: int, vizinhos_contraidos: list[int]) -> int:
+        # Diferença de arestas (atalhos criados - arestas removidas)
+        # mais os vizinhos já contraídos, para espalhar a contração pelo grafo
+        removidas = len(self._entrada[v]) + len(self._saida[v])
+        return len(self._atalhos_necessarios(v)) - removidas + vizinhos_contraidos[v]
+
+    def _contrair(self) -> None:
+        vizinhos_contraidos = [0] * self.n
+        contraido = [False] * self.n
+        fila = [(self._prioridade(v, vizinhos_contraidos), v) for v in range(self.n)]
+        heapq.heapify(fila)
+        nivel = 0
+
+        while fila:
+            _, v = heapq.heappop(fila)
+            if contraido[v]:
+                continue
+            # Atualização preguiçosa: se a prioridade piorou, volta para a fila
+            prioridade = self._prioridade(v, vizinhos_contraidos)
+            if fila and prioridade > fila[0][0]:
+                heapq.heappush(fila, (prioridade, v))
+                continue
+
+            for u, w, custo in self._atalhos_necessarios(v):
+                if custo < self._saida[u].get(w, custo + 1):
+                    self._saida[u][w] = custo
+                    self._entrada[w][u] = custo
+                    self.meio[u * self.n + w] = v
+                    self.atalhos += 1
+
+            contraido[v] = True
+            self.nivel[v] = nivel
+            nivel += 1
+            # Tira v do grafo restante; as arestas de v ficam com ele
+            for u in self._entrada[v]:
+                del self._saida[u][v]
+                vizinhos_contraidos[u] += 1
+            for w in self._saida[v]:
+                del self._entrada[w][v]
+                vizinhos_contraidos[w] += 1
+
+    def _desempacotar(self, u: int, w: int, trajeto: list[int]) -> None:
+        """Acrescenta ao trajeto os nós da aresta u -> w depois de u, abrindo os atalhos"""
+        pilha = [(u, w)]
+        while pilha:
+            a, b = pilha.pop()
+            v = self.meio.get(a * self.n + b)
+            if v is None:
+                trajeto.append(b)
+            else:
+                # (v, b) fica embaixo na pilha para sair depois de (a, v)
+                pilha.append((v, b))
+                pilha.append((a, v))
+
+    def rota(self, source: Vertice, dest: Vertice,
+             estatisticas: EstatisticasBusca | None = None) -> tuple[list[Vertice], int]:
+        """
+        Trajeto e custo mínimo de source a dest
+        (Nodes se a hierarquia foi montada de uma lista de nós, ids se de um GrafoCompilado)
+        Com estatisticas, conta os nós expandidos nas duas buscas que sobem a hierarquia.
+        Se algum custo do grafo mudou depois da contração, levanta ValueError.
+        """
+        if self._marca is not None and self._marca.desatualizado:
+            raise ValueError('Custos alterados depois da contração: monte a hierarquia de novo')
+        inicio = time.perf_counter() if estatisticas is not None else 0.0
+        resultado = self._buscar(self._id(source), self._id(dest), estatisticas)
+        if estatisticas is not None:
+            estatisticas.tempo = time.perf_counter() - inicio
+        return resultado
+
+    def _buscar(self, s: int, t: int, estatisticas: EstatisticasBusca | None) -> tuple[list[Vertice], int]:
+        if s == t:
+            return [self._nos[s]], 0
+
+        grafos = [self.subida, self.descida]
+        custos: list[dict[int, int]] = [{s: 0}, {t: 0}]
+        pais: list[dict[int, int]] = [{}, {}]
+        fronteiras: list[list[tuple[int, int]]] = [[(0, s)], [(0, t)]]
+        melhor: int | None = None
+        encontro = -1
+
+        while fronteiras[0] or fronteiras[1]:
+            # Cada lado para quando a menor chave dele já não melhora o encontro
+            for lado in (0, 1):
+                fronteira = fronteiras[lado]
+                if not fronteira:
+                    continue
+                if melhor is not None and fronteira[0][0] >= melhor:
+                    fronteira.clear()
+                    continue
+                if estatisticas is not None:
+                    estatisticas.pico_fronteira = max(estatisticas.pico_fronteira, len(fronteiras[0]) + len(fronteiras[1]))
+                g, atual = heapq.heappop(fronteira)
+                if g > custos[lado][atual]:
+                    if estatisticas is not None:
+                        estatisticas.duplicados += 1
+                    continue
+                if estatisticas is not None:
+                    estatisticas.expandidos += 1
+                outro = custos[1 - lado].get(atual)
+                if outro is not None and (melhor is None or g + outro < melhor):
+                    melhor, encontro = g + outro, atual
+
+                offsets, destinos, pesos = grafos[lado]
+                for e in range(offsets[atual], offsets[atual + 1]):
+                    w = destinos[e]
+                    novo_g = g + pesos[e]
+                    if estatisticas is not None:
+                        estatisticas.calculos_g += 1
+                    if novo_g < custos[lado].get(w, novo_g + 1):
+                        custos[lado][w] = novo_g
+                        pais[lado][w] = atual
+                        heapq.heappush(fronteira, (novo_g, w))
+                        if estatisticas is not None:
+                            estatisticas.gerados += 1
+
+        if melhor is None:
+            return DESTINO_NAO_ENCONTRADO
+
+        # Trajeto no grafo de busca: s ... encontro ... t
+        subida = [encontro]
+        while subida[-1] != s:
+            subida.append(pais[0][subida[-1]])
+        subida.reverse()
+        descida = [encontro]
+        while descida[-1] != t:
+            descida.append(pais[1][descida[-1]])
+        arestas = subida + descida[1:]
+
+        trajeto = [s]
+        for a, b in zip(arestas, arestas[1:]):
+            self._desempacotar(a, b, trajeto)
+        return [self._nos[i] for i in trajeto], melhor
+
+    @override
+    def __repr__(self) -> str:
+        return f'HierarquiaContracao({self.n} nós, {self.atalhos} atalhos)'
@@ -0,0 +1,140 @@
+## Modo em lote
+## Lê consultas de um arquivo JSONL, uma por linha:
+##   {"origem": "Rio Branco", "destino": "RS", "algoritmo": "a_star"}
+## (origem e destino pelo nome da capital ou pela UF; algoritmo é opcional,
+## padrão a_star) e escreve um resultado JSONL por consulta, na mesma ordem:
+##   {"origem": ..., "destino": ..., "algoritmo": ..., "trajeto": [...], "custo": ...}
+## Consultas com erro viram {"linha": n, "erro": "..."}.
+##
+## uso: python lote.py entrada.jsonl [-o saida.jsonl] [-p processos] [-b tamanho_bloco] [-c tamanho_cache]
+
+from __future__ import annotations
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import IO, Iterator
+
+import worker
+from cache_rotas import CacheRotas
+from grafo_compilado import GrafoCompilado
+from main import ALGORITMOS, LimiteExpansoesExcedido, create_mapa, resolver_cidade
+
+ALGORITMO_PADRAO = 'a_star'
+
+
+def responder(grafo: GrafoCompilado, linha: str, numero: int, cache: CacheRotas | None = None) -> dict[str, object]:
+    """Resolve uma consulta (uma linha do JSONL de entrada)"""
+    try:
+        consulta = json.loads(linha)
+        algoritmo = consulta.get('algoritmo', ALGORITMO_PADRAO)
+        busca = ALGORITMOS.get(algoritmo)
+        if busca is None:
+            raise ValueError(f'Algoritmo {algoritmo} não existe')
+        origem = resolver_cidade(str(consulta['origem']), grafo)
+        destino = resolver_cidade(str(consulta['destino']), grafo)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return {'linha': numero, 'erro': str(e)}
+
+    try:
+        if cache is None:
+            trajeto, custo = busca(grafo, origem, destino)
+        else:
+            trajeto, custo = cache.buscar(busca, grafo, origem, destino)
+    except LimiteExpansoesExcedido as e:
+        return {'linha': numero, 'erro': str(e)}
+    return {
+        'origem': grafo.nomes[origem],
+        'destino': grafo.nomes[destino],
+        'algoritmo': algoritmo,
+        'trajeto': [grafo.nomes[no] for no in trajeto],
+        'custo': custo,
+    }
+
+
+def processar_bloco(linhas: list[tuple[int, str]]) -> list[str]:
+    """
+    Roda no worker (depois de worker.iniciar): resolve um bloco de
+    (número, linha) e devolve as linhas de saída
+    """
+    grafo, cache = worker.grafo(), worker.cache()
+    return [
+        json.dumps(responder(grafo, linha, numero, cache), ensure_ascii=False)
+        for numero, linha in linhas
+    ]
+
+
+def _blocos(entrada: IO[str], tamanho: int) -> Iterator[list[tuple[int, str]]]:
+    """Lê a entrada aos poucos, em blocos de linhas não vazias (com o número de cada uma)"""
+    linhas = ((n, l) for n, l in enumerate(entrada, start=1) if l.strip())
+    while bloco := list(islice(linhas, tamanho)):
+        yield bloco
+
+
+def processar(entrada: IO[str], saida: IO[str], processos: int, tamanho_bloco: int = 500,
+              tamanho_cache: int = 4096) -> int:
+    """
+    Processa todas as consultas da entrada e escreve os resultados na saida.
+    Os blocos são distribuídos entre os processos, com no máximo
+    2 blocos por processo em andamento para não ler a entrada toda de uma vez.
+    Cada processo tem seu próprio cache de rotas (tamanho_cache 0 desliga).
+
+    retorna o número de consultas respondidas
+    """
+    grafo = GrafoCompilado.compilar(create_mapa())
+    total = 0
+
+    if processos <= 1:
+        worker.iniciar(grafo, tamanho_cache)
+        for bloco in _blocos(entrada, tamanho_bloco):
+            for resultado in processar_bloco(bloco):
+                saida.write(resultado + '\n')
+                total += 1
+        return total
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=worker.iniciar,
+                             initargs=(grafo, tamanho_cache)) as executor:
+        pendentes: list[Future[list[str]]] = []
+        for bloco in _blocos(entrada, tamanho_bloco):
+            pendentes.append(executor.submit(processar_bloco, bloco))
+            # Escreve na ordem da entrada assim que o bloco mais antigo termina
+            while len(pendentes) >= 2 * processos:
+                for resultado in pendentes.pop(0).result():
+                    saida.write(resultado + '\n')
+                    total += 1
+        for futuro in pendentes:
+            for resultado in futuro.result():
+                saida.write(resultado + '\n')
+                total += 1
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Responde consultas de rota em lote')
+    parser.add_argument('entrada', help='arquivo JSONL com as consultas (- para stdin)')
+    parser.add_argument('-o', '--saida', default='-', help='arquivo JSONL de resultados (padrão stdout)')
+    parser.add_argument('-p', '--processos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('-b', '--tamanho-bloco', type=int, default=500,
+                        help='consultas enviadas de uma vez para cada processo')
+    parser.add_argument('-c', '--cache', type=int, default=4096,
+                        help='rotas guardadas no cache de cada processo (0 desliga)')
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        entrada = sys.stdin if args.entrada == '-' else stack.enter_context(open(args.entrada, encoding='utf-8'))
+        saida = sys.stdout if args.saida == '-' else stack.enter_context(open(args.saida, 'w', encoding='utf-8'))
+
+        inicio = time.perf_counter()
+        total = processar(entrada, saida, args.processos, args.tamanho_bloco, args.cache)
+        tempo = time.perf_counter() - inicio
+
+    print(f'{total} consultas em {tempo:.2f}s ({total / tempo if tempo else 0:.0f} consultas/s, '
+          f'{args.processos} processos)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,34 @@
 from __future__ import annotations
-from typing import Callable, override
-from mapa import BELEZAS, MAPA, FRONTEIRAS, CUSTOS, get_uf_by_cidade, get_cidade_by_uf, get_distancia_aerea
+import functools
+import heapq
+import time
+import weakref
+from collections import OrderedDict, deque
+from itertools import count
+from typing import Callable, Hashable, Iterable, Iterator, Mapping, Sequence, override
+from grafo_compilado import GrafoCompilado
+from mapa import BELEZAS, MAPA, FRONTEIRAS, CUSTOS, REGISTRO, get_uf_by_cidade, get_cidade_by_uf, get_distancia_aerea, get_matriz_distancias_aereas
 
 DESTINO_NAO_ENCONTRADO: tuple[list[Node], int] = ([], 0)
 
+# Incrementado a cada create_mapa(), para caches saberem que o grafo mudou
+geracao_mapa = 0
+
+# Quem precisa saber das alterações de custo feitas por alterar_custos()
+# (caches, planejadores, estruturas pré-calculadas). Referências fracas:
+# quem não é mais usado sai sozinho, e nada guarda o histórico das alterações.
+ouvintes_custos: weakref.WeakSet[OuvinteCustos] = weakref.WeakSet()
+
 class Node():
     def __init__(self, _name: str):
         self.name: str = _name
         self.connections: list[tuple[Node, int]] = []
+        # Conexões que chegam neste nó (adjacência reversa), usadas
+        # pelas buscas bidirecionais para andar do destino para trás
+        self.reverse_connections: list[tuple[Node, int]] = []
+        # Índices das mesmas conexões, para consultas O(1)
+        self._custos: dict[Node, int] = {}
+        self._por_nome: dict[str, Node] = {}
 
     def add_connection(self, conn_name: str, cost: int) -> Node:
         conn = self.get_connection_by_name(conn_name)
@@ -22,17 +43,16 @@ class Node():
         return conn
         
     def add_connection_node(self, conn_node: Node, cost: int) -> None:
-        if conn_node in self.get_children():
+        if conn_node in self._custos:
             return
         self.connections.append((conn_node, cost))
+        conn_node.reverse_connections.append((self, cost))
+        self._custos[conn_node] = cost
+        self._por_nome.setdefault(conn_node.name, conn_node)
         
     def get_connection_by_name(self, conn_name: str)\
              -> Node | None:
-        result = filter(lambda n: n[0].name == conn_name, self.connections)
-        result = next(result, None)
-        if result:
-            return result[0]
-        return None
+        return self._por_nome.get(conn_name)
     
     def get_children(self) -> list[Node]:
         return [conn[0] for conn in self.connections]
@@ -41,18 +61,27 @@ class Node():
         return [conn[1] for conn in self.connections]
 
     def get_cost(self, conn: Node) -> int | None:
-        result = filter(lambda n: n[0] == conn, self.connections)
-        result = next(result, None)
-        if result:
-            return result[1]
-        return None
+        return self._custos.get(conn)
 
     def get_connection_cost(self, conn_name: str) -> int | None:
-        result = filter(lambda n: n[0].name == conn_name, self.connections)
-        result = next(result, None)
-        if result:
-            return result[1]
-        return None
+        conn = self._por_nome.get(conn_name)
+        if conn is None:
+            return None
+        return self._custos[conn]
+
+    def set_cost(self, conn: Node, cost: int) -> int:
+        """
+        Troca o custo da conexão self -> conn (nas duas adjacências)
+        retorna o custo antigo
+        (use alterar_custos para os caches e planejadores ficarem sabendo)
+        """
+        antigo = self._custos.get(conn)
+        if antigo is None:
+            raise ValueError(f'{self.name} não tem conexão com {conn.name}')
+        self._custos[conn] = cost
+        self.connections = [(c, cost if c is conn else custo) for c, custo in self.connections]
+        conn.reverse_connections = [(c, cost if c is self else custo) for c, custo in conn.reverse_connections]
+        return antigo
 
     @override
     def __repr__(self) -> str:
@@ -62,11 +91,94 @@ class Node():
     def __str__(self) -> str:
         return f'Node({self.name})'
 
+# As buscas rodam tanto na lista de Nodes quanto no GrafoCompilado,
+# onde os nós são ids inteiros
+Vertice = Node | int
+
+
+def _conexoes_node(no: Node) -> list[tuple[Node, int]]:
+    return no.connections
+
+
+def _conexoes_reversas_node(no: Node) -> list[tuple[Node, int]]:
+    return no.reverse_connections
+
+
+def get_conexoes(_mapa: list[Node] | GrafoCompilado) -> Callable[[Vertice], Iterable[tuple[Vertice, int]]]:
+    """
+    Função que devolve os pares (vizinho, custo) de um nó do mapa
+    """
+    if isinstance(_mapa, GrafoCompilado):
+        return _mapa.vizinhos  # type: ignore[return-value]
+    return _conexoes_node  # type: ignore[return-value]
+
+
+def get_conexoes_reversas(_mapa: list[Node] | GrafoCompilado) -> Callable[[Vertice], Iterable[tuple[Vertice, int]]]:
+    """
+    Função que devolve os pares (origem, custo) das arestas que chegam num nó
+    """
+    if isinstance(_mapa, GrafoCompilado):
+        return _mapa.vizinhos_reversos  # type: ignore[return-value]
+    return _conexoes_reversas_node  # type: ignore[return-value]
+
+
+def nome_cidade(no: Vertice, _mapa: list[Node] | GrafoCompilado | None = None) -> str:
+    """
+    Nome de um Node ou de um id do grafo compilado: o id é procurado nos
+    nomes do grafo (se for passado); sem o grafo, ou com um id que não
+    está nele, o nome é o próprio id
+    """
+    if isinstance(no, int):
+        if isinstance(_mapa, GrafoCompilado) and 0 <= no < len(_mapa):
+            return _mapa.nomes[no]
+        return str(no)
+    return no.name
+
+def indice_cidade(no: Vertice, _mapa: list[Node] | GrafoCompilado | None = None) -> int:
+    """
+    Índice da cidade no REGISTRO
+
+    Um id só é índice do REGISTRO no grafo compilado das capitais: com o
+    grafo, o id é traduzido pelo nome; sem ele, ids fora do REGISTRO são erro
+    """
+    if isinstance(no, int) and not isinstance(_mapa, GrafoCompilado):
+        if not 0 <= no < len(REGISTRO.cidades):
+            raise ValueError(f'Id {no} não é uma capital')
+        return no
+    nome = nome_cidade(no, _mapa)
+    i = REGISTRO.indice_cidade(nome)
+    if i is None:
+        raise ValueError(f'Cidade {nome} não encontrada')
+    return i
+
 def get_capital(uf: str) -> str:
-    linha = list(filter(lambda n: n[2] == uf, (l for l in MAPA)))[0]
-    if not linha:
+    capital = REGISTRO.cidade(uf)
+    if capital is None:
         raise ValueError(f'UF {uf} não encontrada')
-    return str(linha[0])
+    return capital
+
+def resolver_cidade(nome_ou_uf: str, _mapa: GrafoCompilado | None = None) -> int:
+    """
+    Índice no REGISTRO de uma capital informada pelo nome ou pela UF
+
+    Com o grafo, retorna o id dele: o nome é procurado nos nomes do grafo
+    e a UF é trocada pelo nome da capital antes (ids de um grafo carregado
+    de arquivo não precisam seguir a ordem do REGISTRO)
+    """
+    if _mapa is not None:
+        try:
+            return _mapa.id(nome_ou_uf)
+        except ValueError:
+            capital = REGISTRO.cidade(nome_ou_uf.upper())
+            if capital is None:
+                raise
+            return _mapa.id(capital)
+    i = REGISTRO.indice_cidade(nome_ou_uf)
+    if i is None:
+        i = REGISTRO.indice_uf(nome_ou_uf.upper())
+    if i is None:
+        raise ValueError(f'Cidade {nome_ou_uf} não encontrada')
+    return i
 
 def get_fronteiras(uf: str) -> list[str]:
     if FRONTEIRAS.get(uf) is None:
@@ -74,8 +186,9 @@ def get_fronteiras(uf: str) -> list[str]:
     return FRONTEIRAS.get(uf, [])
 
 def get_capitais_fronteiras(capital: str) -> list[str]:
-    linha = list(filter(lambda n: n[0] == capital, (l for l in MAPA)))
-    uf: str = linha[0][2]
+    uf = REGISTRO.uf(capital)
+    if uf is None:
+        raise ValueError(f'Cidade {capital} não encontrada')
     fronteiras_uf = get_fronteiras(uf)
     capitais: list[str] = []
     for f in fronteiras_uf:
@@ -90,176 +203,1042 @@ def g_func(rota: list[Node]) -> int:
             custo += c
     return custo
 
-def get_beleza(capital: Node) -> int:
-    linha = list(filter(lambda n: n[0] == capital.name, (l for l in MAPA)))
-    uf: str = linha[0][2] 
-    beleza = BELEZAS[uf]
-    return beleza
+def _indice_capital(no: Vertice) -> int | None:
+    """Índice no REGISTRO, ou None se o nó não é uma capital (ids: ver heuristica_no_grafo)"""
+    if isinstance(no, int):
+        return no if 0 <= no < len(REGISTRO.cidades) else None
+    return REGISTRO.indice_cidade(no.name)
+
+def get_beleza(capital: Vertice) -> int:
+    """Beleza da capital (0 para cidades que não são capitais)"""
+    i = _indice_capital(capital)
+    return 0 if i is None else REGISTRO.belezas[i]
 
-def h_func_beleza(trajeto: list[Node], destino: Node) -> int:
+def h_func_beleza(trajeto: list[Vertice], destino: Vertice) -> int:
     """Heurística: penaliza caminhos que passam por cidades menos belas"""
     if not trajeto:
         return 0
     ultima = trajeto[-1]
+    if _indice_capital(ultima) is None:
+        return 0
     return 10 - get_beleza(ultima)  # Quanto mais bela, menor a heurística
 
-def h_func_distancia_aerea(trajeto: list[Node], destino: Node) -> int:
+def h_func_distancia_aerea(trajeto: list[Vertice], destino: Vertice) -> int:
     if not trajeto: 
         return 0
 
-    ultima = trajeto[-1]
-
-    uf_destino = str(get_uf_by_cidade(destino.name))
-    uf_ultima = str(get_uf_by_cidade(ultima.name))
+    ultima, destino_i = _indice_capital(trajeto[-1]), _indice_capital(destino)
+    if ultima is None or destino_i is None:
+        return 0
 
-    cust = int(get_distancia_aerea(uf_ultima, uf_destino))
+    distancias = get_matriz_distancias_aereas()
+    cust = int(distancias[ultima, destino_i])
     return cust
 
 
-def a_star(_mapa: list[Node], source: Node, dest: Node, h_func: Callable[[list[Node], Node], int] = h_func_beleza) -> tuple[list[Node], int]:
+# Heurísticas que leem os ids do grafo compilado como índices do REGISTRO
+HEURISTICAS_CAPITAIS: set[Callable[[list[Vertice], Vertice], int]] = {h_func_beleza, h_func_distancia_aerea}
+
+# Grafos compilados já conferidos: True se os ids são os do REGISTRO
+_ids_do_registro: weakref.WeakKeyDictionary[GrafoCompilado, bool] = weakref.WeakKeyDictionary()
+
+
+def _usa_ids_do_registro(grafo: GrafoCompilado) -> bool:
+    e_capitais = _ids_do_registro.get(grafo)
+    if e_capitais is None:
+        e_capitais = _ids_do_registro[grafo] = len(grafo) == len(REGISTRO.cidades) and list(grafo.nomes) == REGISTRO.cidades
+    return e_capitais
+
+
+def heuristica_no_grafo(_mapa: list[Node] | GrafoCompilado,
+                        h_func: Callable[[list[Vertice], Vertice], int]) -> Callable[[list[Vertice], Vertice], int]:
+    """
+    As heurísticas das capitais tomam um id como posição no REGISTRO, o que só
+    vale no grafo compilado das capitais. Em outro grafo compilado os ids são
+    traduzidos pelo nome do nó, e nós que não são capitais têm h = 0.
+    Outras heurísticas (e a lista de Nodes, que tem os nomes) ficam como estão.
+    """
+    if h_func not in HEURISTICAS_CAPITAIS or not isinstance(_mapa, GrafoCompilado) or _usa_ids_do_registro(_mapa):
+        return h_func
+    nomes = _mapa.nomes
+
+    def h_traduzida(trajeto: list[Vertice], destino: Vertice) -> int:
+        if not trajeto:
+            return 0
+        ultima = REGISTRO.indice_cidade(nomes[trajeto[-1]])  # type: ignore[index]
+        destino_i = REGISTRO.indice_cidade(nomes[destino])  # type: ignore[index]
+        if ultima is None or destino_i is None:
+            return 0
+        return h_func([ultima], destino_i)
+    return h_traduzida
+
+
+class OuvinteCustos():
+    """
+    Avisado por alterar_custos() depois de cada lote aplicado, com as
+    alterações (origem, destino, custo antigo, custo novo). Esta classe não
+    faz nada; quem herda sobrescreve custos_alterados e se coloca em
+    ouvintes_custos.
+    """
+
+    def custos_alterados(self, alteracoes: list[tuple[Node, Node, int, int]]) -> None:
+        pass
+
+
+class MarcaCustos(OuvinteCustos):
+    """
+    Diz se algum custo de uma lista de Nodes mudou depois que uma estrutura
+    foi calculada a partir dela (GrafoCompilado.compilar, HierarquiaContracao,
+    Landmarks). Guarda os nós por referência fraca.
+
+    - desatualizado: algum custo de aresta que sai desses nós mudou
+    - reducao: algum desses custos diminuiu (limites inferiores deixam de valer)
+    """
+
+    def __init__(self, nos: Iterable[Node]):
+        self._nos: weakref.WeakSet[Node] = weakref.WeakSet(nos)
+        self.desatualizado: bool = False
+        self.reducao: bool = False
+        ouvintes_custos.add(self)
+
+    @override
+    def custos_alterados(self, alteracoes: list[tuple[Node, Node, int, int]]) -> None:
+        for origem, _, antigo, novo in alteracoes:
+            if origem in self._nos:
+                self.desatualizado = True
+                self.reducao = self.reducao or novo < antigo
+
+    def limpar(self) -> None:
+        """A estrutura foi recalculada com os custos atuais"""
+        self.desatualizado = self.reducao = False
+
+
+# Heurística compilada: valor de h para cada nó, lido com h[nó]
+# (lista indexada pelo id no GrafoCompilado, dict por Node na lista de nós)
+VetorHeuristica = Sequence[int] | Mapping[Node, int]
+
+
+def compilar_heuristica(_mapa: list[Node] | GrafoCompilado, h_func: Callable[[list[Vertice], Vertice], int],
+                        dest: Vertice) -> VetorHeuristica:
+    """
+    Calcula h_func de todos os nós até dest de uma vez só.
+    Heurísticas com um método compilar(_mapa, dest) (como a DistanciaAerea do
+    gerador) podem calcular o vetor inteiro de um jeito mais rápido; se ele
+    devolver None, h_func é chamada nó a nó.
+    """
+    compilar = getattr(h_func, 'compilar', None)
+    if compilar is not None:
+        vetor = compilar(_mapa, dest)
+        if vetor is not None:
+            return vetor
+    h_func = heuristica_no_grafo(_mapa, h_func)
+    if isinstance(_mapa, GrafoCompilado):
+        return [h_func([no], dest) for no in range(len(_mapa))]
+    return {no: h_func([no], dest) for no in _mapa}
+
+
+def identidade_funcao(func: Callable[..., object]) -> Hashable:
+    """
+    Chave estável de uma função (busca ou heurística) para os caches
+
+    Funções definidas no nível do módulo são identificadas por
+    módulo.nome, o que vale entre processos e recargas. Lambdas e funções
+    internas (closures) não têm nome único, então a chave é o próprio
+    objeto. Para functools.partial vale a função mais os argumentos fixados.
+    """
+    if isinstance(func, functools.partial):
+        return (identidade_funcao(func.func), func.args, tuple(sorted(func.keywords.items())))
+    nome = getattr(func, '__qualname__', None)
+    if nome and '<' not in nome:
+        return f'{func.__module__}.{nome}'
+    return func
+
+
+class CacheHeuristicas(OuvinteCustos):
+    """
+    Vetores de heurística já compilados, por (grafo, h_func, destino), com
+    remoção do usado há mais tempo (LRU). Consultas para o mesmo destino
+    reaproveitam o vetor e a heurística vira uma leitura de lista por nó.
+
+    Nodes só pertencem a um grafo, então para a lista de nós o próprio
+    destino identifica o grafo; ids inteiros vão junto com o GrafoCompilado.
+    O GrafoCompilado entra na chave por referência fraca: quando ninguém
+    mais usa o grafo, os vetores dele saem do cache. Os vetores da lista de
+    nós saem quando create_mapa() monta um grafo novo.
+
+    Heurísticas calculadas a partir dos custos (as que têm o atributo
+    depende_dos_custos, como Landmarks) deixam de ser admissíveis quando
+    algum custo diminui: nesse caso só os vetores delas na lista de nós são
+    descartados (o GrafoCompilado não muda com alterar_custos).
+    Aumentos não invalidam nada (o limite inferior continua valendo).
+    """
+
+    def __init__(self, tamanho_maximo: int = 64):
+        if tamanho_maximo < 1:
+            raise ValueError('tamanho_maximo deve ser positivo')
+        self.tamanho_maximo: int = tamanho_maximo
+        self.acertos: int = 0
+        self.falhas: int = 0
+        # chave -> (vetor, se a heurística depende dos custos)
+        self._vetores: OrderedDict[Hashable, tuple[VetorHeuristica, bool]] = OrderedDict()
+        self._geracao: int = geracao_mapa
+        ouvintes_custos.add(self)
+
+    def __len__(self) -> int:
+        return len(self._vetores)
+
+    def invalidar(self) -> None:
+        self._vetores.clear()
+
+    @override
+    def custos_alterados(self, alteracoes: list[tuple[Node, Node, int, int]]) -> None:
+        if any(novo < antigo for _, _, antigo, novo in alteracoes):
+            for chave in [c for c, (_, depende) in self._vetores.items() if depende and c[0] is None]:  # type: ignore[index]
+                del self._vetores[chave]
+
+    def _conferir_geracao(self) -> None:
+        # Os Nodes do grafo antigo não voltam mais a ser consultados
+        self._geracao = geracao_mapa
+        for chave in [c for c in self._vetores if c[0] is None]:  # type: ignore[index]
+            del self._vetores[chave]
+
+    def _grafo_coletado(self, ref: weakref.ref[GrafoCompilado]) -> None:
+        for chave in [c for c in self._vetores if c[0] is ref]:  # type: ignore[index]
+            del self._vetores[chave]
+
+    def vetor(self, _mapa: list[Node] | GrafoCompilado, h_func: Callable[[list[Vertice], Vertice], int],
+              dest: Vertice) -> VetorHeuristica:
+        if self._geracao != geracao_mapa:
+            self._conferir_geracao()
+        grafo = weakref.ref(_mapa) if isinstance(_mapa, GrafoCompilado) else None
+        chave = (grafo, identidade_funcao(h_func), dest)
+        guardado = self._vetores.get(chave)
+        if guardado is not None:
+            self.acertos += 1
+            self._vetores.move_to_end(chave)
+            return guardado[0]
+        self.falhas += 1
+        vetor = compilar_heuristica(_mapa, h_func, dest)
+        if isinstance(_mapa, GrafoCompilado):
+            # A referência guardada avisa quando o grafo é coletado
+            chave = (weakref.ref(_mapa, self._grafo_coletado), chave[1], dest)
+        self._vetores[chave] = (vetor, getattr(h_func, 'depende_dos_custos', False))
+        if len(self._vetores) > self.tamanho_maximo:
+            self._vetores.popitem(last=False)
+        return vetor
+
+
+# Cache usado pelas buscas com heurística fixa (a_star_distancia_aerea)
+HEURISTICAS = CacheHeuristicas()
+
+
+class LimiteExpansoesExcedido(RuntimeError):
+    """A busca expandiu mais nós que o limite pedido sem terminar"""
+
+
+class EstatisticasBusca():
+    """
+    Números de uma busca, para entender por que uma consulta demorou.
+    As buscas só preenchem se receberem uma instância no parâmetro
+    estatisticas (sem ela não há custo nenhum de contagem):
+
+        stats = EstatisticasBusca()
+        trajeto, custo = a_star(mapa, source, dest, estatisticas=stats)
+    """
+
+    def __init__(self) -> None:
+        # nós tirados da fronteira e expandidos
+        self.expandidos: int = 0
+        # entradas colocadas na fronteira
+        self.gerados: int = 0
+        # entradas descartadas ao sair da fronteira (já visitadas ou obsoletas)
+        self.duplicados: int = 0
+        self.pico_fronteira: int = 0
+        # chamadas de h_func (leituras de um vetor pré-calculado não contam)
+        self.avaliacoes_heuristica: int = 0
+        # custos g calculados (arestas relaxadas)
+        self.calculos_g: int = 0
+        # segundos
+        self.tempo: float = 0.0
+
+    def como_dict(self) -> dict[str, int | float]:
+        return dict(vars(self))
+
+    @override
+    def __repr__(self) -> str:
+        campos = ', '.join(f'{k}={v}' for k, v in vars(self).items())
+        return f'EstatisticasBusca({campos})'
+
+
+class ObservadorBusca():
+    """
+    Ganchos chamados de dentro do laço das buscas, para rastrear ou
+    depurar sem editar o código da busca. Esta classe não faz nada;
+    basta sobrescrever os métodos de interesse:
+
+    - on_push: no entrou na fronteira com custo g
+    - on_expand: no saiu da fronteira e os vizinhos dele vão ser gerados
+    - on_prune: no foi descartado (já visitado, entrada obsoleta ou caminho pior)
+    - on_goal: a busca chegou ao destino (ou ao encontro, nas bidirecionais)
+
+    As buscas recebem o observador pelo parâmetro observador; sem ele
+    (None, o padrão) nenhum gancho é chamado.
+    """
+
+    def on_push(self, no: Vertice, g: int) -> None:
+        pass
+
+    def on_expand(self, no: Vertice, g: int) -> None:
+        pass
+
+    def on_prune(self, no: Vertice, g: int) -> None:
+        pass
+
+    def on_goal(self, no: Vertice, custo: int) -> None:
+        pass
+
+
+def _concluir(estatisticas: EstatisticasBusca | None, inicio: float,
+              resultado: tuple[list[Vertice], int]) -> tuple[list[Vertice], int]:
+    if estatisticas is not None:
+        estatisticas.tempo = time.perf_counter() - inicio
+    return resultado
+
+
+def reconstruir_trajeto(pais: dict[Vertice, Vertice | None], dest: Vertice) -> list[Vertice]:
+    """
+    Refaz o trajeto até dest seguindo os ponteiros de pai
+    (o nó de origem tem pai None)
+    """
+    trajeto: list[Vertice] = []
+    atual: Vertice | None = dest
+    while atual is not None:
+        trajeto.append(atual)
+        atual = pais[atual]
+    trajeto.reverse()
+    return trajeto
+
+
+def a_star(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice, h_func: Callable[[list[Vertice], Vertice], int] = h_func_beleza,
+           estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None,
+           heuristicas: CacheHeuristicas | None = None) -> tuple[list[Vertice], int]:
     """
     Busca usando método A*
     retorna o trajeto (se houver) e o custo para o trajeto
 
     - source: nó de origem
     - dest: nó de destino
-    - mapa: lista de nós 
-        (dá para perceber que acabamos não usando o mapa porque os próprios 
-        nodes já possuem conexões)
+    - mapa: lista de nós ou GrafoCompilado
+        (na lista de nós o mapa não é usado porque os próprios nodes já
+        possuem conexões; no GrafoCompilado source e dest são ids)
+
+    A fronteira é uma heap ordenada por f = g + h. O custo g é acumulado
+    aresta a aresta e guardamos o melhor g conhecido de cada nó, assim
+    entradas antigas da heap (com g pior) são descartadas ao sair.
+    As heurísticas só olham o último nó do trajeto, então recebem [nó].
+
+    - heuristicas: se informado, h_func é compilada num vetor por nó
+        (e guardada para as próximas consultas ao mesmo dest); cada
+        avaliação passa a ser só h[nó]
     """
+    inicio = time.perf_counter() if estatisticas is not None else 0.0
+    vetor = heuristicas.vetor(_mapa, h_func, dest) if heuristicas is not None else None
+    h_func = heuristica_no_grafo(_mapa, h_func)
 
-    # armazenar os próximos a fazer consulta
-    next_children: list[tuple[Node, list[Node]]] = []
-    visitados: set[Node] = set() # Usando set pois não armazena duplicados
+    # Heap com (f, desempate, g, nó)
+    # o desempate evita comparar Nodes quando f é igual
+    next_children: list[tuple[int, int, int, Vertice]] = []
+    melhor_g: dict[Vertice, int] = {source: 0}
+    pais: dict[Vertice, Vertice | None] = {source: None}
+    desempate = count()
+    conexoes = get_conexoes(_mapa)
 
     # Populando primeiro
-    next_children.append((source, []))
+    h_source = vetor[source] if vetor is not None else h_func([source], dest)  # type: ignore[index]
+    heapq.heappush(next_children, (h_source, next(desempate), 0, source))
+    if observador is not None:
+        observador.on_push(source, 0)
 
     while next_children:
-        def soma_g_h_func(key: tuple[Node, list[Node]]) -> int:
-            # g(n) + h(n)
-            _atual, trajeto = key
-            return g_func(trajeto) + h_func(trajeto + [_atual], dest)
-
-        # Ordena pela soma do custo atual e heurística
-        next_children.sort(key=soma_g_h_func)
-        proximos_5 = next_children[:5]
-        #print('Proximos:')
-        #print('\n'.join([f'{soma_g_h_func(n):3} - {n[0].name}' for n in proximos_5]))
+        if estatisticas is not None and len(next_children) > estatisticas.pico_fronteira:
+            estatisticas.pico_fronteira = len(next_children)
 
         # Pega o nó com menor custo total estimado
-        child, trajeto = next_children.pop(0)
+        _, _, g, child = heapq.heappop(next_children)
 
-        if child in visitados:
+        # Entrada obsoleta: já achamos caminho melhor para esse nó
+        if g > melhor_g[child]:
+            if estatisticas is not None:
+                estatisticas.duplicados += 1
+            if observador is not None:
+                observador.on_prune(child, g)
             continue
 
-        visitados.add(child)
-        rota_atual = trajeto + [child]
         if child == dest:
             # chegou no destino
-            return rota_atual, g_func(rota_atual)
+            if observador is not None:
+                observador.on_goal(child, g)
+            _contar_a_star(estatisticas, desempate, vetor is None)
+            return _concluir(estatisticas, inicio, (reconstruir_trajeto(pais, dest), g))
 
-        children = child.get_children()
-        # Adiciona filhos ao fim da lista
-        next_children += [(conn, rota_atual) for conn in children]
+        if estatisticas is not None:
+            estatisticas.expandidos += 1
+        if observador is not None:
+            observador.on_expand(child, g)
+        for conn, custo in conexoes(child):
+            novo_g = g + custo
+            if estatisticas is not None:
+                estatisticas.calculos_g += 1
+            if novo_g >= melhor_g.get(conn, novo_g + 1):
+                if observador is not None:
+                    observador.on_prune(conn, novo_g)
+                continue
+            melhor_g[conn] = novo_g
+            pais[conn] = child
+            h = vetor[conn] if vetor is not None else h_func([conn], dest)  # type: ignore[index]
+            heapq.heappush(next_children, (novo_g + h, next(desempate), novo_g, conn))
+            if observador is not None:
+                observador.on_push(conn, novo_g)
 
     # Se não achou o destino
-    return DESTINO_NAO_ENCONTRADO
+    _contar_a_star(estatisticas, desempate, vetor is None)
+    return _concluir(estatisticas, inicio, DESTINO_NAO_ENCONTRADO)
 
-def largura(_mapa: list[Node], source: Node, dest: Node) -> tuple[list[Node], int]:
+
+def _contar_a_star(estatisticas: EstatisticasBusca | None, desempate: Iterator[int], chamou_h_func: bool) -> None:
+    # Cada entrada da heap recebe um número de desempate e um valor de h,
+    # então o próximo número é o total de entradas geradas. Com o vetor
+    # pré-calculado h é uma leitura, não uma chamada de h_func.
+    if estatisticas is not None:
+        gerados = next(desempate)
+        estatisticas.gerados += gerados
+        if chamou_h_func:
+            estatisticas.avaliacoes_heuristica += gerados
+
+def largura(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+            estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None) -> tuple[list[Vertice], int]:
     """
     Busca em largura 
     retorna o trajeto (se houver) e o custo para o trajeto
 
     - source: nó de origem
     - dest: nó de destino
-    - mapa: lista de nós 
-        (dá para perceber que acabamos não usando o mapa porque os próprios 
-        nodes já possuem conexões)
-    """
-    # print(f'Algoritmo de largura de {source.name} para {dest.name}')
-    # Proximos filhos precisam armazenar a rota traçada
-    next_children: list[tuple[Node, list[Node]]] = []
-    visitados: list[Node] = []
-    custo = 1
-
-    # Popular o primeiro
-    next_children.append((source, []))
-    
-    while next_children:
-        child, trajeto = next_children.pop(0)
-        # Nao voltar por um caminho ja feito
-        if child in visitados:
-            continue
-
-        # print('TESTE: CITY: {} TRAJETO: {}'.format(
-        #     child.name.ljust(15),
-        #     '->'.join([t.name for t in trajeto]).ljust(100)
-        # ))
+    - mapa: lista de nós ou GrafoCompilado
+        (na lista de nós o mapa não é usado porque os próprios nodes já
+        possuem conexões; no GrafoCompilado source e dest são ids)
+    """
+    inicio = time.perf_counter() if estatisticas is not None else 0.0
+    # Proximos filhos ficam numa deque (popleft é O(1)), o trajeto
+    # é refeito pelos pais quando chega no destino
+    next_children: deque[Vertice] = deque([source])
+    # Marca como visitado ao entrar na fila, assim cada nó entra uma vez só
+    visitados: set[Vertice] = {source}
+    pais: dict[Vertice, Vertice | None] = {source: None}
+    # Custo acumulado até cada nó, somado aresta a aresta
+    custos: dict[Vertice, int] = {source: 0}
+    conexoes = get_conexoes(_mapa)
+    if observador is not None:
+        observador.on_push(source, 0)
 
-        visitados.append(child)
-        rota_atual = trajeto + [child]
+    while next_children:
+        if estatisticas is not None and len(next_children) > estatisticas.pico_fronteira:
+            estatisticas.pico_fronteira = len(next_children)
+        child = next_children.popleft()
 
         if child == dest:
             # chegou no destino
-            custo = g_func(rota_atual)
-            # print(f'Completou viagem de {source.name} a {dest.name}')
-            # print(f'Trajeto: {[n.name for n in rota_atual]}')
-            # print(f'Custo: {custo}')
-            return rota_atual, custo
+            rota_atual = reconstruir_trajeto(pais, child)
+            custo = custos[child]
+            if observador is not None:
+                observador.on_goal(child, custo)
+            _contar_largura(estatisticas, visitados)
+            return _concluir(estatisticas, inicio, (rota_atual, custo))
         
-        children = child.get_children()
-        # Adiciona filhos ao fim da lista
-        # print('Adicionando {} filhos ({})'.format(
-        #       len(children),
-        #       str([s.name for s in children])
-        #       ))
-        next_children += [
-            (conn, rota_atual) for conn in children
-        ]
+        if estatisticas is not None:
+            estatisticas.expandidos += 1
+        if observador is not None:
+            observador.on_expand(child, custos[child])
+        # Adiciona filhos ao fim da fila
+        for conn, custo in conexoes(child):
+            # Nao voltar por um caminho ja feito
+            if conn in visitados:
+                if observador is not None:
+                    observador.on_prune(conn, custos[child] + custo)
+                continue
+            visitados.add(conn)
+            pais[conn] = child
+            custos[conn] = custos[child] + custo
+            next_children.append(conn)
+            if observador is not None:
+                observador.on_push(conn, custos[conn])
     
-    return DESTINO_NAO_ENCONTRADO
+    _contar_largura(estatisticas, visitados)
+    return _concluir(estatisticas, inicio, DESTINO_NAO_ENCONTRADO)
+
+
+def _contar_largura(estatisticas: EstatisticasBusca | None, visitados: set[Vertice]) -> None:
+    # Cada nó entra na fila uma vez só e ganha um custo g ao entrar
+    if estatisticas is not None:
+        estatisticas.gerados += len(visitados)
+        estatisticas.calculos_g += len(visitados) - 1
         
     
-def profundidade(_mapa: list[Node], source: Node, dest: Node) -> tuple[list[Node], int]:
+def profundidade(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+                 estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None) -> tuple[list[Vertice], int]:
     """
     Busca em profundidade
     retorna o trajeto (se houver) e o custo para o trajeto
 
     - source: nó de origem
     - dest: nó de destino
-    - mapa: lista de nós 
+    - mapa: lista de nós ou GrafoCompilado
+        (no GrafoCompilado source e dest são ids)
     """
-    print(f'Algoritmo de profundidade de {source.name} para {dest.name}')
-    next_children: list[tuple[Node, list[Node]]] = []
-    visitados: list[Node] = []
+    inicio = time.perf_counter() if estatisticas is not None else 0.0
+    # Pilha com (nó, pai, custo da aresta pai -> nó)
+    next_children: deque[tuple[Vertice, Vertice | None, int]] = deque()
+    visitados: set[Vertice] = set()
+    pais: dict[Vertice, Vertice | None] = {}
+    custos: dict[Vertice, int] = {}
+    conexoes = get_conexoes(_mapa)
 
-    next_children.append((source, []))
+    next_children.append((source, None, 0))
+    if observador is not None:
+        observador.on_push(source, 0)
 
     while next_children:
+        if estatisticas is not None and len(next_children) > estatisticas.pico_fronteira:
+            estatisticas.pico_fronteira = len(next_children)
+
         # Pega o último nó adicionado
-        atual, trajeto = next_children.pop()
+        atual, pai, custo = next_children.pop()
 
         if atual in visitados:
+            if estatisticas is not None:
+                estatisticas.duplicados += 1
+            if observador is not None:
+                observador.on_prune(atual, custo if pai is None else custos[pai] + custo)
             continue
 
-        visitados.append(atual)
-        rota_atual = trajeto + [atual]
+        visitados.add(atual)
+        pais[atual] = pai
+        custos[atual] = custo if pai is None else custos[pai] + custo
 
         if atual == dest:
-            custo = g_func(rota_atual)
-            return rota_atual, custo
-
-        children = atual.get_children()
+            rota_atual = reconstruir_trajeto(pais, atual)
+            if observador is not None:
+                observador.on_goal(atual, custos[atual])
+            _contar_profundidade(estatisticas, visitados)
+            return _concluir(estatisticas, inicio, (rota_atual, custos[atual]))
 
         # Como é pilha, adicionamos no final (últimos filhos serão explorados primeiro)
-        next_children += [(filho, rota_atual) for filho in children if filho not in visitados]
+        # Um nó pode entrar mais de uma vez na pilha (filhos de nós diferentes),
+        # quem vale é o último empilhado, por isso a checagem ao desempilhar
+        if observador is not None:
+            observador.on_expand(atual, custos[atual])
+        antes = len(next_children)
+        next_children.extend((filho, atual, c) for filho, c in conexoes(atual) if filho not in visitados)
+        if estatisticas is not None:
+            estatisticas.expandidos += 1
+            estatisticas.gerados += len(next_children) - antes
+        if observador is not None:
+            for i in range(antes, len(next_children)):
+                filho, _, c = next_children[i]
+                observador.on_push(filho, custos[atual] + c)
+
+    _contar_profundidade(estatisticas, visitados)
+    return _concluir(estatisticas, inicio, DESTINO_NAO_ENCONTRADO)
+
+
+def _contar_profundidade(estatisticas: EstatisticasBusca | None, visitados: set[Vertice]) -> None:
+    # O source também entrou na pilha; cada nó visitado ganha um custo g
+    if estatisticas is not None:
+        estatisticas.gerados += 1
+        estatisticas.calculos_g += len(visitados) - 1
+
+
+def largura_bidirecional(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+                         estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None) -> tuple[list[Vertice], int]:
+    """
+    Busca em largura bidirecional
+    retorna o trajeto com menos cidades (se houver) e o custo para o trajeto
+
+    Expande um nível inteiro de cada vez, sempre do lado com menor fronteira:
+    do source para frente e do dest para trás (pela adjacência reversa).
+    Para quando os dois lados se encontram.
+    Para o observador, g é o custo a partir do source ou até o dest, conforme o lado.
+    """
+    inicio = time.perf_counter() if estatisticas is not None else 0.0
+    if source == dest:
+        if observador is not None:
+            observador.on_goal(source, 0)
+        return _concluir(estatisticas, inicio, ([source], 0))
+
+    conexoes = [get_conexoes(_mapa), get_conexoes_reversas(_mapa)]
+    # Índice 0: lado do source, 1: lado do dest
+    # pais[1] aponta para o próximo nó em direção ao dest
+    pais: list[dict[Vertice, Vertice | None]] = [{source: None}, {dest: None}]
+    custos: list[dict[Vertice, int]] = [{source: 0}, {dest: 0}]
+    saltos: list[dict[Vertice, int]] = [{source: 0}, {dest: 0}]
+    fronteiras: list[list[Vertice]] = [[source], [dest]]
+    if observador is not None:
+        observador.on_push(source, 0)
+        observador.on_push(dest, 0)
+
+    while fronteiras[0] and fronteiras[1]:
+        if estatisticas is not None:
+            estatisticas.pico_fronteira = max(estatisticas.pico_fronteira, len(fronteiras[0]) + len(fronteiras[1]))
+        lado = 0 if len(fronteiras[0]) <= len(fronteiras[1]) else 1
+        outro = 1 - lado
+        proxima: list[Vertice] = []
+        encontro: Vertice | None = None
+        melhor = 0
+
+        for atual in fronteiras[lado]:
+            if observador is not None:
+                observador.on_expand(atual, custos[lado][atual])
+            for conn, custo in conexoes[lado](atual):
+                if conn in pais[lado]:
+                    if observador is not None:
+                        observador.on_prune(conn, custos[lado][atual] + custo)
+                    continue
+                pais[lado][conn] = atual
+                custos[lado][conn] = custos[lado][atual] + custo
+                saltos[lado][conn] = saltos[lado][atual] + 1
+                proxima.append(conn)
+                if observador is not None:
+                    observador.on_push(conn, custos[lado][conn])
+                if conn in pais[outro]:
+                    total = saltos[lado][conn] + saltos[outro][conn]
+                    if encontro is None or total < melhor:
+                        encontro, melhor = conn, total
+        if estatisticas is not None:
+            estatisticas.expandidos += len(fronteiras[lado])
+
+        if encontro is not None:
+            # Termina o nível antes de escolher, o encontro com menos saltos vence
+            ida = reconstruir_trajeto(pais[0], encontro)
+            volta = reconstruir_trajeto(pais[1], encontro)
+            volta.reverse()
+            custo_total = custos[0][encontro] + custos[1][encontro]
+            if observador is not None:
+                observador.on_goal(encontro, custo_total)
+            _contar_largura_bidirecional(estatisticas, pais)
+            return _concluir(estatisticas, inicio, (ida + volta[1:], custo_total))
+
+        fronteiras[lado] = proxima
+
+    _contar_largura_bidirecional(estatisticas, pais)
+    return _concluir(estatisticas, inicio, DESTINO_NAO_ENCONTRADO)
+
+
+def _contar_largura_bidirecional(estatisticas: EstatisticasBusca | None, pais: list[dict[Vertice, Vertice | None]]) -> None:
+    # Cada nó entra uma vez só em cada lado e ganha um custo g ao entrar
+    if estatisticas is not None:
+        gerados = len(pais[0]) + len(pais[1])
+        estatisticas.gerados += gerados
+        estatisticas.calculos_g += gerados - 2
+
+
+def a_star_bidirecional(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice, h_func: Callable[[list[Vertice], Vertice], int] | None = None,
+                        estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None) -> tuple[list[Vertice], int]:
+    """
+    Busca A* bidirecional (sem h_func é Dijkstra bidirecional)
+    retorna o trajeto (se houver) e o custo para o trajeto
+
+    Os dois lados usam o potencial médio p(v) = (h(v, dest) - h(source, v)) / 2,
+    positivo para frente e negativo para trás, assim as chaves dos dois lados
+    são compatíveis e dá para parar quando
+    menor chave da frente + menor chave de trás >= melhor custo encontrado.
+    O lado de trás precisa de um limite para o custo de source até v, então
+    h_func é chamada também como h_func([source], v): tem de ser um limite
+    inferior entre quaisquer dois nós (como Landmarks e a distância aérea),
+    não só até dest. Em grafos dirigidos h(source, v) e h(v, source) são
+    diferentes. Como em qualquer A*, o trajeto só é garantidamente o mínimo
+    se a heurística for consistente.
+    Para o observador, g é o custo a partir do source ou até o dest, conforme o lado.
+    """
+    inicio = time.perf_counter() if estatisticas is not None else 0.0
+    if source == dest:
+        if observador is not None:
+            observador.on_goal(source, 0)
+        return _concluir(estatisticas, inicio, ([source], 0))
+
+    conexoes = [get_conexoes(_mapa), get_conexoes_reversas(_mapa)]
+    potenciais: dict[Vertice, float] = {}
+    if h_func is not None:
+        h_func = heuristica_no_grafo(_mapa, h_func)
+
+    def potencial(no: Vertice) -> float:
+        if h_func is None:
+            return 0
+        if no not in potenciais:
+            potenciais[no] = (h_func([no], dest) - h_func([source], no)) / 2
+            if estatisticas is not None:
+                estatisticas.avaliacoes_heuristica += 2
+        return potenciais[no]
+
+    # Índice 0: lado do source, 1: lado do dest (sinal do potencial em cada lado)
+    sinais = [1, -1]
+    melhor_g: list[dict[Vertice, int]] = [{source: 0}, {dest: 0}]
+    pais: list[dict[Vertice, Vertice | None]] = [{source: None}, {dest: None}]
+    desempate = count()
+    fronteiras: list[list[tuple[float, int, int, Vertice]]] = [
+        [(potencial(source), next(desempate), 0, source)],
+        [(-potencial(dest), next(desempate), 0, dest)],
+    ]
+    melhor_custo: int | None = None
+    encontro: Vertice | None = None
+    if observador is not None:
+        observador.on_push(source, 0)
+        observador.on_push(dest, 0)
+
+    while fronteiras[0] and fronteiras[1]:
+        if melhor_custo is not None and fronteiras[0][0][0] + fronteiras[1][0][0] >= melhor_custo:
+            break
+        if estatisticas is not None:
+            estatisticas.pico_fronteira = max(estatisticas.pico_fronteira, len(fronteiras[0]) + len(fronteiras[1]))
+
+        lado = 0 if fronteiras[0][0][0] <= fronteiras[1][0][0] else 1
+        outro = 1 - lado
+        _, _, g, atual = heapq.heappop(fronteiras[lado])
+        if g > melhor_g[lado][atual]:
+            # Entrada obsoleta
+            if estatisticas is not None:
+                estatisticas.duplicados += 1
+            if observador is not None:
+                observador.on_prune(atual, g)
+            continue
+
+        if estatisticas is not None:
+            estatisticas.expandidos += 1
+        if observador is not None:
+            observador.on_expand(atual, g)
+        for conn, custo in conexoes[lado](atual):
+            novo_g = g + custo
+            if estatisticas is not None:
+                estatisticas.calculos_g += 1
+            if novo_g >= melhor_g[lado].get(conn, novo_g + 1):
+                if observador is not None:
+                    observador.on_prune(conn, novo_g)
+                continue
+            melhor_g[lado][conn] = novo_g
+            pais[lado][conn] = atual
+            chave = novo_g + sinais[lado] * potencial(conn)
+            heapq.heappush(fronteiras[lado], (chave, next(desempate), novo_g, conn))
+            if observador is not None:
+                observador.on_push(conn, novo_g)
+
+            if conn in melhor_g[outro]:
+                total = novo_g + melhor_g[outro][conn]
+                if melhor_custo is None or total < melhor_custo:
+                    melhor_custo, encontro = total, conn
+
+    if estatisticas is not None:
+        # Cada entrada das heaps recebeu um número de desempate
+        estatisticas.gerados += next(desempate)
+
+    if encontro is None or melhor_custo is None:
+        return _concluir(estatisticas, inicio, DESTINO_NAO_ENCONTRADO)
+
+    if observador is not None:
+        observador.on_goal(encontro, melhor_custo)
+    ida = reconstruir_trajeto(pais[0], encontro)
+    volta = reconstruir_trajeto(pais[1], encontro)
+    volta.reverse()
+    return _concluir(estatisticas, inicio, (ida + volta[1:], melhor_custo))
+
+
+def ida_star(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice, h_func: Callable[[list[Vertice], Vertice], int],
+             estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None,
+             limite_expansoes: int | None = None) -> tuple[list[Vertice], int]:
+    """
+    Busca IDA* (A* com aprofundamento iterativo)
+    retorna o trajeto (se houver) e o custo para o trajeto
+
+    Faz buscas em profundidade cortando os nós com f = g + h acima de um
+    limite; o limite começa em h(source) e em cada rodada passa a ser o
+    menor f que foi cortado na anterior. Só guarda o trajeto atual (e um
+    iterador de vizinhos por nó dele), então a memória é O(profundidade),
+    em troca de reexpandir nós a cada rodada.
+    Aceita as mesmas heurísticas do a_star; com heurística admissível o
+    custo é o mínimo. A heurística é obrigatória: com a de beleza (padrão
+    do a_star) o limite sobe de pouco em pouco e há pares de capitais que
+    levam minutos; nas capitais use h_func_distancia_aerea ou Landmarks.
+
+    Só evita ciclos dentro do trajeto atual: um nó alcançado por dois
+    caminhos é explorado pelos dois. Com muitos caminhos alternativos de
+    custo parecido (grades, grafos gerados) o número de expansões cresce
+    exponencialmente; mesmo nas 27 capitais um par chega a 125 mil.
+    Com limite_expansoes, levanta LimiteExpansoesExcedido ao passar dele.
+    """
+    inicio = time.perf_counter() if estatisticas is not None else 0.0
+    if observador is not None:
+        observador.on_push(source, 0)
+    if source == dest:
+        if observador is not None:
+            observador.on_goal(source, 0)
+        return _concluir(estatisticas, inicio, ([source], 0))
+
+    conexoes = get_conexoes(_mapa)
+    h_func = heuristica_no_grafo(_mapa, h_func)
+    limite: float = h_func([source], dest)
+    expandidos = 0
+    if estatisticas is not None:
+        estatisticas.avaliacoes_heuristica += 1
+
+    while True:
+        proximo_limite: float | None = None
+        # Trajeto atual, custo g de cada nó dele e os vizinhos ainda não vistos
+        trajeto: list[Vertice] = [source]
+        no_trajeto: set[Vertice] = {source}
+        gs: list[int] = [0]
+        pilha: list[Iterator[tuple[Vertice, int]]] = [iter(conexoes(source))]
+        if estatisticas is not None:
+            estatisticas.expandidos += 1
+        if observador is not None:
+            observador.on_expand(source, 0)
+
+        while pilha:
+            proximo = next(pilha[-1], None)
+            if proximo is None:
+                # Acabaram os vizinhos: volta um nó
+                pilha.pop()
+                no_trajeto.discard(trajeto.pop())
+                gs.pop()
+                continue
+
+            conn, custo = proximo
+            g = gs[-1] + custo
+            if estatisticas is not None:
+                estatisticas.calculos_g += 1
+            # Não anda em círculos dentro do trajeto atual
+            if conn in no_trajeto:
+                if estatisticas is not None:
+                    estatisticas.duplicados += 1
+                if observador is not None:
+                    observador.on_prune(conn, g)
+                continue
+
+            f = g + h_func([conn], dest)
+            if estatisticas is not None:
+                estatisticas.avaliacoes_heuristica += 1
+            if f > limite:
+                if proximo_limite is None or f < proximo_limite:
+                    proximo_limite = f
+                if observador is not None:
+                    observador.on_prune(conn, g)
+                continue
+
+            if estatisticas is not None:
+                estatisticas.gerados += 1
+            if observador is not None:
+                observador.on_push(conn, g)
+
+            if conn == dest:
+                if observador is not None:
+                    observador.on_goal(conn, g)
+                trajeto.append(conn)
+                return _concluir(estatisticas, inicio, (trajeto, g))
+
+            expandidos += 1
+            if limite_expansoes is not None and expandidos > limite_expansoes:
+                raise LimiteExpansoesExcedido(f'IDA* passou de {limite_expansoes} nós expandidos')
+            trajeto.append(conn)
+            no_trajeto.add(conn)
+            gs.append(g)
+            pilha.append(iter(conexoes(conn)))
+            if estatisticas is not None:
+                estatisticas.expandidos += 1
+                estatisticas.pico_fronteira = max(estatisticas.pico_fronteira, len(pilha))
+            if observador is not None:
+                observador.on_expand(conn, g)
+
+        if proximo_limite is None:
+            # Nada foi cortado: o grafo alcançável acabou sem achar o destino
+            return _concluir(estatisticas, inicio, DESTINO_NAO_ENCONTRADO)
+        limite = proximo_limite
+
+
+def profundidade_iterativa(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+                           estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None) -> tuple[list[Vertice], int]:
+    """
+    Busca em profundidade com aprofundamento iterativo
+    retorna o trajeto com menos cidades (se houver) e o custo para o trajeto
+
+    Repete a busca em profundidade com limite de 1, 2, 3... arestas.
+    Como a profundidade, só guarda o trajeto atual, com memória O(profundidade);
+    como a largura, acha primeiro o trajeto com menos cidades.
+    """
+    inicio = time.perf_counter() if estatisticas is not None else 0.0
+    if observador is not None:
+        observador.on_push(source, 0)
+    if source == dest:
+        if observador is not None:
+            observador.on_goal(source, 0)
+        return _concluir(estatisticas, inicio, ([source], 0))
+
+    conexoes = get_conexoes(_mapa)
+    limite = 1
+    while True:
+        # Algum nó ficou com vizinhos de fora por causa do limite
+        cortado = False
+        trajeto: list[Vertice] = [source]
+        no_trajeto: set[Vertice] = {source}
+        gs: list[int] = [0]
+        pilha: list[Iterator[tuple[Vertice, int]]] = [iter(conexoes(source))]
+        if estatisticas is not None:
+            estatisticas.expandidos += 1
+        if observador is not None:
+            observador.on_expand(source, 0)
+
+        while pilha:
+            proximo = next(pilha[-1], None)
+            if proximo is None:
+                pilha.pop()
+                no_trajeto.discard(trajeto.pop())
+                gs.pop()
+                continue
+
+            conn, custo = proximo
+            g = gs[-1] + custo
+            if estatisticas is not None:
+                estatisticas.calculos_g += 1
+            if conn in no_trajeto:
+                if estatisticas is not None:
+                    estatisticas.duplicados += 1
+                if observador is not None:
+                    observador.on_prune(conn, g)
+                continue
+
+            if estatisticas is not None:
+                estatisticas.gerados += 1
+            if observador is not None:
+                observador.on_push(conn, g)
+
+            if conn == dest:
+                if observador is not None:
+                    observador.on_goal(conn, g)
+                trajeto.append(conn)
+                return _concluir(estatisticas, inicio, (trajeto, g))
+
+            if len(pilha) == limite:
+                # No limite: não desce, mas a próxima rodada pode descer
+                cortado = True
+                continue
+
+            trajeto.append(conn)
+            no_trajeto.add(conn)
+            gs.append(g)
+            pilha.append(iter(conexoes(conn)))
+            if estatisticas is not None:
+                estatisticas.expandidos += 1
+                estatisticas.pico_fronteira = max(estatisticas.pico_fronteira, len(pilha))
+            if observador is not None:
+                observador.on_expand(conn, g)
+
+        if not cortado:
+            return _concluir(estatisticas, inicio, DESTINO_NAO_ENCONTRADO)
+        limite += 1
 
-    print('Destino não encontrado.')
-    return DESTINO_NAO_ENCONTRADO
+
+def dijkstra(_mapa: list[Node] | GrafoCompilado, source: Vertice, reverso: bool = False) -> tuple[dict[Vertice, int], dict[Vertice, Vertice | None], list[Vertice]]:
+    """
+    Dijkstra a partir de source, sem destino: calcula a árvore de
+    caminhos mínimos inteira
+
+    retorna o custo até cada nó alcançado, os pais (para reconstruir_trajeto)
+    e os nós na ordem em que foram fechados
+
+    - reverso: anda pelas arestas ao contrário, dando o custo de cada nó
+        até source (e os pais apontam para o próximo nó em direção a source)
+    """
+    custos: dict[Vertice, int] = {source: 0}
+    pais: dict[Vertice, Vertice | None] = {source: None}
+    fechados: list[Vertice] = []
+    fechado: set[Vertice] = set()
+    desempate = count()
+    conexoes = get_conexoes_reversas(_mapa) if reverso else get_conexoes(_mapa)
+
+    fronteira: list[tuple[int, int, Vertice]] = [(0, next(desempate), source)]
+    while fronteira:
+        g, _, atual = heapq.heappop(fronteira)
+        if atual in fechado:
+            continue
+        fechado.add(atual)
+        fechados.append(atual)
+
+        for conn, custo in conexoes(atual):
+            novo_g = g + custo
+            if novo_g >= custos.get(conn, novo_g + 1):
+                continue
+            custos[conn] = novo_g
+            pais[conn] = atual
+            heapq.heappush(fronteira, (novo_g, next(desempate), conn))
+
+    return custos, pais, fechados
+
+
+def a_star_distancia_aerea(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+                           estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None) -> tuple[list[Vertice], int]:
+    return a_star(_mapa, source, dest, h_func_distancia_aerea, estatisticas, observador, HEURISTICAS)
+
+
+# Expansões aceitas pelo ida_star_aerea antes de desistir (o pior par de
+# capitais expande 125 mil); em grafos grandes ele erra em vez de travar
+LIMITE_EXPANSOES_IDA = 500_000
+
+
+def ida_star_distancia_aerea(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+                             estatisticas: EstatisticasBusca | None = None, observador: ObservadorBusca | None = None) -> tuple[list[Vertice], int]:
+    # Com a heurística de beleza o limite do IDA* sobe pouco por rodada e
+    # certos pares levam minutos; a distância aérea corta bem mais cedo
+    return ida_star(_mapa, source, dest, h_func_distancia_aerea, estatisticas, observador, LIMITE_EXPANSOES_IDA)
+
+
+# Buscas disponíveis pelo nome (modo em lote, serviço, benchmark)
+ALGORITMOS: dict[str, Callable[..., tuple[list[Vertice], int]]] = {
+    'largura': largura,
+    'profundidade': profundidade,
+    'a_star': a_star,
+    'a_star_aerea': a_star_distancia_aerea,
+    'largura_bidirecional': largura_bidirecional,
+    'a_star_bidirecional': a_star_bidirecional,
+    'ida_star_aerea': ida_star_distancia_aerea,
+    'profundidade_iterativa': profundidade_iterativa,
+}
+
+
+def alterar_custos(alteracoes: Iterable[tuple[Node, Node, int]]) -> list[tuple[Node, Node, int, int]]:
+    """
+    Aplica um lote de alterações (origem, destino, custo novo) nas arestas
+    do grafo de Nodes e avisa os ouvintes_custos (CacheRotas,
+    CacheHeuristicas, PlanejadorLPA, estruturas pré-calculadas), para cada
+    um se atualizar só no que mudou. Os custos têm de ser positivos; o lote
+    é conferido inteiro antes de qualquer alteração.
+
+    retorna as alterações aplicadas (origem, destino, custo antigo, custo novo)
+    """
+    lote = list(alteracoes)
+    for origem, destino, custo in lote:
+        if custo <= 0:
+            raise ValueError(f'Custo de {origem.name} a {destino.name} deve ser positivo')
+    aplicadas: list[tuple[Node, Node, int, int]] = []
+    for origem, destino, custo in lote:
+        antigo = origem.set_cost(destino, custo)
+        if antigo != custo:
+            aplicadas.append((origem, destino, antigo, custo))
+    if aplicadas:
+        for ouvinte in list(ouvintes_custos):
+            ouvinte.custos_alterados(aplicadas)
+    return aplicadas
 
 
 def get_cidade(mapa: list[Node], name: str) -> Node | None:
+    # No mapa das capitais a posição do nó é o índice do REGISTRO
+    i = REGISTRO.indice_cidade(name)
+    if i is not None and i < len(mapa) and mapa[i].name == name:
+        return mapa[i]
     linha = list(filter(lambda n: n.name == name, mapa))
     if not linha:
         return
@@ -267,9 +1246,12 @@ def get_cidade(mapa: list[Node], name: str) -> Node | None:
 
 
 def create_mapa() -> list[Node]:
+    global geracao_mapa
+    geracao_mapa += 1
     mapa: list[Node] = []
 
     def conectar_cidades(cidade1: Node, cidade2: Node, custo: int = 0) -> None:
+        # Também registra cidade1 nas reverse_connections de cidade2
         cidade1.add_connection_node(cidade2, custo)
         # Como cidades serao unidirecionais
         # cidade2.add_connection_node(cidade1)
@@ -282,9 +1264,8 @@ def create_mapa() -> list[Node]:
         return CUSTOS.get(uf, [])
 
     for cidade in mapa:
-        uf = next(filter(lambda linha: linha[0] == cidade.name, MAPA))[2]
-        capital = get_capital(uf)
-        fronteiras = get_capitais_fronteiras(capital)
+        uf = REGISTRO.ufs[indice_cidade(cidade)]
+        fronteiras = get_capitais_fronteiras(cidade.name)
         custos = get_custos(uf)
         
         for front, custo in zip(fronteiras, custos):
@@ -316,15 +1297,33 @@ def select_in(msg: str, opcoes: list[str]) -> int:
 def print_trajeto(trajeto: list[Node], custo: int = 0) -> None:
     if trajeto:
         print(f'Viagem de {trajeto[0].name} a {trajeto[-1].name}')
-    cidades_uf = [f'{n.name}({get_uf_by_cidade(n.name)})' for n in trajeto]
+    cidades_uf = [f'{n.name}({REGISTRO.uf(n.name)})' for n in trajeto]
     print('Trajeto: {}'.format('->'.join(cidades_uf)))
     print('Custo: {}'.format(custo))
     return None
 
-mapa = create_mapa()
-capitais = [l[0] for l in MAPA]
+# Grafo das capitais, montado só no primeiro get_graph() para o import ficar leve
+_grafo: list[Node] | None = None
+
+def get_graph() -> list[Node]:
+    """
+    Grafo das capitais, montado na primeira chamada e reaproveitado depois
+    """
+    global _grafo
+    if _grafo is None:
+        _grafo = create_mapa()
+    return _grafo
+
+def __getattr__(nome: str) -> list[Node]:
+    # Compatibilidade com quem ainda usa main.mapa
+    if nome == 'mapa':
+        return get_graph()
+    raise AttributeError(f'module {__name__!r} has no attribute {nome!r}')
+
+capitais = REGISTRO.cidades
 
 def main() -> None:
+    mapa = get_graph()
     i = select_in('Origem', capitais)
     source = get_cidade(mapa, capitais[i])
     if not source:
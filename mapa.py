@@ -1,3 +1,10 @@
+from __future__ import annotations
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
 MAPA = [
     # ['Cidade'       , 'Estado'              , 'Sigla' , 'Região'       ] ,
     ['Rio Branco'     , 'Acre'                , 'AC' , 'Norte'        ] ,
@@ -119,424 +126,142 @@ CUSTOS = { # TODO: Adicionar custos
     'TO': [1386, 1401, 1454, 874, 1784, 1283],
 }
 
+class RegistroCidades():
+    """
+    Índices montados uma vez só a partir de MAPA e BELEZAS,
+    para trocar as varreduras de MAPA por consultas O(1).
+
+    O índice de uma cidade é a sua linha em MAPA, que é também a posição
+    do Node em create_mapa() e o id no GrafoCompilado das capitais.
+    """
+
+    def __init__(self, mapa: list[list[str]], belezas: dict[str, int]):
+        self.cidades: list[str] = [linha[0] for linha in mapa]
+        self.estados: list[str] = [linha[1] for linha in mapa]
+        self.ufs: list[str] = [linha[2] for linha in mapa]
+        self.regioes: list[str] = [linha[3] for linha in mapa]
+        self.belezas: list[int] = [belezas[uf] for uf in self.ufs]
+        self._indice_cidade: dict[str, int] = {c: i for i, c in enumerate(self.cidades)}
+        self._indice_uf: dict[str, int] = {uf: i for i, uf in enumerate(self.ufs)}
+
+    def __len__(self) -> int:
+        return len(self.cidades)
+
+    def indice_cidade(self, cidade: str) -> int | None:
+        return self._indice_cidade.get(cidade)
+
+    def indice_uf(self, uf: str) -> int | None:
+        return self._indice_uf.get(uf)
+
+    def uf(self, cidade: str) -> str | None:
+        i = self._indice_cidade.get(cidade)
+        return None if i is None else self.ufs[i]
+
+    def cidade(self, uf: str) -> str | None:
+        i = self._indice_uf.get(uf)
+        return None if i is None else self.cidades[i]
+
+    def regiao(self, cidade: str) -> str | None:
+        i = self._indice_cidade.get(cidade)
+        return None if i is None else self.regioes[i]
+
+    def beleza(self, cidade: str) -> int | None:
+        i = self._indice_cidade.get(cidade)
+        return None if i is None else self.belezas[i]
+
+
+REGISTRO = RegistroCidades(MAPA, BELEZAS)
+
 def get_cidade_by_uf(uf):
     """
     Retorna o nome da cidade correspondente à UF fornecida.
     """
-    for cidade in MAPA:
-        if cidade[2] == uf:
-            return cidade[0]
-    return None
+    return REGISTRO.cidade(uf)
 
 def get_uf_by_cidade(cidade):
     """
     Retorna a UF correspondente à cidade fornecida.
     """
-    for cidade_info in MAPA:
-        if cidade_info[0] == cidade:
-            return cidade_info[2]
-    return None
-
-_distancias_aereas = {
-    'SE:PA': 16410.0,
-    'SE:MG': 12480.0,
-    'SE:RR': 30220.0,
-    'SE:DF': 12920.0,
-    'SE:MS': 21550.0,
-    'SE:MT': 21210.0,
-    'SE:PR': 20610.0,
-    'SE:SC': 22070.0,
-    'SE:CE': 8150.0,
-    'SE:GO': 14610.0,
-    'SE:PB': 4860.0,
-    'SE:AP': 19670.0,
-    'SE:AL': 201.0,
-    'SE:AM': 2673.0,
-    'SE:RN': 604.0,
-    'SE:TO': 12350.0,
-    'SE:RS': 2580.0,
-    'SE:RO': 2946.0,
-    'SE:PE': 398.0,
-    'SE:AC': 3359.0,
-    'SE:RJ': 1482.0,
-    'SE:BA': 277.0,
-    'SE:MA': 1226.0,
-    'SE:SP': 1731.0,
-    'SE:PI': 903.0,
-    'SE:ES': 1102.0,
-    'PA:MG': 21110.0,
-    'PA:RR': 14320.0,
-    'PA:DF': 15920.0,
-    'PA:MS': 22120.0,
-    'PA:MT': 17780.0,
-    'PA:PR': 26650.0,
-    'PA:SC': 29040.0,
-    'PA:CE': 11330.0,
-    'PA:GO': 16930.0,
-    'PA:PB': 16360.0,
-    'PA:AP': 3290.0,
-    'PA:AL': 1680.0,
-    'PA:AM': 1292.0,
-    'PA:RN': 1550.0,
-    'PA:TO': 9730.0,
-    'PA:RS': 3188.0,
-    'PA:RO': 1886.0,
-    'PA:PE': 1676.0,
-    'PA:AC': 2333.0,
-    'PA:RJ': 2450.0,
-    'PA:BA': 1687.0,
-    'PA:MA': 481.0,
-    'PA:SP': 2463.0,
-    'PA:PI': 750.0,
-    'PA:ES': 2275.0,
-    'MG:RR': 31170.0,
-    'MG:DF': 6240.0,
-    'MG:MS': 11180.0,
-    'MG:MT': 13720.0,
-    'MG:PR': 8200.0,
-    'MG:SC': 9730.0,
-    'MG:CE': 18930.0,
-    'MG:GO': 6660.0,
-    'MG:PB': 17260.0,
-    'MG:AP': 23490.0,
-    'MG:AL': 1439.0,
-    'MG:AM': 2556.0,
-    'MG:RN': 1831.0,
-    'MG:TO': 11780.0,
-    'MG:RS': 1341.0,
-    'MG:RO': 2477.0,
-    'MG:PE': 1639.0,
-    'MG:AC': 2786.0,
-    'MG:RJ': 339.0,
-    'MG:BA': 964.0,
-    'MG:MA': 1932.0,
-    'MG:SP': 489.0,
-    'MG:PI': 1652.0,
-    'MG:ES': 378.0,
-    'RR:DF': 24960.0,
-    'RR:MS': 26670.0,
-    'RR:MT': 21070.0,
-    'RR:PR': 33700.0,
-    'RR:SC': 36200.0,
-    'RR:CE': 25620.0,
-    'RR:GO': 25030.0,
-    'RR:PB': 30670.0,
-    'RR:AP': 11100.0,
-    'RR:AL': 3089.0,
-    'RR:AM': 661.0,
-    'RR:RN': 2983.0,
-    'RR:TO': 19880.0,
-    'RR:RS': 3785.0,
-    'RR:RO': 1335.0,
-    'RR:PE': 3103.0,
-    'RR:AC': 1626.0,
-    'RR:RJ': 3428.0,
-    'RR:BA': 3009.0,
-    'RR:MA': 1913.0,
-    'RR:SP': 3300.0,
-    'RR:PI': 2169.0,
-    'RR:ES': 3394.0,
-    'DF:MS': 8780.0,
-    'DF:MT': 8730.0,
-    'DF:PR': 10810.0,
-    'DF:SC': 13140.0,
-    'DF:CE': 16870.0,
-    'DF:GO': 1730.0,
-    'DF:PB': 17160.0,
-    'DF:AP': 17910.0,
-    'DF:AL': 1485.0,
-    'DF:AM': 1932.0,
-    'DF:RN': 1775.0,
-    'DF:TO': 6200.0,
-    'DF:RS': 1619.0,
-    'DF:RO': 1900.0,
-    'DF:PE': 1657.0,
-    'DF:AC': 2246.0,
-    'DF:RJ': 933.0,
-    'DF:BA': 1060.0,
-    'DF:MA': 1524.0,
-    'DF:SP': 873.0,
-    'DF:PI': 1313.0,
-    'DF:ES': 947.0,
-    'MS:MT': 5590.0,
-    'MS:PR': 7800.0,
-    'MS:SC': 10070.0,
-    'MS:CE': 25470.0,
-    'MS:GO': 7050.0,
-    'MS:PB': 25930.0,
-    'MS:AP': 23090.0,
-    'MS:AL': 2352.0,
-    'MS:AM': 2013.0,
-    'MS:RN': 2654.0,
-    'MS:TO': 13200.0,
-    'MS:RS': 1119.0,
-    'MS:RO': 1634.0,
-    'MS:PE': 2530.0,
-    'MS:AC': 1827.0,
-    'MS:RJ': 1212.0,
-    'MS:BA': 1905.0,
-    'MS:MA': 2284.0,
-    'MS:SP': 894.0,
-    'MS:PI': 2132.0,
-    'MS:ES': 1490.0,
-    'MT:PR': 13020.0,
-    'MT:SC': 15430.0,
-    'MT:CE': 23290.0,
-    'MT:GO': 7400.0,
-    'MT:PB': 24950.0,
-    'MT:AP': 18220.0,
-    'MT:AL': 2302.0,
-    'MT:AM': 1453.0,
-    'MT:RN': 2524.0,
-    'MT:TO': 10290.0,
-    'MT:RS': 1679.0,
-    'MT:RO': 1137.0,
-    'MT:PE': 2452.0,
-    'MT:AC': 1414.0,
-    'MT:RJ': 1575.0,
-    'MT:BA': 1915.0,
-    'MT:MA': 1942.0,
-    'MT:SP': 1326.0,
-    'MT:PI': 1862.0,
-    'MT:ES': 1745.0,
-    'PR:SC': 2510.0,
-    'PR:CE': 26700.0,
-    'PR:GO': 9720.0,
-    'PR:PB': 25450.0,
-    'PR:AP': 28360.0,
-    'PR:AL': 2259.0,
-    'PR:AM': 2734.0,
-    'PR:RN': 2645.0,
-    'PR:TO': 16930.0,
-    'PR:RS': 546.0,
-    'PR:RO': 2412.0,
-    'PR:PE': 2459.0,
-    'PR:AC': 2601.0,
-    'PR:RJ': 675.0,
-    'PR:BA': 1784.0,
-    'PR:MA': 2599.0,
-    'PR:SP': 338.0,
-    'PR:PI': 2362.0,
-    'PR:ES': 1076.0,
-    'SC:CE': 28570.0,
-    'SC:GO': 12150.0,
-    'SC:PB': 26930.0,
-    'SC:AP': 30820.0,
-    'SC:AL': 2402.0,
-    'SC:AM': 2981.0,
-    'SC:RN': 2802.0,
-    'SC:TO': 19310.0,
-    'SC:RS': 376.0,
-    'SC:RO': 2641.0,
-    'SC:PE': 2603.0,
-    'SC:AC': 2809.0,
-    'SC:RJ': 748.0,
-    'SC:BA': 1930.0,
-    'SC:MA': 2821.0,
-    'SC:SP': 489.0,
-    'SC:PI': 2573.0,
-    'SC:ES': 1160.0,
-    'CE:GO': 18540.0,
-    'CE:PB': 5550.0,
-    'CE:AP': 14510.0,
-    'CE:AL': 730.0,
-    'CE:AM': 2383.0,
-    'CE:RN': 435.0,
-    'CE:TO': 13000.0,
-    'CE:RS': 3213.0,
-    'CE:RO': 2855.0,
-    'CE:PE': 629.0,
-    'CE:AC': 3300.0,
-    'CE:RJ': 2190.0,
-    'CE:BA': 1028.0,
-    'CE:MA': 652.0,
-    'CE:SP': 2368.0,
-    'CE:PI': 495.0,
-    'CE:ES': 1855.0,
-    'GO:PB': 18890.0,
-    'GO:AP': 18680.0,
-    'GO:AL': 1656.0,
-    'GO:AM': 1912.0,
-    'GO:RN': 1948.0,
-    'GO:TO': 7240.0,
-    'GO:RS': 1497.0,
-    'GO:RO': 1813.0,
-    'GO:PE': 1829.0,
-    'GO:AC': 2138.0,
-    'GO:RJ': 936.0,
-    'GO:BA': 1225.0,
-    'GO:MA': 1662.0,
-    'GO:SP': 810.0,
-    'GO:PI': 1467.0,
-    'GO:ES': 1022.0,
-    'PB:AP': 19640.0,
-    'PB:AL': 299.0,
-    'PB:AM': 2819.0,
-    'PB:RN': 151.0,
-    'PB:TO': 15210.0,
-    'PB:RS': 3066.0,
-    'PB:RO': 3200.0,
-    'PB:PE': 104.0,
-    'PB:AC': 3632.0,
-    'PB:RJ': 1968.0,
-    'PB:BA': 763.0,
-    'PB:MA': 1162.0,
-    'PB:SP': 2216.0,
-    'PB:PI': 905.0,
-    'PB:ES': 1581.0,
-    'AP:AL': 2009.0,
-    'AP:AM': 1054.0,
-    'AP:RN': 1874.0,
-    'AP:TO': 11770.0,
-    'AP:RS': 3341.0,
-    'AP:RO': 1724.0,
-    'AP:PE': 2005.0,
-    'AP:AC': 2159.0,
-    'AP:RJ': 2687.0,
-    'AP:BA': 2000.0,
-    'AP:MA': 803.0,
-    'AP:SP': 2664.0,
-    'AP:PI': 1079.0,
-    'AP:ES': 2545.0,
-    'AL:AM': 2778.0,
-    'AL:RN': 434.0,
-    'AL:TO': 13830.0,
-    'AL:RS': 2775.0,
-    'AL:RO': 3090.0,
-    'AL:PE': 202.0,
-    'AL:AC': 3510.0,
-    'AL:RJ': 1671.0,
-    'AL:BA': 475.0,
-    'AL:MA': 1234.0,
-    'AL:SP': 1928.0,
-    'AL:PI': 929.0,
-    'AL:ES': 1282.0,
-    'AM:RN': 2765.0,
-    'AM:TO': 15090.0,
-    'AM:RS': 3132.0,
-    'AM:RO': 761.0,
-    'AM:PE': 2833.0,
-    'AM:AC': 1149.0,
-    'AM:RJ': 2849.0,
-    'AM:BA': 2605.0,
-    'AM:MA': 1746.0,
-    'AM:SP': 2689.0,
-    'AM:PI': 1921.0,
-    'AM:ES': 2865.0,
-    'RN:TO': 15270.0,
-    'RN:RS': 3172.0,
-    'RN:RO': 3179.0,
-    'RN:PE': 253.0,
-    'RN:AC': 3616.0,
-    'RN:RJ': 2085.0,
-    'RN:BA': 875.0,
-    'RN:MA': 1071.0,
-    'RN:SP': 2320.0,
-    'RN:PI': 843.0,
-    'RN:ES': 1706.0,
-    'TO:RS': 2222.0,
-    'TO:RO': 1711.0,
-    'TO:PE': 1498.0,
-    'TO:AC': 2127.0,
-    'TO:RJ': 1512.0,
-    'TO:BA': 1114.0,
-    'TO:MA': 964.0,
-    'TO:SP': 1493.0,
-    'TO:PI': 835.0,
-    'TO:ES': 1413.0,
-    'RS:RO': 2706.0,
-    'RS:PE': 2977.0,
-    'RS:AC': 2814.0,
-    'RS:RJ': 1123.0,
-    'RS:BA': 2303.0,
-    'RS:MA': 3142.0,
-    'RS:SP': 852.0,
-    'RS:PI': 2909.0,
-    'RS:ES': 1536.0,
-    'RO:PE': 3190.0,
-    'RO:AC': 449.0,
-    'RO:RJ': 2707.0,
-    'RO:BA': 2808.0,
-    'RO:MA': 2274.0,
-    'RO:SP': 2463.0,
-    'RO:PI': 2362.0,
-    'RO:ES': 2835.0,
-    'PE:AC': 3618.0,
-    'PE:RJ': 1874.0,
-    'PE:BA': 675.0,
-    'PE:MA': 1209.0,
-    'PE:SP': 2128.0,
-    'PE:PI': 934.0,
-    'PE:ES': 1483.0,
-    'AC:RJ': 2982.0,
-    'AC:BA': 3206.0,
-    'AC:MA': 2726.0,
-    'AC:SP': 2704.0,
-    'AC:PI': 2806.0,
-    'AC:ES': 3156.0,
-    'RJ:BA': 1209.0,
-    'RJ:MA': 2266.0,
-    'RJ:SP': 357.0,
-    'RJ:PI': 1979.0,
-    'RJ:ES': 412.0,
-    'BA:MA': 1323.0,
-    'BA:SP': 1453.0,
-    'BA:PI': 994.0,
-    'BA:ES': 839.0,
-    'MA:SP': 2348.0,
-    'MA:PI': 329.0,
-    'MA:ES': 2023.0,
-    'SP:PI': 2091.0,
-    'SP:ES': 741.0,
-    'PI:ES': 1713.0,
-}
+    return REGISTRO.uf(cidade)
 
-AEREAS = _distancias_aereas
+ARQUIVO_DISTANCIAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distancias_todas.csv')
+ARQUIVO_DISTANCIAS_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distancias_aereas.npy')
 
-def get_distancia_aerea(_uf1: str, _uf2: str) -> float:
-    """
-    Retorna a distância aérea entre duas UFs.
+# Matriz n x n de distâncias aéreas (km), linhas e colunas na ordem de MAPA
+# carregada na primeira vez que for usada
+_matriz_aerea: np.ndarray | None = None
+
+def carregar_distancias_aereas(caminho: str = ARQUIVO_DISTANCIAS) -> np.ndarray:
     """
+    Lê o csv de distâncias e monta a matriz simétrica de distâncias aéreas,
+    com linhas e colunas na ordem de MAPA (índices do REGISTRO).
 
-    uf1 = _uf1.upper()
-    uf2 = _uf2.upper()
+    No csv a parte de cima da diagonal é a distância aérea e a parte de
+    baixo é a rodoviária, então só a de cima é usada (e espelhada).
+    """
+    import numpy as np
 
-    key = f'{uf1}:{uf2}'
-    if key in AEREAS:
-        return AEREAS[key]
-    elif f'{uf2}:{uf1}' in AEREAS:
-        return AEREAS[f'{uf2}:{uf1}']
-    else:
-        return 0
+    with open(caminho, encoding='utf-8') as f:
+        colunas = f.readline().rstrip('\n').split(',')[1:]
+    n = len(colunas)
 
-def main():
-    import pandas as pd
-    df = pd.read_csv('distancias_todas.csv')
+    # Células vazias (parte rodoviária incompleta) viram nan
+    tabela = np.genfromtxt(caminho, delimiter=',', skip_header=1,
+                           usecols=range(1, n + 1), filling_values=np.nan,
+                           encoding='utf-8')
+    aerea = np.triu(np.nan_to_num(tabela), 1)
+    aerea = aerea + aerea.T
 
-    global distancias_aereas
+    indices = [REGISTRO.indice_cidade(c) for c in colunas]
+    if None in indices:
+        faltando = [c for c, i in zip(colunas, indices) if i is None]
+        raise ValueError(f'Cidades do csv fora do MAPA: {faltando}')
 
-    distancias_aereas = dict()
-    for i, origem in enumerate(df.index):
-        linha = df.iloc[i]
-        zero_idx = linha[linha == 0].index[0]
-        start_col = df.columns.get_loc(zero_idx) + 1
+    matriz = np.zeros((len(REGISTRO), len(REGISTRO)))
+    matriz[np.ix_(indices, indices)] = aerea
+    return matriz
 
-        for destino in df.columns[start_col:]:
-            custo = float(str(df.at[origem, destino]).replace('.', ''))
+def get_matriz_distancias_aereas() -> np.ndarray:
+    """
+    Matriz de distâncias aéreas, lida do cache .npy quando ele é mais
+    novo que o csv, senão recalculada a partir do csv (e salva no cache)
+    """
+    global _matriz_aerea
+    if _matriz_aerea is not None:
+        return _matriz_aerea
 
-            nome_origem = df.columns[i+1]
-            nome_destino = destino
+    import numpy as np
 
-            uf_origem = get_uf_by_cidade(nome_origem)
-            uf_destino = get_uf_by_cidade(nome_destino)
+    cache_valido = (os.path.exists(ARQUIVO_DISTANCIAS_CACHE)
+                    and os.path.getmtime(ARQUIVO_DISTANCIAS_CACHE) >= os.path.getmtime(ARQUIVO_DISTANCIAS))
+    if cache_valido:
+        _matriz_aerea = np.load(ARQUIVO_DISTANCIAS_CACHE)
+    if _matriz_aerea is None or _matriz_aerea.shape != (len(REGISTRO), len(REGISTRO)):
+        _matriz_aerea = carregar_distancias_aereas()
+        try:
+            np.save(ARQUIVO_DISTANCIAS_CACHE, _matriz_aerea)
+        except OSError:
+            # Sem permissão de escrita: segue sem cache
+            pass
+    return _matriz_aerea
 
-            if uf_origem:
-                nome_origem = uf_origem
+def get_distancia_aerea(_uf1: str, _uf2: str) -> float:
+    """
+    Retorna a distância aérea entre duas UFs.
+    """
+    i = REGISTRO.indice_uf(_uf1.upper())
+    j = REGISTRO.indice_uf(_uf2.upper())
+    if i is None or j is None:
+        return 0
+    return float(get_matriz_distancias_aereas()[i, j])
 
-            if uf_destino:
-                nome_destino = uf_destino
+def main():
+    """Recalcula o cache de distâncias aéreas a partir do csv"""
+    import numpy as np
 
-            distancias_aereas[f'{nome_origem}:{nome_destino}'] = custo
+    matriz = carregar_distancias_aereas()
+    np.save(ARQUIVO_DISTANCIAS_CACHE, matriz)
+    print(f'Matriz {matriz.shape[0]}x{matriz.shape[1]} salva em {ARQUIVO_DISTANCIAS_CACHE}')
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,215 @@
+## Matriz de distâncias (um-para-muitos e muitos-para-muitos)
+## Custo de cada origem até cada destino de uma vez, em vez de N x M buscas
+## separadas: um Dijkstra por origem (uma árvore de caminhos mínimos serve
+## para todos os destinos da linha), que para assim que todos os destinos
+## pedidos estiverem fechados. Com menos destinos que origens as árvores
+## saem dos destinos, pelas arestas ao contrário (uma por coluna).
+##
+## Cada árvore é independente, então as árvores podem ser divididas entre
+## processos (o grafo compilado vai uma vez só para cada processo, pelo
+## worker.iniciar).
+##
+##   matriz = matriz_distancias(grafo, origens, destinos, rotas=True)
+##   matriz.custos[i, j]            # numpy, SEM_ROTA se não há caminho
+##   trajeto, custo = matriz.rota(i, j)
+##
+## uso: python matriz.py [-o origens] [-d destinos] [-p processos] [--rotas]
+
+from __future__ import annotations
+import argparse
+import heapq
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from typing import TYPE_CHECKING, Sequence, override
+
+import worker
+from grafo_compilado import GrafoCompilado
+from main import Node, Vertice, get_graph, resolver_cidade
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SEM_ROTA = -1
+
+def _arvore(grafo: GrafoCompilado, raiz: int, alvos: Sequence[int], reverso: bool,
+            rotas: bool) -> tuple[array[int], array[int] | None]:
+    """
+    Dijkstra a partir de raiz até fechar todos os alvos
+
+    retorna o custo até cada alvo (na ordem de alvos, SEM_ROTA se não alcançado)
+    e, com rotas, o pai de cada nó na árvore (SEM_ROTA fora dela). Com
+    reverso o custo é de cada alvo até raiz e o pai é o próximo nó em direção a raiz.
+    """
+    vizinhos = grafo.vizinhos_reversos if reverso else grafo.vizinhos
+    custos: dict[int, int] = {raiz: 0}
+    pais = array('i', [SEM_ROTA]) * len(grafo) if rotas else None
+    fechado: set[int] = set()
+    faltam = set(alvos)
+    desempate = count()
+
+    fronteira: list[tuple[int, int, int]] = [(0, next(desempate), raiz)]
+    while fronteira and faltam:
+        g, _, atual = heapq.heappop(fronteira)
+        if atual in fechado:
+            continue
+        fechado.add(atual)
+        faltam.discard(atual)
+
+        for conn, custo in vizinhos(atual):
+            novo_g = g + custo
+            if novo_g >= custos.get(conn, novo_g + 1):
+                continue
+            custos[conn] = novo_g
+            if pais is not None:
+                pais[conn] = atual
+            heapq.heappush(fronteira, (novo_g, next(desempate), conn))
+
+    # Alvos que não foram fechados não são alcançáveis a partir de raiz
+    linha = array('q', [custos[a] if a in fechado else SEM_ROTA for a in alvos])
+    return linha, pais
+
+
+def _arvores(raizes: list[int], alvos: list[int], reverso: bool, rotas: bool) -> list[tuple[array[int], array[int] | None]]:
+    """Bloco de árvores calculado num worker (depois de worker.iniciar)"""
+    grafo = worker.grafo()
+    return [_arvore(grafo, raiz, alvos, reverso, rotas) for raiz in raizes]
+
+
+class MatrizDistancias():
+    """
+    Resultado de matriz_distancias
+
+    - custos: matriz numpy (len(origens) x len(destinos)) com o custo mínimo
+        de cada origem a cada destino (SEM_ROTA se não há caminho)
+    - pais: uma linha por árvore com o pai de cada nó (só com rotas=True);
+        as árvores são das origens, ou dos destinos se reverso
+    """
+
+    def __init__(self, origens: list[Vertice], destinos: list[Vertice], custos: np.ndarray,
+                 pais: np.ndarray | None, reverso: bool, nos: list[Node] | None = None):
+        self.origens: list[Vertice] = origens
+        self.destinos: list[Vertice] = destinos
+        self.custos: np.ndarray = custos
+        self.pais: np.ndarray | None = pais
+        self.reverso: bool = reverso
+        self._nos: list[Node] | None = nos
+        self._ids: dict[Vertice, int] | None = None if nos is None else {no: i for i, no in enumerate(nos)}
+
+    @override
+    def __repr__(self) -> str:
+        return f'MatrizDistancias({len(self.origens)} x {len(self.destinos)})'
+
+    def _id(self, no: Vertice) -> int:
+        return no if self._ids is None else self._ids[no]  # type: ignore[return-value]
+
+    def custo(self, i: int, j: int) -> int | None:
+        c = int(self.custos[i, j])
+        return None if c == SEM_ROTA else c
+
+    def rota(self, i: int, j: int) -> tuple[list[Vertice], int]:
+        """
+        Trajeto e custo de origens[i] a destinos[j] (trajeto vazio se não há caminho)
+        Precisa de rotas=True em matriz_distancias.
+        """
+        if self.pais is None:
+            raise ValueError('Matriz calculada sem rotas (use rotas=True)')
+        custo = self.custo(i, j)
+        if custo is None:
+            return [], 0
+        origem, destino = self._id(self.origens[i]), self._id(self.destinos[j])
+        if self.reverso:
+            # Árvore do destino: o pai é o próximo nó do caminho
+            arvore = self.pais[j]
+            trajeto = [origem]
+            while trajeto[-1] != destino:
+                trajeto.append(int(arvore[trajeto[-1]]))
+        else:
+            arvore = self.pais[i]
+            trajeto = [destino]
+            while trajeto[-1] != origem:
+                trajeto.append(int(arvore[trajeto[-1]]))
+            trajeto.reverse()
+        if self._nos is not None:
+            return [self._nos[no] for no in trajeto], custo
+        return trajeto, custo  # type: ignore[return-value]
+
+
+def matriz_distancias(_mapa: list[Node] | GrafoCompilado, origens: Sequence[Vertice], destinos: Sequence[Vertice],
+                      rotas: bool = False, processos: int = 1, tamanho_bloco: int = 16) -> MatrizDistancias:
+    """
+    Custo mínimo de cada origem a cada destino
+
+    - rotas: guarda as árvores para reconstruir os trajetos com MatrizDistancias.rota
+    - processos: divide as árvores entre processos (1 roda tudo aqui mesmo)
+    - tamanho_bloco: árvores mandadas de uma vez para cada processo
+    """
+    import numpy as np
+
+    if isinstance(_mapa, GrafoCompilado):
+        grafo = _mapa
+        nos = None
+        ids: dict[Vertice, int] | None = None
+    else:
+        grafo = GrafoCompilado.compilar(_mapa)
+        nos = _mapa
+        ids = {no: i for i, no in enumerate(_mapa)}
+
+    def id_no(no: Vertice) -> int:
+        return no if ids is None else ids[no]  # type: ignore[return-value]
+
+    # Uma árvore por linha ou por coluna, o que der menos árvores
+    reverso = len(destinos) < len(origens)
+    raizes = [id_no(no) for no in (destinos if reverso else origens)]
+    alvos = [id_no(no) for no in (origens if reverso else destinos)]
+
+    if processos <= 1 or len(raizes) <= tamanho_bloco:
+        arvores = [_arvore(grafo, raiz, alvos, reverso, rotas) for raiz in raizes]
+    else:
+        blocos = [raizes[i:i + tamanho_bloco] for i in range(0, len(raizes), tamanho_bloco)]
+        with ProcessPoolExecutor(max_workers=processos, initializer=worker.iniciar, initargs=(grafo,)) as executor:
+            futuros = [executor.submit(_arvores, bloco, alvos, reverso, rotas) for bloco in blocos]
+            arvores = [arvore for futuro in futuros for arvore in futuro.result()]
+
+    custos = np.empty((len(raizes), len(alvos)), dtype=np.int64)
+    for k, (linha, _) in enumerate(arvores):
+        custos[k] = np.frombuffer(linha, dtype=np.int64)
+    if reverso:
+        custos = np.ascontiguousarray(custos.T)
+
+    pais = None
+    if rotas:
+        pais = np.empty((len(raizes), len(grafo)), dtype=np.int32)
+        for k, (_, arvore) in enumerate(arvores):
+            pais[k] = np.frombuffer(arvore, dtype=np.int32)  # type: ignore[arg-type]
+
+    return MatrizDistancias(list(origens), list(destinos), custos, pais, reverso, nos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Matriz de distâncias entre capitais')
+    parser.add_argument('-o', '--origens', nargs='+', help='capitais ou UFs (padrão: todas)')
+    parser.add_argument('-d', '--destinos', nargs='+', help='capitais ou UFs (padrão: todas)')
+    parser.add_argument('-p', '--processos', type=int, default=1)
+    parser.add_argument('--rotas', action='store_true', help='mostra os trajetos em vez da matriz')
+    args = parser.parse_args()
+
+    grafo = GrafoCompilado.compilar(get_graph())
+    origens = [resolver_cidade(c, grafo) for c in args.origens] if args.origens else list(range(len(grafo)))
+    destinos = [resolver_cidade(c, grafo) for c in args.destinos] if args.destinos else list(range(len(grafo)))
+    matriz = matriz_distancias(grafo, origens, destinos, rotas=args.rotas, processos=args.processos)
+
+    if args.rotas:
+        for i, origem in enumerate(origens):
+            for j, destino in enumerate(destinos):
+                trajeto, custo = matriz.rota(i, j)
+                print(f"{grafo.nomes[origem]} -> {grafo.nomes[destino]}: {custo}  {'->'.join(grafo.nomes[no] for no in trajeto)}")
+        return
+
+    print(' ' * 16 + ''.join(f'{grafo.nomes[no][:7]:>8}' for no in destinos))
+    for i, origem in enumerate(origens):
+        print(f'{grafo.nomes[origem][:15]:<16}' + ''.join(f'{c:>8}' for c in matriz.custos[i]))
+
+
+if __name__ == '__main__':
+    main()
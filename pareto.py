@@ -0,0 +1,176 @@
+## Rotas Pareto-ótimas por custo e beleza
+## Em vez de misturar a beleza na heurística do a_star (o que faz ele perder
+## o custo mínimo), procura todas as rotas que não são piores que outra nos
+## dois critérios ao mesmo tempo: menor custo e mais beleza.
+##
+## Somar beleza sem limite premia dar voltas (cada cidade a mais soma pontos),
+## então a busca troca a beleza pela "feiura" de cada cidade visitada depois da
+## origem, maximo - beleza, como na h_func_beleza: dois critérios não negativos
+## para minimizar, o que deixa a busca por rótulos exata e sem ciclos.
+## A feiura só equivale à beleza entre rotas com o mesmo número de cidades:
+## uma rota com mais cidades pode ter mais beleza e mais feiura. Por isso as
+## rotas da fronteira (custo, feiura) passam por um filtro final de dominância
+## em (custo, beleza). Rotas que só ganham beleza por visitar mais cidades
+## ficam de fora por construção (é o desvio que a feiura quer evitar).
+##
+## Busca por rótulos (label-setting) no estilo NAMOA*: cada rótulo é um caminho
+## parcial (nó, custo, feiura, rótulo pai), guardado em arrays paralelos. A fila
+## é ordenada lexicograficamente por (custo, feiura) somados aos limites
+## inferiores até o destino (dois Dijkstras reversos), então os rótulos de cada
+## nó saem em ordem de custo e a checagem de dominância é O(1): basta comparar
+## a feiura com a menor feiura já fixada no nó (e no destino).
+##
+##   for trajeto, custo, beleza in fronteira_pareto(mapa, source, dest):
+##       ...   # do mais barato (e menos belo) ao mais belo (e mais caro)
+##
+## uso: python pareto.py origem destino
+
+from __future__ import annotations
+import argparse
+import heapq
+from array import array
+from typing import Callable
+
+from grafo_compilado import GrafoCompilado
+from main import Node, Vertice, dijkstra, get_beleza, get_conexoes, get_conexoes_reversas, get_graph, resolver_cidade
+
+# Feiura de quem ainda não tem rótulo fixado
+_SEM_ROTULO = -1
+
+
+def _limites_feiura(_mapa: list[Node] | GrafoCompilado, dest: Vertice, feiura: Callable[[Vertice], int]) -> dict[Vertice, int]:
+    """Menor feiura de cada nó até dest (Dijkstra reverso com peso feiura(nó de chegada))"""
+    reversas = get_conexoes_reversas(_mapa)
+    limites: dict[Vertice, int] = {dest: 0}
+    fronteira: list[tuple[int, int, Vertice]] = [(0, 0, dest)]
+    desempate = 1
+    fechados: set[Vertice] = set()
+    while fronteira:
+        f, _, atual = heapq.heappop(fronteira)
+        if atual in fechados:
+            continue
+        fechados.add(atual)
+        f_aresta = feiura(atual)
+        for origem, _ in reversas(atual):
+            novo_f = f + f_aresta
+            if novo_f < limites.get(origem, novo_f + 1):
+                limites[origem] = novo_f
+                heapq.heappush(fronteira, (novo_f, desempate, origem))
+                desempate += 1
+    return limites
+
+
+def fronteira_pareto(_mapa: list[Node] | GrafoCompilado, source: Vertice, dest: Vertice,
+                     beleza: Callable[[Vertice], int] = get_beleza, maximo: int = 10) -> list[tuple[list[Vertice], int, int]]:
+    """
+    Fronteira de Pareto de source a dest: lista de (trajeto, custo, beleza),
+    em ordem crescente de custo (e de beleza). Nenhuma rota da lista tem
+    outra com custo menor ou igual e beleza maior ou igual (a não ser empate nos dois).
+
+    - beleza: nota de cada cidade, entre 0 e maximo (padrão: BELEZAS)
+    - a beleza de uma rota é a soma das notas das cidades dela
+    - a busca minimiza (custo, feiura); das rotas que ela acha, só as que
+        não são dominadas em (custo, beleza) são devolvidas
+    """
+    def feiura(no: Vertice) -> int:
+        return maximo - beleza(no)
+
+    if isinstance(_mapa, GrafoCompilado):
+        nos: list[Vertice] = list(range(len(_mapa)))
+        ids: dict[Vertice, int] | None = None
+    else:
+        nos = list(_mapa)
+        ids = {no: i for i, no in enumerate(nos)}
+    conexoes = get_conexoes(_mapa)
+
+    # Limites inferiores até dest nos dois critérios (consistentes)
+    limite_custo = dijkstra(_mapa, dest, reverso=True)[0]
+    if source not in limite_custo:
+        return []
+    limite_feiura = _limites_feiura(_mapa, dest, feiura)
+
+    # Rótulos em arrays paralelos (o índice é o id do rótulo)
+    rotulo_no = array('i')
+    rotulo_custo = array('q')
+    rotulo_feiura = array('q')
+    rotulo_pai = array('i')
+    # Menor feiura entre os rótulos já fixados em cada nó
+    melhor_feiura = array('q', [_SEM_ROTULO]) * len(nos)
+
+    def id_no(no: Vertice) -> int:
+        return no if ids is None else ids[no]  # type: ignore[return-value]
+
+    def dominado(i: int, f: int) -> bool:
+        return melhor_feiura[i] != _SEM_ROTULO and f >= melhor_feiura[i]
+
+    i_dest = id_no(dest)
+    rotulo_no.append(id_no(source))
+    rotulo_custo.append(0)
+    rotulo_feiura.append(0)
+    rotulo_pai.append(-1)
+    fila: list[tuple[int, int, int]] = [(limite_custo[source], limite_feiura[source], 0)]
+    no_destino: list[int] = []
+
+    while fila:
+        _, _, rotulo = heapq.heappop(fila)
+        i = rotulo_no[rotulo]
+        f = rotulo_feiura[rotulo]
+        no = nos[i]
+        # Dominado por um rótulo fixado depois que este entrou na fila,
+        # ou não tem como chegar no destino melhor que uma rota já achada
+        if dominado(i, f) or dominado(i_dest, f + limite_feiura[no]):
+            continue
+        melhor_feiura[i] = f
+        if i == i_dest:
+            no_destino.append(rotulo)
+            continue
+
+        g = rotulo_custo[rotulo]
+        for conn, custo in conexoes(no):
+            if conn not in limite_custo:
+                continue
+            j = id_no(conn)
+            novo_f = f + feiura(conn)
+            if dominado(j, novo_f) or dominado(i_dest, novo_f + limite_feiura[conn]):
+                continue
+            novo = len(rotulo_no)
+            rotulo_no.append(j)
+            rotulo_custo.append(g + custo)
+            rotulo_feiura.append(novo_f)
+            rotulo_pai.append(rotulo)
+            heapq.heappush(fila, (g + custo + limite_custo[conn], novo_f + limite_feiura[conn], novo))
+
+    candidatas: list[tuple[list[Vertice], int, int]] = []
+    for rotulo in no_destino:
+        trajeto: list[Vertice] = []
+        r = rotulo
+        while r != -1:
+            trajeto.append(nos[rotulo_no[r]])
+            r = rotulo_pai[r]
+        trajeto.reverse()
+        candidatas.append((trajeto, rotulo_custo[rotulo], sum(beleza(no) for no in trajeto)))
+
+    # Não dominadas em (custo, beleza): em ordem de custo (a mais bela primeiro
+    # no empate), cada rota tem de ser mais bela que todas as anteriores
+    rotas: list[tuple[list[Vertice], int, int]] = []
+    for trajeto, custo, soma in sorted(candidatas, key=lambda rota: (rota[1], -rota[2])):
+        if not rotas or soma > rotas[-1][2] or (custo, soma) == rotas[-1][1:]:
+            rotas.append((trajeto, custo, soma))
+    return rotas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Rotas Pareto-ótimas (custo x beleza) entre duas capitais')
+    parser.add_argument('origem', help='capital ou UF')
+    parser.add_argument('destino', help='capital ou UF')
+    args = parser.parse_args()
+
+    mapa = get_graph()
+    source, dest = mapa[resolver_cidade(args.origem)], mapa[resolver_cidade(args.destino)]
+    print('{:>6} {:>7}  {}'.format('custo', 'beleza', 'trajeto'))
+    for trajeto, custo, beleza in fronteira_pareto(mapa, source, dest):
+        print(f"{custo:>6} {beleza:>7}  {'->'.join(no.name for no in trajeto)}")  # type: ignore[union-attr]
+
+
+if __name__ == '__main__':
+    main()
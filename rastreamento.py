@@ -0,0 +1,160 @@
+## Rastreamento das buscas
+## Observador que grava o que a busca fez no formato Chrome trace (JSON),
+## que abre em chrome://tracing, Perfetto (ui.perfetto.dev) ou speedscope
+## como linha do tempo / flamegraph:
+##   - um evento "busca" cobrindo cada consulta inteira
+##   - dentro dele, um evento por expansão amostrada (do on_expand até a
+##     próxima expansão), com o nó e o g nos args
+##   - contadores de fronteira, gerados e descartados nas expansões amostradas
+##
+##   amostrador = AmostradorTrace(a_cada=10)
+##   a_star(mapa, source, dest, observador=amostrador)
+##   amostrador.salvar('busca.trace.json')
+##
+## uso: python rastreamento.py origem destino [-a algoritmo] [-n a_cada] [-o arquivo.json]
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Sequence, override
+
+from main import ALGORITMOS, ObservadorBusca, Vertice, create_mapa, resolver_cidade
+
+
+class AmostradorTrace(ObservadorBusca):
+    """
+    Observador que guarda eventos de trace de uma ou mais buscas
+
+    - a_cada: só uma a cada a_cada expansões vira evento (1 grava todas)
+    - nomes: nomes dos nós, para buscas em GrafoCompilado (ids inteiros)
+    - eventos: lista de eventos no formato Chrome trace
+
+    Uma busca começa no primeiro evento depois de um on_goal (ou de encerrar()).
+    Buscas que não acham o destino não chamam on_goal; encerrar() fecha a busca
+    em andamento e é chamado por trace() e salvar().
+    """
+
+    def __init__(self, a_cada: int = 1, nomes: Sequence[str] | None = None, nome_busca: str = 'busca'):
+        if a_cada < 1:
+            raise ValueError('a_cada deve ser positivo')
+        self.a_cada: int = a_cada
+        self.nomes: Sequence[str] | None = nomes
+        self.nome_busca: str = nome_busca
+        self.eventos: list[dict[str, object]] = []
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+        self._inicio_busca: float | None = None
+        # (nó, g, instante) da expansão amostrada ainda aberta
+        self._expansao: tuple[Vertice, int, float] | None = None
+        self._expandidos = 0
+        self._gerados = 0
+        self._descartados = 0
+
+    def _nome(self, no: Vertice) -> str:
+        if isinstance(no, int):
+            return self.nomes[no] if self.nomes is not None else str(no)
+        return no.name
+
+    @staticmethod
+    def _agora() -> float:
+        # Chrome trace usa microssegundos
+        return time.perf_counter() * 1e6
+
+    def _evento(self, nome: str, fase: str, ts: float, **campos: object) -> None:
+        self.eventos.append({'name': nome, 'cat': 'busca', 'ph': fase, 'ts': ts,
+                             'pid': self._pid, 'tid': self._tid, **campos})
+
+    def _comecar(self) -> None:
+        if self._inicio_busca is None:
+            self._inicio_busca = self._agora()
+            self._expandidos = self._gerados = self._descartados = 0
+
+    def _fechar_expansao(self, agora: float) -> None:
+        if self._expansao is not None:
+            no, g, ts = self._expansao
+            self._evento(self._nome(no), 'X', ts, dur=agora - ts, args={'g': g})
+            self._expansao = None
+
+    @override
+    def on_push(self, no: Vertice, g: int) -> None:
+        self._comecar()
+        self._gerados += 1
+
+    @override
+    def on_prune(self, no: Vertice, g: int) -> None:
+        self._comecar()
+        self._descartados += 1
+
+    @override
+    def on_expand(self, no: Vertice, g: int) -> None:
+        self._comecar()
+        agora = self._agora()
+        self._fechar_expansao(agora)
+        self._expandidos += 1
+        if self._expandidos % self.a_cada == 0:
+            self._expansao = (no, g, agora)
+            self._evento('fronteira', 'C', agora, args={
+                'fronteira': self._gerados - self._expandidos - self._descartados,
+                'gerados': self._gerados,
+                'descartados': self._descartados,
+            })
+
+    @override
+    def on_goal(self, no: Vertice, custo: int) -> None:
+        self._comecar()
+        self._encerrar(self._nome(no), custo)
+
+    def _encerrar(self, destino: str | None, custo: int | None) -> None:
+        if self._inicio_busca is None:
+            return
+        agora = self._agora()
+        self._fechar_expansao(agora)
+        self._evento(self.nome_busca, 'X', self._inicio_busca, dur=agora - self._inicio_busca, args={
+            'destino': destino,
+            'custo': custo,
+            'expandidos': self._expandidos,
+            'gerados': self._gerados,
+            'descartados': self._descartados,
+        })
+        self._inicio_busca = None
+
+    def encerrar(self) -> None:
+        """Fecha a busca em andamento (usado quando ela não achou o destino)"""
+        self._encerrar(None, None)
+
+    def trace(self) -> dict[str, object]:
+        self.encerrar()
+        return {'traceEvents': self.eventos, 'displayTimeUnit': 'ms'}
+
+    def salvar(self, caminho: str) -> None:
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.trace(), arquivo, ensure_ascii=False)
+
+    @override
+    def __repr__(self) -> str:
+        return f'AmostradorTrace(a_cada={self.a_cada}, {len(self.eventos)} eventos)'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Grava o trace de uma busca (formato Chrome trace)')
+    parser.add_argument('origem', help='capital ou UF')
+    parser.add_argument('destino', help='capital ou UF')
+    parser.add_argument('-a', '--algoritmo', default='a_star', choices=list(ALGORITMOS))
+    parser.add_argument('-n', '--a-cada', type=int, default=1, help='grava uma a cada N expansões')
+    parser.add_argument('-o', '--saida', default='busca.trace.json')
+    args = parser.parse_args()
+
+    mapa = create_mapa()
+    source, dest = mapa[resolver_cidade(args.origem)], mapa[resolver_cidade(args.destino)]
+    amostrador = AmostradorTrace(args.a_cada, nome_busca=args.algoritmo)
+    trajeto, custo = ALGORITMOS[args.algoritmo](mapa, source, dest, observador=amostrador)
+    amostrador.salvar(args.saida)
+    print(f"{'->'.join(n.name for n in trajeto)} (custo {custo})")
+    print(f'{len(amostrador.eventos)} eventos em {args.saida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+## Replanejamento incremental (LPA*) quando os custos das estradas mudam
+## Guarda o estado da última busca (g e rhs de cada nó) e, depois de um
+## alterar_custos(), reexpande os nós cuja distância até eles mudou (e os
+## que dependiam deles), em vez de refazer a busca inteira. A origem e o
+## destino ficam fixos.
+##
+##   g(v): distância de source até v calculada na última expansão de v
+##   rhs(v): menor g(p) + custo(p, v) entre os predecessores p de v
+##   v é inconsistente (e está na fila) quando g(v) != rhs(v)
+##
+## A fila é ordenada por [min(g, rhs) + h, min(g, rhs)], como no A*, e a
+## busca para quando o destino fica consistente e nada na fila é menor que ele.
+## A heurística tem de ser consistente com os custos atuais (sem h_func é 0).
+##
+## Quando compensa: alterações locais, longe da origem ou que não mexem nas
+## distâncias até a maior parte dos nós já expandidos (um trecho que ficou
+## mais barato perto do destino, uma estrada fora da rota que encareceu).
+## Quando não compensa: alterações perto da origem ou na própria rota. Um
+## aumento faz cada nó afetado ser expandido duas vezes (uma para esquecer o
+## g antigo, outra para o novo), então encarecer a rota inteira, como no
+## exemplo da linha de comando, expande mais que um Dijkstra do zero.
+## Num grafo rodoviario de 2500 nós (gerador.py), com o Dijkstra até o
+## destino expandindo 2499: mudar uma aresta perto do destino custou 2 a 4
+## expansões, encarecer 5 estradas fora da rota 398, encarecer uma perto da
+## origem 4324 e a rota inteira 4086.
+##
+##   planejador = PlanejadorLPA(mapa, source, dest)
+##   trajeto, custo = planejador.rota()
+##   alterar_custos([(no1, no2, 900)])
+##   trajeto, custo = planejador.rota()   # só repara o que a alteração afetou
+##
+## uso: python replanejamento.py origem destino [-f fator]
+
+from __future__ import annotations
+import argparse
+import heapq
+import math
+from itertools import count
+from typing import Callable, override
+
+from main import (DESTINO_NAO_ENCONTRADO, EstatisticasBusca, Node, OuvinteCustos, a_star, alterar_custos, get_conexoes,
+                  get_conexoes_reversas, get_graph, ouvintes_custos, resolver_cidade)
+
+# Chave de prioridade do LPA*: (min(g, rhs) + h, min(g, rhs))
+Chave = tuple[float, float]
+
+
+class PlanejadorLPA(OuvinteCustos):
+    """
+    Menor caminho de source a dest no grafo de Nodes, mantido atualizado
+    entre chamadas de rota() conforme as alterações feitas por alterar_custos()
+    (custos sempre positivos, o que garante a volta pelo trajeto em rota())
+
+    - h_func: heurística no formato do a_star (h_func([no], dest));
+        precisa ser consistente com os custos atuais, senão use None
+    - expandidos: nós expandidos na última chamada de rota()
+    """
+
+    def __init__(self, _mapa: list[Node], source: Node, dest: Node,
+                 h_func: Callable[[list[Node], Node], int] | None = None):
+        self.source: Node = source
+        self.dest: Node = dest
+        self.expandidos: int = 0
+        self._conexoes = get_conexoes(_mapa)
+        self._reversas = get_conexoes_reversas(_mapa)
+        self._h_func = h_func
+        self._h: dict[Node, int] = {}
+        self._g: dict[Node, float] = {}
+        self._rhs: dict[Node, float] = {source: 0}
+        # Fila com remoção preguiçosa: a entrada só vale se a chave bate com na_fila
+        self._fila: list[tuple[float, float, int, Node]] = []
+        self._na_fila: dict[Node, Chave] = {}
+        self._desempate = count()
+        # Nós cujo rhs tem de ser refeito na próxima rota()
+        self._pendentes: set[Node] = set()
+        ouvintes_custos.add(self)
+        self._inserir(source)
+
+    def _heuristica(self, no: Node) -> int:
+        if self._h_func is None:
+            return 0
+        h = self._h.get(no)
+        if h is None:
+            h = self._h[no] = self._h_func([no], self.dest)
+        return h
+
+    def _chave(self, no: Node) -> Chave:
+        m = min(self._g.get(no, math.inf), self._rhs.get(no, math.inf))
+        return (m + self._heuristica(no), m)
+
+    def _inserir(self, no: Node) -> None:
+        chave = self._chave(no)
+        self._na_fila[no] = chave
+        heapq.heappush(self._fila, (chave[0], chave[1], next(self._desempate), no))
+
+    def _topo(self) -> Chave:
+        """Menor chave válida da fila (descarta as entradas velhas)"""
+        while self._fila:
+            k1, k2, _, no = self._fila[0]
+            if self._na_fila.get(no) == (k1, k2):
+                return (k1, k2)
+            heapq.heappop(self._fila)
+        return (math.inf, math.inf)
+
+    def _atualizar_vertice(self, no: Node) -> None:
+        if no is not self.source:
+            self._rhs[no] = min((self._g.get(p, math.inf) + custo for p, custo in self._reversas(no)), default=math.inf)
+        self._na_fila.pop(no, None)
+        if self._g.get(no, math.inf) != self._rhs.get(no, math.inf):
+            self._inserir(no)
+
+    @override
+    def custos_alterados(self, alteracoes: list[tuple[Node, Node, int, int]]) -> None:
+        for origem, destino, _, _ in alteracoes:
+            # Se origem nunca foi alcançada a aresta não entra em rhs(destino)
+            # (isso também deixa de fora as alterações de outros grafos)
+            if origem in self._g:
+                self._pendentes.add(destino)
+
+    def _aplicar_alteracoes(self) -> None:
+        for no in self._pendentes:
+            self._atualizar_vertice(no)
+        self._pendentes.clear()
+
+    def _calcular(self) -> None:
+        while self._topo() < self._chave(self.dest) or \
+                self._rhs.get(self.dest, math.inf) != self._g.get(self.dest, math.inf):
+            _, _, _, no = heapq.heappop(self._fila)
+            del self._na_fila[no]
+            self.expandidos += 1
+            g = self._g.get(no, math.inf)
+            rhs = self._rhs.get(no, math.inf)
+            if g > rhs:
+                # Ficou mais perto: fixa e propaga
+                self._g[no] = rhs
+                for conn, _ in self._conexoes(no):
+                    self._atualizar_vertice(conn)
+            else:
+                # Ficou mais longe: volta a ser desconhecido e refaz ele e os sucessores
+                self._g[no] = math.inf
+                self._atualizar_vertice(no)
+                for conn, _ in self._conexoes(no):
+                    self._atualizar_vertice(conn)
+
+    def rota(self) -> tuple[list[Node], int]:
+        """Menor caminho (trajeto, custo) com os custos atuais"""
+        self.expandidos = 0
+        self._aplicar_alteracoes()
+        self._calcular()
+        custo = self._g.get(self.dest, math.inf)
+        if custo == math.inf:
+            return DESTINO_NAO_ENCONTRADO
+
+        # Volta do destino pelo predecessor que dá o g de cada nó
+        trajeto = [self.dest]
+        atual = self.dest
+        while atual is not self.source:
+            atual = min(self._reversas(atual), key=lambda pc: self._g.get(pc[0], math.inf) + pc[1])[0]
+            trajeto.append(atual)
+        trajeto.reverse()
+        return trajeto, int(custo)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replaneja a rota entre duas capitais quando os custos mudam')
+    parser.add_argument('origem', help='capital ou UF')
+    parser.add_argument('destino', help='capital ou UF')
+    parser.add_argument('-f', '--fator', type=int, default=3,
+                        help='multiplica o custo das estradas da rota por este fator a cada rodada')
+    parser.add_argument('-r', '--rodadas', type=int, default=3)
+    args = parser.parse_args()
+
+    def zero(trajeto: list[Node], destino: Node) -> int:
+        return 0
+
+    mapa = get_graph()
+    source, dest = mapa[resolver_cidade(args.origem)], mapa[resolver_cidade(args.destino)]
+    planejador = PlanejadorLPA(mapa, source, dest)
+    for rodada in range(args.rodadas + 1):
+        trajeto, custo = planejador.rota()
+        # Dijkstra do zero até o destino, para comparar
+        estatisticas = EstatisticasBusca()
+        a_star(mapa, source, dest, zero, estatisticas=estatisticas)  # type: ignore[arg-type]
+        print(f"{rodada}. {custo:6}  {'->'.join(no.name for no in trajeto)}"
+              f'  ({planejador.expandidos} expandidos, dijkstra: {estatisticas.expandidos})')
+        alterar_custos((u, v, u.get_cost(v) * args.fator) for u, v in zip(trajeto, trajeto[1:]))  # type: ignore[operator]
+
+
+if __name__ == '__main__':
+    main()
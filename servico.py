@@ -0,0 +1,275 @@
+## Serviço HTTP de rotas
+## Servidor asyncio (só biblioteca padrão) que monta o grafo das capitais uma
+## vez e responde consultas de rota. As buscas rodam num pool de processos
+## (o mesmo worker do modo em lote, com cache de rotas por processo) e as
+## consultas que chegam juntas são agrupadas num bloco só para o pool.
+##
+##   GET /rota?origem=AC&destino=Porto%20Alegre&algoritmo=a_star
+##       -> {"origem": ..., "destino": ..., "algoritmo": ..., "trajeto": [...], "custo": ...}
+##   GET /algoritmos -> lista dos algoritmos aceitos
+##   GET /saude      -> {"status": "ok", ...}
+##   GET /metricas   -> consultas, erros, blocos, latência (percentis)...
+##
+## uso: python servico.py [--host 127.0.0.1] [--porta 8080] [-p processos]
+##                        [--grafo capitais.grf] [-b tamanho_bloco] [--janela ms] [-c tamanho_cache]
+## cliente: python cliente.py AC RS [-a algoritmo]
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import worker
+from grafo_compilado import GrafoCompilado
+from lote import ALGORITMO_PADRAO, processar_bloco
+from main import ALGORITMOS, get_graph
+
+# Tamanho máximo do cabeçalho de uma requisição
+LIMITE_CABECALHO = 16 * 1024
+
+
+class ServicoRotas():
+    """
+    Estado do serviço: grafo, pool de workers, fila de consultas e métricas
+
+    - processos: workers do pool (1 ou menos roda as buscas numa thread)
+    - tamanho_bloco: máximo de consultas mandadas de uma vez para um worker
+    - janela: segundos que o primeiro pedido de um bloco espera por outros
+    - tamanho_cache: rotas no cache de cada worker (0 desliga)
+    """
+
+    def __init__(self, grafo: GrafoCompilado, processos: int = os.cpu_count() or 1, tamanho_bloco: int = 64,
+                 janela: float = 0.002, tamanho_cache: int = 4096):
+        self.grafo: GrafoCompilado = grafo
+        self.processos: int = max(1, processos)
+        self.tamanho_bloco: int = tamanho_bloco
+        self.janela: float = janela
+        self.tamanho_cache: int = tamanho_cache
+        self._executor: Executor | None = None
+        self._fila: asyncio.Queue[tuple[str, asyncio.Future[str]]] | None = None
+        self._despachante: asyncio.Task[None] | None = None
+        # No máximo 2 blocos por worker em andamento, como no modo em lote
+        self._vagas: asyncio.Semaphore | None = None
+        self._blocos_em_andamento: set[asyncio.Task[None]] = set()
+
+        self.inicio: float = time.time()
+        self.consultas: int = 0
+        self.erros: int = 0
+        self.falhas_pool: int = 0
+        self.blocos: int = 0
+        self.consultas_em_blocos: int = 0
+        # Latências (ms) das últimas consultas, para os percentis
+        self.latencias: deque[float] = deque(maxlen=1000)
+
+    def _criar_executor(self) -> Executor:
+        if self.processos <= 1:
+            worker.iniciar(self.grafo, self.tamanho_cache)
+            return ThreadPoolExecutor(max_workers=1)
+        return ProcessPoolExecutor(max_workers=self.processos, initializer=worker.iniciar,
+                                   initargs=(self.grafo, self.tamanho_cache))
+
+    def iniciar_pool(self) -> None:
+        self._executor = self._criar_executor()
+        self._fila = asyncio.Queue()
+        self._vagas = asyncio.Semaphore(2 * self.processos)
+        self._despachante = asyncio.create_task(self._despachar())
+
+    async def encerrar(self) -> None:
+        if self._despachante is not None:
+            self._despachante.cancel()
+        if self._blocos_em_andamento:
+            await asyncio.gather(*self._blocos_em_andamento, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def rota(self, origem: str, destino: str, algoritmo: str) -> str:
+        """Resultado (JSON) de uma consulta, calculado no pool junto com as que chegarem ao mesmo tempo"""
+        assert self._fila is not None, 'pool não iniciado'
+        linha = json.dumps({'origem': origem, 'destino': destino, 'algoritmo': algoritmo}, ensure_ascii=False)
+        futuro: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        await self._fila.put((linha, futuro))
+        return await futuro
+
+    async def _despachar(self) -> None:
+        """Junta as consultas da fila em blocos e manda cada bloco para o pool"""
+        assert self._fila is not None and self._vagas is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            bloco = [await self._fila.get()]
+            limite = loop.time() + self.janela
+            while len(bloco) < self.tamanho_bloco:
+                if not self._fila.empty():
+                    bloco.append(self._fila.get_nowait())
+                    continue
+                espera = limite - loop.time()
+                if espera <= 0:
+                    break
+                try:
+                    bloco.append(await asyncio.wait_for(self._fila.get(), espera))
+                except TimeoutError:
+                    break
+
+            await self._vagas.acquire()
+            tarefa = asyncio.create_task(self._executar(bloco))
+            self._blocos_em_andamento.add(tarefa)
+            tarefa.add_done_callback(self._blocos_em_andamento.discard)
+
+    async def _executar(self, bloco: list[tuple[str, asyncio.Future[str]]]) -> None:
+        assert self._vagas is not None
+        executor = self._executor
+        try:
+            linhas = [(numero, linha) for numero, (linha, _) in enumerate(bloco, start=1)]
+            resultados = await asyncio.get_running_loop().run_in_executor(executor, processar_bloco, linhas)
+            self.blocos += 1
+            self.consultas_em_blocos += len(bloco)
+            for (_, futuro), resultado in zip(bloco, resultados):
+                if not futuro.done():
+                    futuro.set_result(resultado)
+        except Exception as e:
+            if isinstance(e, BrokenExecutor) and executor is self._executor:
+                # Um worker morreu: o pool não aceita mais tarefas, então
+                # troca por um novo (só o primeiro bloco que falhar troca)
+                self.falhas_pool += 1
+                self._executor = self._criar_executor()
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            for _, futuro in bloco:
+                if not futuro.done():
+                    futuro.set_exception(e)
+        finally:
+            self._vagas.release()
+
+    def metricas(self) -> dict[str, object]:
+        latencias = sorted(self.latencias)
+
+        def percentil(p: float) -> float | None:
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(p / 100 * len(latencias)))], 3)
+
+        return {
+            'consultas': self.consultas,
+            'erros': self.erros,
+            'falhas_pool': self.falhas_pool,
+            'blocos': self.blocos,
+            'consultas_por_bloco': self.consultas_em_blocos / self.blocos if self.blocos else 0.0,
+            'em_andamento': len(self._blocos_em_andamento),
+            'na_fila': self._fila.qsize() if self._fila is not None else 0,
+            'latencia_ms': {'p50': percentil(50), 'p90': percentil(90), 'p99': percentil(99)},
+            'processos': self.processos,
+            'no_ar_s': round(time.time() - self.inicio, 1),
+        }
+
+    async def _responder(self, caminho: str) -> tuple[HTTPStatus, str]:
+        url = urlsplit(caminho)
+        if url.path == '/rota':
+            parametros = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if 'origem' not in parametros or 'destino' not in parametros:
+                return HTTPStatus.BAD_REQUEST, json.dumps({'erro': 'informe origem e destino'}, ensure_ascii=False)
+            algoritmo = parametros.get('algoritmo', ALGORITMO_PADRAO)
+            inicio = time.perf_counter()
+            self.consultas += 1
+            try:
+                resultado = await self.rota(parametros['origem'], parametros['destino'], algoritmo)
+            except Exception as e:
+                # Falha no pool (worker morto, exceção na busca): a consulta não tem resultado
+                self.erros += 1
+                return HTTPStatus.INTERNAL_SERVER_ERROR, json.dumps(
+                    {'erro': f'falha ao calcular a rota: {type(e).__name__}: {e}'}, ensure_ascii=False)
+            self.latencias.append((time.perf_counter() - inicio) * 1000)
+            if 'erro' in json.loads(resultado):
+                self.erros += 1
+                return HTTPStatus.BAD_REQUEST, resultado
+            return HTTPStatus.OK, resultado
+        if url.path == '/algoritmos':
+            return HTTPStatus.OK, json.dumps(list(ALGORITMOS))
+        if url.path == '/saude':
+            return HTTPStatus.OK, json.dumps({'status': 'ok', 'nos': len(self.grafo), 'arestas': len(self.grafo.destinos)})
+        if url.path == '/metricas':
+            return HTTPStatus.OK, json.dumps(self.metricas())
+        return HTTPStatus.NOT_FOUND, json.dumps({'erro': f'{url.path} não existe'}, ensure_ascii=False)
+
+    async def atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """Uma conexão HTTP/1.1 (com keep-alive), só GET"""
+        try:
+            while True:
+                try:
+                    cabecalho = await leitor.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._enviar(escritor, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, '{}', fechar=True)
+                    break
+                linhas = cabecalho.decode('latin-1').split('\r\n')
+                partes = linhas[0].split()
+                if len(partes) != 3:
+                    await self._enviar(escritor, HTTPStatus.BAD_REQUEST, '{}', fechar=True)
+                    break
+                metodo, caminho, versao = partes
+                campos = {k.strip().lower(): v.strip() for k, _, v in (l.partition(':') for l in linhas[1:] if l)}
+                fechar = campos.get('connection', '').lower() == 'close' or versao == 'HTTP/1.0'
+
+                if metodo != 'GET':
+                    status, corpo = HTTPStatus.METHOD_NOT_ALLOWED, json.dumps({'erro': 'só GET'}, ensure_ascii=False)
+                else:
+                    status, corpo = await self._responder(caminho)
+                await self._enviar(escritor, status, corpo, fechar)
+                if fechar:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def _enviar(escritor: asyncio.StreamWriter, status: HTTPStatus, corpo: str, fechar: bool) -> None:
+        dados = corpo.encode('utf-8')
+        escritor.write(
+            f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            'Content-Type: application/json; charset=utf-8\r\n'
+            f'Content-Length: {len(dados)}\r\n'
+            f"Connection: {'close' if fechar else 'keep-alive'}\r\n\r\n".encode('latin-1') + dados)
+        await escritor.drain()
+
+
+async def servir(servico: ServicoRotas, host: str, porta: int) -> None:
+    servico.iniciar_pool()
+    servidor = await asyncio.start_server(servico.atender, host, porta, limit=LIMITE_CABECALHO)
+    print(f'Servindo {servico.grafo} em http://{host}:{porta} ({servico.processos} processos)')
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servico.encerrar()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serviço HTTP de rotas entre capitais')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('-p', '--processos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--grafo', help='grafo das capitais salvo por grafo_compilado.py (aberto com mmap)')
+    parser.add_argument('-b', '--tamanho-bloco', type=int, default=64,
+                        help='máximo de consultas mandadas juntas para um processo')
+    parser.add_argument('--janela', type=float, default=2.0,
+                        help='ms que uma consulta espera por outras para formar um bloco')
+    parser.add_argument('-c', '--cache', type=int, default=4096,
+                        help='rotas guardadas no cache de cada processo (0 desliga)')
+    args = parser.parse_args()
+
+    grafo = GrafoCompilado.abrir(args.grafo) if args.grafo else GrafoCompilado.compilar(get_graph())
+    servico = ServicoRotas(grafo, args.processos, args.tamanho_bloco, args.janela / 1000, args.cache)
+    try:
+        asyncio.run(servir(servico, args.host, args.porta))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
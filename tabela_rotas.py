@@ -0,0 +1,165 @@
+## Tabela de rotas pré-calculada
+## Roda Dijkstra a partir de todos os nós e guarda, para cada par (origem, destino),
+## o custo mínimo e o próximo nó do caminho. Depois disso uma consulta de rota
+## é só seguir os próximos saltos, sem busca nenhuma.
+##
+## uso: python tabela_rotas.py [arquivo]   (pré-calcula e salva a tabela)
+
+from __future__ import annotations
+import struct
+import sys
+import time
+from array import array
+
+from grafo_compilado import GrafoCompilado
+from main import EstatisticasBusca, MarcaCustos, create_mapa, dijkstra
+
+ARQUIVO_PADRAO = 'tabela_rotas.bin'
+
+# Cabeçalho: marca, versão do formato, typecode dos próximos saltos,
+# assinatura do grafo (sha256) e número de nós
+_MARCA = b'TROT'
+_VERSAO = 1
+_CABECALHO = struct.Struct('<4sHc32sI')
+
+SEM_ROTA = -1
+
+
+def _typecode_saltos(n: int) -> str:
+    """Menor tipo inteiro que guarda ids de 0 a n-1 e o SEM_ROTA"""
+    if n < 2 ** 7:
+        return 'b'
+    if n < 2 ** 15:
+        return 'h'
+    return 'i'
+
+
+class TabelaRotas():
+    """
+    Matrizes n x n (guardadas em arrays planos, linha = origem)
+
+    - distancias: custo mínimo de origem a destino (SEM_ROTA se não há caminho)
+    - proximos: id do nó seguinte à origem no caminho mínimo (SEM_ROTA se não há)
+    """
+
+    def __init__(self, n: int, assinatura: bytes, distancias: array[int], proximos: array[int]):
+        if len(distancias) != n * n or len(proximos) != n * n:
+            raise ValueError('Tamanho das matrizes não bate com o número de nós')
+        self.n: int = n
+        self.assinatura: bytes = assinatura
+        self.distancias: array[int] = distancias
+        self.proximos: array[int] = proximos
+        # Do grafo de onde a tabela foi calculada (None se aberta de arquivo)
+        self.marca_custos: MarcaCustos | None = None
+
+    @classmethod
+    def calcular(cls, grafo: GrafoCompilado) -> TabelaRotas:
+        n = len(grafo)
+        distancias = array('q', [SEM_ROTA]) * (n * n)
+        proximos = array(_typecode_saltos(n), [SEM_ROTA]) * (n * n)
+
+        for origem in range(n):
+            custos, pais, fechados = dijkstra(grafo, origem)
+            linha = origem * n
+            # Os nós saem fechados em ordem de custo, então o pai de cada nó
+            # já tem o próximo salto preenchido quando chegamos nele
+            for no in fechados:
+                distancias[linha + no] = custos[no]
+                pai = pais[no]
+                if pai is None:
+                    continue
+                proximos[linha + no] = no if pai == origem else proximos[linha + pai]
+
+        tabela = cls(n, grafo.assinatura(), distancias, proximos)
+        tabela.marca_custos = grafo.marca_custos
+        return tabela
+
+    def salvar(self, caminho: str) -> None:
+        with open(caminho, 'wb') as f:
+            f.write(_CABECALHO.pack(_MARCA, _VERSAO, self.proximos.typecode.encode(),
+                                    self.assinatura, self.n))
+            f.write(self.distancias.tobytes())
+            f.write(self.proximos.tobytes())
+
+    @classmethod
+    def carregar(cls, caminho: str, assinatura: bytes | None = None) -> TabelaRotas | None:
+        """
+        Lê a tabela do arquivo. Retorna None se o arquivo não existe, é de
+        outra versão do formato ou foi calculado para outro grafo
+        (assinatura diferente da informada)
+        """
+        try:
+            with open(caminho, 'rb') as f:
+                dados = f.read()
+        except FileNotFoundError:
+            return None
+
+        if len(dados) < _CABECALHO.size:
+            return None
+        marca, versao, typecode, assinatura_arquivo, n = _CABECALHO.unpack_from(dados)
+        if marca != _MARCA or versao != _VERSAO:
+            return None
+        if assinatura is not None and assinatura != assinatura_arquivo:
+            return None
+
+        distancias = array('q')
+        proximos = array(typecode.decode())
+        inicio = _CABECALHO.size
+        meio = inicio + n * n * distancias.itemsize
+        fim = meio + n * n * proximos.itemsize
+        if len(dados) != fim:
+            return None
+        distancias.frombytes(dados[inicio:meio])
+        proximos.frombytes(dados[meio:fim])
+        return cls(n, assinatura_arquivo, distancias, proximos)
+
+    @classmethod
+    def carregar_ou_calcular(cls, grafo: GrafoCompilado, caminho: str = ARQUIVO_PADRAO) -> TabelaRotas:
+        """Usa a tabela salva se ela for do mesmo grafo, senão recalcula e salva"""
+        tabela = cls.carregar(caminho, grafo.assinatura())
+        if tabela is None:
+            tabela = cls.calcular(grafo)
+            tabela.salvar(caminho)
+        tabela.marca_custos = grafo.marca_custos
+        return tabela
+
+    def custo(self, origem: int, destino: int) -> int | None:
+        """Custo mínimo (None se não há caminho); ValueError se o grafo mudou de custo depois do cálculo"""
+        if self.marca_custos is not None and self.marca_custos.desatualizado:
+            raise ValueError('Custos alterados depois do cálculo: calcule a tabela de novo')
+        d = self.distancias[origem * self.n + destino]
+        return None if d == SEM_ROTA else d
+
+    def rota(self, origem: int, destino: int,
+             estatisticas: EstatisticasBusca | None = None) -> tuple[list[int], int]:
+        """
+        Trajeto (em ids) e custo de origem a destino, seguindo os próximos
+        saltos: O(tamanho do trajeto). Trajeto vazio se não há caminho.
+        Não há busca, então nas estatisticas só o tempo é preenchido.
+        """
+        inicio = time.perf_counter() if estatisticas is not None else 0.0
+        custo = self.custo(origem, destino)
+        if custo is None:
+            trajeto: list[int] = []
+            custo = 0
+        else:
+            trajeto = [origem]
+            atual = origem
+            while atual != destino:
+                atual = self.proximos[atual * self.n + destino]
+                trajeto.append(atual)
+        if estatisticas is not None:
+            estatisticas.tempo = time.perf_counter() - inicio
+        return trajeto, custo
+
+
+def main() -> None:
+    caminho = sys.argv[1] if len(sys.argv) > 1 else ARQUIVO_PADRAO
+    grafo = GrafoCompilado.compilar(create_mapa())
+    tabela = TabelaRotas.calcular(grafo)
+    tabela.salvar(caminho)
+    print(f'Tabela de {tabela.n} nós salva em {caminho}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+## Grafos aleatórios do gerador e a referência (dijkstra) para comparar as buscas
+
+from __future__ import annotations
+import random
+from array import array
+from typing import Callable
+
+import pytest
+
+from gerador import GERADORES
+from grafo_compilado import GrafoCompilado
+from main import Vertice, dijkstra
+
+# (gerador, tamanho, seed): grades, grafos geométricos (às vezes desconexos),
+# malhas rodoviárias e malhas com mão única e custos diferentes em cada sentido
+GRAFOS = [(nome, 8 if nome == 'grade' else 150, seed)
+          for nome in [*GERADORES, 'direcionado'] for seed in range(3)]
+
+
+def direcionado(n: int, seed: int) -> GrafoCompilado:
+    """
+    Malha rodoviária dirigida: cada sentido de uma estrada custa entre 1 e 3
+    vezes o original (a distância aérea continua admissível) e 1 em cada 5
+    arestas vira mão única (a volta é removida)
+    """
+    base = GERADORES['rodoviario'](n, seed)
+    rnd = random.Random(seed)
+    offsets, destinos, pesos = array('i', [0]), array('i'), array('i')
+    for u in range(len(base)):
+        for v, custo in base.vizinhos(u):
+            if u < v or rnd.random() >= 0.2 or base.custo(v, u) is None:
+                destinos.append(v)
+                pesos.append(int(custo * rnd.uniform(1, 3)))
+        offsets.append(len(destinos))
+    return GrafoCompilado(base.nomes, offsets, destinos, pesos, base.coordenadas)
+
+
+@pytest.fixture(params=GRAFOS, ids=lambda p: f'{p[0]}-{p[1]}-{p[2]}')
+def grafo(request: pytest.FixtureRequest) -> GrafoCompilado:
+    nome, tamanho, seed = request.param
+    if nome == 'direcionado':
+        return direcionado(tamanho, seed)
+    return GERADORES[nome](tamanho, seed)
+
+
+@pytest.fixture
+def pares(grafo: GrafoCompilado) -> list[tuple[int, int]]:
+    """Pares (origem, destino) sorteados, incluindo um com origem igual ao destino"""
+    rnd = random.Random(len(grafo))
+    n = len(grafo)
+    return [(0, 0)] + [(rnd.randrange(n), rnd.randrange(n)) for _ in range(25)]
+
+
+@pytest.fixture
+def distancia(grafo: GrafoCompilado) -> Callable[[int, int], int | None]:
+    """Custo mínimo de origem a destino pelo dijkstra (None se não há caminho)"""
+    arvores: dict[int, dict[Vertice, int]] = {}
+
+    def calcular(origem: int, destino: int) -> int | None:
+        if origem not in arvores:
+            arvores[origem] = dijkstra(grafo, origem)[0]
+        return arvores[origem].get(destino)
+    return calcular
+
+
+def custo_trajeto(grafo: GrafoCompilado, trajeto: list[int]) -> int:
+    """Soma dos custos das arestas do trajeto (falha se alguma aresta não existe)"""
+    total = 0
+    for u, v in zip(trajeto, trajeto[1:]):
+        custo = grafo.custo(u, v)
+        assert custo is not None, f'aresta {u} -> {v} não existe'
+        total += custo
+    return total
+
+
+@pytest.fixture
+def conferir_rota(grafo: GrafoCompilado, distancia: Callable[[int, int], int | None]) -> Callable[[int, int, tuple[list[int], int]], None]:
+    """Confere uma resposta (trajeto, custo) contra o dijkstra"""
+    def conferir(origem: int, destino: int, resultado: tuple[list[int], int]) -> None:
+        trajeto, custo = resultado
+        esperado = distancia(origem, destino)
+        if esperado is None:
+            assert trajeto == []
+            return
+        assert trajeto[0] == origem and trajeto[-1] == destino
+        assert custo == esperado
+        assert custo_trajeto(grafo, trajeto) == custo
+    return conferir
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import main
+from gerador import GERADORES
+from grafo_compilado import GrafoCompilado
+from lote import responder
+from main import ALGORITMOS, LimiteExpansoesExcedido, a_star, create_mapa, ida_star
+
+
+def test_a_star_padrao_em_grafo_gerado(grafo, pares, conferir_rota):
+    # As heurísticas das capitais não valem nos grafos gerados: h = 0 e o a_star vira Dijkstra
+    for origem, destino in pares:
+        conferir_rota(origem, destino, a_star(grafo, origem, destino))
+
+
+def test_a_star_aerea_em_grafo_gerado(grafo, pares, conferir_rota):
+    for origem, destino in pares:
+        conferir_rota(origem, destino, ALGORITMOS['a_star_aerea'](grafo, origem, destino))
+
+
+def test_ida_star_desiste_no_limite_de_expansoes():
+    # Sem heurística numa grade o IDA* reexplora cada caminho alternativo
+    grafo = GERADORES['grade'](400, 0)
+    with pytest.raises(LimiteExpansoesExcedido):
+        ida_star(grafo, 0, len(grafo) - 1, lambda trajeto, destino: 0, limite_expansoes=10_000)
+
+
+def test_lote_responde_erro_quando_o_ida_star_desiste(monkeypatch):
+    monkeypatch.setattr(main, 'LIMITE_EXPANSOES_IDA', 1)
+    grafo = GrafoCompilado.compilar(create_mapa())
+    resposta = responder(grafo, json.dumps({'origem': 'AC', 'destino': 'RS', 'algoritmo': 'ida_star_aerea'}), 1)
+    assert resposta['linha'] == 1 and 'expandidos' in resposta['erro']
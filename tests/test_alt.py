@@ -0,0 +1,37 @@
+import random
+
+from alt import Landmarks
+from grafo_compilado import GrafoCompilado
+from main import a_star, create_mapa, dijkstra, ida_star
+
+
+def test_a_star_com_landmarks_igual_ao_dijkstra(grafo, pares, conferir_rota):
+    landmarks = Landmarks(grafo, k=4)
+    for origem, destino in pares:
+        conferir_rota(origem, destino, a_star(grafo, origem, destino, landmarks))
+
+
+def test_landmarks_admissivel_e_consistente(grafo):
+    landmarks = Landmarks(grafo, k=4)
+    for destino in range(0, len(grafo), max(1, len(grafo) // 10)):
+        # Só importam os nós que chegam em destino
+        ate_destino = dijkstra(grafo, destino, reverso=True)[0]
+        assert landmarks.estimativa(destino, destino) == 0
+        for u, d in ate_destino.items():
+            assert landmarks.estimativa(u, destino) <= d
+            for v, custo in grafo.vizinhos(u):
+                if v in ate_destino:
+                    assert landmarks.estimativa(u, destino) <= custo + landmarks.estimativa(v, destino)
+
+
+def test_ida_star_com_landmarks_nas_capitais():
+    # IDA* só corta ciclos do trajeto atual: nos grafos gerados, com muitos
+    # caminhos de custo parecido, reexpande demais, então fica nas capitais
+    grafo = GrafoCompilado.compilar(create_mapa())
+    landmarks = Landmarks(grafo, k=4)
+    rnd = random.Random(0)
+    for _ in range(30):
+        origem, destino = rnd.randrange(len(grafo)), rnd.randrange(len(grafo))
+        trajeto, custo = ida_star(grafo, origem, destino, landmarks)
+        assert trajeto[0] == origem and trajeto[-1] == destino
+        assert custo == dijkstra(grafo, origem)[0][destino]
@@ -0,0 +1,57 @@
+import random
+from itertools import islice
+
+import pytest
+
+from alternativas import rotas_alternativas
+from conftest import custo_trajeto, direcionado
+from gerador import GERADORES
+from grafo_compilado import GrafoCompilado
+
+
+def todos_os_caminhos(grafo: GrafoCompilado, origem: int, destino: int) -> list[tuple[tuple[int, ...], int]]:
+    """Força bruta: todos os caminhos sem ciclos de origem a destino, com o custo"""
+    caminhos = []
+    trajeto = [origem]
+
+    def descer(custo: int) -> None:
+        atual = trajeto[-1]
+        if atual == destino:
+            caminhos.append((tuple(trajeto), custo))
+            return
+        for conn, c in grafo.vizinhos(atual):
+            if conn not in trajeto:
+                trajeto.append(conn)
+                descer(custo + c)
+                trajeto.pop()
+    descer(0)
+    return caminhos
+
+
+def test_rotas_alternativas_em_ordem_e_sem_ciclos(grafo, pares, distancia):
+    for origem, destino in pares[:8]:
+        rotas = list(islice(rotas_alternativas(grafo, origem, destino), 6))
+        if distancia(origem, destino) is None:
+            assert rotas == []
+            continue
+        assert rotas[0][1] == distancia(origem, destino)
+        assert [c for _, c in rotas] == sorted(c for _, c in rotas)
+        assert len({tuple(t) for t, _ in rotas}) == len(rotas)
+        for trajeto, custo in rotas:
+            assert trajeto[0] == origem and trajeto[-1] == destino
+            assert len(set(trajeto)) == len(trajeto)
+            assert custo_trajeto(grafo, trajeto) == custo
+
+
+@pytest.mark.parametrize('nome', [*GERADORES, 'direcionado'])
+def test_rotas_alternativas_igual_a_forca_bruta(nome):
+    # Grafos pequenos o bastante para listar todos os caminhos
+    for seed in range(3):
+        grafo = direcionado(16, seed) if nome == 'direcionado' else GERADORES[nome](16, seed)
+        rnd = random.Random(seed)
+        for _ in range(5):
+            origem, destino = rnd.randrange(len(grafo)), rnd.randrange(len(grafo))
+            esperado = todos_os_caminhos(grafo, origem, destino)
+            rotas = [(tuple(t), c) for t, c in rotas_alternativas(grafo, origem, destino)]
+            assert sorted(rotas) == sorted(esperado)
+            assert [c for _, c in rotas] == sorted(c for _, c in esperado)
@@ -0,0 +1,38 @@
+from alt import Landmarks
+from gerador import DistanciaAerea, para_nodes
+from main import a_star_bidirecional, largura, largura_bidirecional
+
+
+def test_a_star_bidirecional_igual_ao_dijkstra(grafo, pares, conferir_rota):
+    for origem, destino in pares:
+        conferir_rota(origem, destino, a_star_bidirecional(grafo, origem, destino))
+
+
+def test_a_star_bidirecional_com_heuristica(grafo, pares, conferir_rota):
+    h = DistanciaAerea(grafo)
+    for origem, destino in pares:
+        conferir_rota(origem, destino, a_star_bidirecional(grafo, origem, destino, h))
+
+
+def test_a_star_bidirecional_com_landmarks(grafo, pares, conferir_rota):
+    # Landmarks não é simétrica nos grafos dirigidos: h(v, source) != h(source, v)
+    landmarks = Landmarks(grafo, k=4)
+    for origem, destino in pares:
+        conferir_rota(origem, destino, a_star_bidirecional(grafo, origem, destino, landmarks))
+
+
+def test_largura_bidirecional_menos_saltos(grafo, pares):
+    for origem, destino in pares:
+        trajeto, _ = largura_bidirecional(grafo, origem, destino)
+        esperado, _ = largura(grafo, origem, destino)
+        assert len(trajeto) == len(esperado)
+        if trajeto:
+            assert trajeto[0] == origem and trajeto[-1] == destino
+
+
+def test_a_star_bidirecional_na_lista_de_nodes(grafo, pares, distancia):
+    nos = para_nodes(grafo)
+    for origem, destino in pares:
+        trajeto, custo = a_star_bidirecional(nos, nos[origem], nos[destino])
+        esperado = distancia(origem, destino)
+        assert (custo if trajeto else None) == esperado
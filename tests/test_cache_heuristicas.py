@@ -0,0 +1,43 @@
+import functools
+import gc
+
+from gerador import GERADORES, DistanciaAerea
+from main import CacheHeuristicas, EstatisticasBusca, a_star
+
+
+def h_escalada(trajeto, destino, fator=1):
+    return 0
+
+
+def test_vetor_nao_conta_como_avaliacao_de_heuristica():
+    grafo = GERADORES['rodoviario'](150, 0)
+    h_func = DistanciaAerea(grafo)
+    heuristicas = CacheHeuristicas()
+    com_vetor, sem_vetor = EstatisticasBusca(), EstatisticasBusca()
+    a_star(grafo, 0, 100, h_func, estatisticas=com_vetor, heuristicas=heuristicas)
+    a_star(grafo, 0, 100, h_func, estatisticas=sem_vetor)
+    assert com_vetor.avaliacoes_heuristica == 0
+    assert sem_vetor.avaliacoes_heuristica == sem_vetor.gerados > 0
+
+
+def test_chave_pela_identidade_da_heuristica():
+    # Dois partial iguais são a mesma heurística, mesmo sendo objetos diferentes
+    grafo = GERADORES['grade'](16, 0)
+    heuristicas = CacheHeuristicas()
+    heuristicas.vetor(grafo, functools.partial(h_escalada, fator=2), 3)
+    heuristicas.vetor(grafo, functools.partial(h_escalada, fator=2), 3)
+    heuristicas.vetor(grafo, functools.partial(h_escalada, fator=3), 3)
+    assert (heuristicas.acertos, heuristicas.falhas) == (1, 2)
+
+
+def test_grafo_coletado_sai_do_cache():
+    heuristicas = CacheHeuristicas()
+    grafo = GERADORES['grade'](16, 0)
+    for destino in range(4):
+        heuristicas.vetor(grafo, h_escalada, destino)
+    outro = GERADORES['grade'](16, 1)
+    heuristicas.vetor(outro, h_escalada, 0)
+    assert len(heuristicas) == 5
+    del grafo
+    gc.collect()
+    assert len(heuristicas) == 1
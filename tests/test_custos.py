@@ -0,0 +1,105 @@
+## Quem guarda resultados calculados com os custos de um grafo de Nodes
+## tem de perceber alterar_custos(): caches, tabelas e landmarks
+
+import gc
+
+import pytest
+
+import main
+from alt import Landmarks
+from cache_rotas import CacheRotas
+from gerador import GERADORES, para_nodes
+from grafo_compilado import GrafoCompilado
+from hierarquias import HierarquiaContracao
+from main import CacheHeuristicas, a_star, alterar_custos, dijkstra
+from tabela_rotas import TabelaRotas
+
+
+def grade(seed=0):
+    return para_nodes(GERADORES['grade'](64, seed))
+
+
+def zero(trajeto, destino):
+    return 0
+
+
+def test_cache_de_rotas_so_descarta_o_grafo_alterado():
+    nos, outros = grade(0), grade(1)
+    compilado = GrafoCompilado.compilar(nos)
+    cache = CacheRotas()
+    for mapa, source, dest in [(nos, nos[0], nos[63]), (outros, outros[0], outros[63]), (compilado, 0, 63)]:
+        cache.buscar(a_star, mapa, source, dest, zero)
+    trajeto, _ = cache.buscar(a_star, nos, nos[0], nos[63], zero)
+
+    # Aresta mais barata no meio da rota: só a rota do grafo alterado pode mudar
+    u, v = trajeto[3], trajeto[4]
+    alterar_custos([(u, v, 1)])
+    assert len(cache) == 2
+    assert cache.buscar(a_star, nos, nos[0], nos[63], zero)[1] == dijkstra(nos, nos[0])[0][nos[63]]
+
+
+def test_aumento_so_descarta_rotas_que_passam_pela_aresta():
+    nos = grade()
+    cache = CacheRotas()
+    trajeto, _ = cache.buscar(a_star, nos, nos[0], nos[63], zero)
+    cache.buscar(a_star, nos, nos[0], nos[1], zero)
+    u, v = trajeto[-2], trajeto[-1]
+    alterar_custos([(u, v, u.get_cost(v) * 10)])
+    assert len(cache) == 1
+    assert cache.buscar(a_star, nos, nos[0], nos[63], zero)[1] == dijkstra(nos, nos[0])[0][nos[63]]
+
+
+def test_estruturas_pre_calculadas_ficam_desatualizadas():
+    nos = grade()
+    compilado = GrafoCompilado.compilar(nos)
+    hierarquia = HierarquiaContracao(nos)
+    hierarquia_compilada = HierarquiaContracao(compilado)
+    tabela = TabelaRotas.calcular(compilado)
+    outro = HierarquiaContracao(grade(1))
+    assert not compilado.desatualizado
+
+    u, (v, custo) = nos[5], nos[5].connections[0]
+    alterar_custos([(u, v, custo + 1)])
+    assert compilado.desatualizado
+    for consulta in (lambda: hierarquia.rota(nos[0], nos[63]), lambda: hierarquia_compilada.rota(0, 63),
+                     lambda: tabela.rota(0, 63)):
+        with pytest.raises(ValueError):
+            consulta()
+    # Estruturas de outro grafo, ou abertas de arquivo, não são afetadas
+    outro.rota(outro._nos[0], outro._nos[63])
+    assert not GERADORES['grade'](64, 0).desatualizado
+
+
+def test_landmarks_recalculados_depois_de_reducao():
+    nos = grade()
+    landmarks = Landmarks(nos, k=4)
+    trajeto, _ = a_star(nos, nos[0], nos[63], zero)
+    alterar_custos([(u, v, 1) for u, v in zip(trajeto, trajeto[1:])])
+    distancias = dijkstra(nos, nos[63], reverso=True)[0]
+    # Sem recalcular, o limite inferior antigo passaria do custo novo
+    assert all(landmarks([no], nos[63]) <= distancias[no] for no in nos)
+    assert a_star(nos, nos[0], nos[63], landmarks)[1] == distancias[nos[0]]
+
+
+def test_cache_de_heuristicas_so_descarta_vetores_da_lista_de_nos():
+    nos = grade()
+    compilado = GERADORES['grade'](64, 0)
+    heuristicas = CacheHeuristicas()
+    heuristicas.vetor(nos, Landmarks(nos), nos[63])
+    heuristicas.vetor(compilado, Landmarks(compilado), 63)
+    heuristicas.vetor(nos, zero, nos[63])
+    u, (v, custo) = nos[5], nos[5].connections[0]
+    alterar_custos([(u, v, custo + 1)])
+    assert len(heuristicas) == 3
+    alterar_custos([(u, v, 1)])
+    assert len(heuristicas) == 2
+
+
+def test_ouvintes_nao_seguram_quem_nao_e_mais_usado():
+    gc.collect()
+    antes = len(main.ouvintes_custos)
+    cache = CacheRotas()
+    assert len(main.ouvintes_custos) == antes + 1
+    del cache
+    gc.collect()
+    assert len(main.ouvintes_custos) == antes
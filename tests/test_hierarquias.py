@@ -0,0 +1,23 @@
+from gerador import para_nodes
+from hierarquias import HierarquiaContracao
+from main import EstatisticasBusca
+
+
+def test_hierarquia_igual_ao_dijkstra(grafo, pares, conferir_rota):
+    hierarquia = HierarquiaContracao(grafo)
+    for origem, destino in pares:
+        estatisticas = EstatisticasBusca()
+        conferir_rota(origem, destino, hierarquia.rota(origem, destino, estatisticas))
+        # Cada busca sobe a hierarquia expandindo ao menos a própria ponta
+        assert estatisticas.expandidos >= (origem != destino)
+        assert estatisticas.pico_fronteira <= estatisticas.gerados + 2
+
+
+def test_hierarquia_na_lista_de_nodes(grafo, pares, distancia):
+    nos = para_nodes(grafo)
+    hierarquia = HierarquiaContracao(nos)
+    for origem, destino in pares:
+        trajeto, custo = hierarquia.rota(nos[origem], nos[destino])
+        assert (custo if trajeto else None) == distancia(origem, destino)
+        if trajeto:
+            assert trajeto[0] is nos[origem] and trajeto[-1] is nos[destino]
@@ -0,0 +1,21 @@
+import json
+
+from grafo_compilado import GrafoCompilado
+from lote import responder
+from main import create_mapa
+
+
+def test_lote_resolve_os_nomes_pelo_grafo_carregado():
+    # Os ids de um grafo salvo em outra ordem não são os índices do REGISTRO
+    capitais = GrafoCompilado.compilar(create_mapa())
+    invertido = GrafoCompilado.compilar(list(reversed(create_mapa())))
+    assert invertido.nomes != capitais.nomes
+    for origem, destino in [('AC', 'RS'), ('Porto Alegre', 'Manaus'), ('sp', 'Palmas')]:
+        linha = json.dumps({'origem': origem, 'destino': destino, 'algoritmo': 'a_star_aerea'})
+        assert responder(invertido, linha, 1) == responder(capitais, linha, 1)
+
+
+def test_lote_erro_para_cidade_fora_do_grafo():
+    grafo = GrafoCompilado.compilar(create_mapa())
+    resposta = responder(grafo, json.dumps({'origem': 'Campinas', 'destino': 'AC'}), 7)
+    assert resposta == {'linha': 7, 'erro': 'Cidade Campinas não encontrada'}
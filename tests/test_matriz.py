@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from gerador import para_nodes
+from main import dijkstra
+from matriz import SEM_ROTA, matriz_distancias
+
+
+def sortear(grafo, quantidade, seed):
+    rnd = random.Random(seed)
+    return [rnd.randrange(len(grafo)) for _ in range(quantidade)]
+
+
+# (origens, destinos): mais origens que destinos faz as árvores saírem dos destinos (reverso)
+@pytest.mark.parametrize('tamanhos', [(4, 9), (9, 4), (1, 1)])
+def test_matriz_igual_ao_dijkstra(grafo, tamanhos, conferir_rota):
+    origens = sortear(grafo, tamanhos[0], 1)
+    destinos = sortear(grafo, tamanhos[1], 2)
+    matriz = matriz_distancias(grafo, origens, destinos, rotas=True)
+    assert matriz.reverso == (len(destinos) < len(origens))
+    for i, origem in enumerate(origens):
+        custos = dijkstra(grafo, origem)[0]
+        for j, destino in enumerate(destinos):
+            esperado = custos.get(destino)
+            assert matriz.custos[i, j] == (SEM_ROTA if esperado is None else esperado)
+            conferir_rota(origem, destino, matriz.rota(i, j))
+
+
+def test_matriz_na_lista_de_nodes(grafo, distancia):
+    nos = para_nodes(grafo)
+    origens, destinos = sortear(grafo, 6, 3), sortear(grafo, 3, 4)
+    matriz = matriz_distancias(nos, [nos[o] for o in origens], [nos[d] for d in destinos], rotas=True)
+    for i, origem in enumerate(origens):
+        for j, destino in enumerate(destinos):
+            assert matriz.custo(i, j) == distancia(origem, destino)
+            trajeto, _ = matriz.rota(i, j)
+            if trajeto:
+                assert trajeto[0] is nos[origem] and trajeto[-1] is nos[destino]
+
+
+def test_matriz_em_processos(grafo):
+    origens, destinos = sortear(grafo, 40, 5), sortear(grafo, 50, 6)
+    sozinho = matriz_distancias(grafo, origens, destinos, rotas=True)
+    dividido = matriz_distancias(grafo, origens, destinos, rotas=True, processos=2, tamanho_bloco=8)
+    assert (sozinho.custos == dividido.custos).all()
+    assert (sozinho.pais == dividido.pais).all()
@@ -0,0 +1,39 @@
+from gerador import para_nodes
+from main import get_graph
+from pareto import fronteira_pareto
+
+
+def conferir_fronteira(rotas, origem, destino, menor_custo):
+    if menor_custo is None:
+        assert rotas == []
+        return
+    assert rotas[0][1] == menor_custo
+    for trajeto, custo, beleza in rotas:
+        assert trajeto[0] == origem and trajeto[-1] == destino
+        for _, outro_custo, outra_beleza in rotas:
+            dominada = outro_custo <= custo and outra_beleza >= beleza and (outro_custo, outra_beleza) != (custo, beleza)
+            assert not dominada, f'({custo}, {beleza}) dominada por ({outro_custo}, {outra_beleza})'
+
+
+def test_fronteira_sem_rotas_dominadas(grafo, pares, distancia):
+    for origem, destino in pares[:10]:
+        rotas = fronteira_pareto(grafo, origem, destino, beleza=lambda no: no % 11)
+        conferir_fronteira(rotas, origem, destino, distancia(origem, destino))
+        for trajeto, _, beleza in rotas:
+            assert beleza == sum(no % 11 for no in trajeto)
+
+
+def test_fronteira_nas_capitais():
+    mapa = get_graph()
+    for source in mapa:
+        for dest in mapa:
+            rotas = fronteira_pareto(mapa, source, dest)
+            conferir_fronteira(rotas, source, dest, rotas[0][1] if rotas else None)
+
+
+def test_fronteira_na_lista_de_nodes(grafo, pares, distancia):
+    nos = para_nodes(grafo)
+    ids = {no: i for i, no in enumerate(nos)}
+    for origem, destino in pares[:5]:
+        rotas = fronteira_pareto(nos, nos[origem], nos[destino], beleza=lambda no: ids[no] % 11)
+        conferir_fronteira(rotas, nos[origem], nos[destino], distancia(origem, destino))
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from gerador import para_nodes
+from main import alterar_custos, dijkstra
+from replanejamento import PlanejadorLPA
+
+
+def alterar_ao_acaso(nos, rnd, quantidade):
+    """Lote de alterações: custos novos entre 1 e 3 vezes o atual (sobe ou desce)"""
+    arestas = [(u, v) for u in nos for v, _ in u.connections]
+    lote = []
+    for u, v in rnd.sample(arestas, min(quantidade, len(arestas))):
+        lote.append((u, v, rnd.randint(1, 3 * u.get_cost(v))))
+    return alterar_custos(lote)
+
+
+def test_lpa_igual_ao_dijkstra_depois_de_alterar_custos(grafo, pares):
+    nos = para_nodes(grafo)
+    rnd = random.Random(len(grafo))
+    planejadores = [PlanejadorLPA(nos, nos[o], nos[d]) for o, d in pares[:6]]
+    for rodada in range(6):
+        if rodada:
+            alterar_ao_acaso(nos, rnd, 1 if rodada % 2 else 20)
+        for planejador in planejadores:
+            trajeto, custo = planejador.rota()
+            esperado = dijkstra(nos, planejador.source)[0].get(planejador.dest)
+            if esperado is None:
+                assert trajeto == []
+                continue
+            assert custo == esperado
+            assert trajeto[0] is planejador.source and trajeto[-1] is planejador.dest
+            assert sum(u.get_cost(v) for u, v in zip(trajeto, trajeto[1:])) == custo
+
+
+def test_alterar_custos_rejeita_custo_nao_positivo(grafo):
+    nos = para_nodes(grafo)
+    u = next(no for no in nos if len(no.connections) >= 2)
+    (v, custo_v), (w, custo_w) = u.connections[:2]
+    with pytest.raises(ValueError):
+        alterar_custos([(u, v, custo_v + 1), (u, w, 0)])
+    # O lote é conferido antes: nada foi aplicado
+    assert (u.get_cost(v), u.get_cost(w)) == (custo_v, custo_w)
@@ -0,0 +1,36 @@
+## Estado dos processos de um pool de buscas
+## O grafo compilado (e um cache de rotas) vão uma vez só para cada processo,
+## pelo initializer do pool, em vez de irem junto com cada tarefa. Usado pelo
+## modo em lote, pelo serviço de rotas e pela matriz de distâncias.
+##
+##   ProcessPoolExecutor(initializer=worker.iniciar, initargs=(grafo, tamanho_cache))
+##   ...
+##   def tarefa(...):          # roda no processo
+##       grafo = worker.grafo()
+
+from __future__ import annotations
+
+from cache_rotas import CacheRotas
+from grafo_compilado import GrafoCompilado
+
+# Grafo e cache do processo, montados uma vez só por processo em iniciar
+_grafo: GrafoCompilado | None = None
+_cache: CacheRotas | None = None
+
+
+def iniciar(grafo: GrafoCompilado, tamanho_cache: int = 0) -> None:
+    """Initializer do pool (também serve para rodar as tarefas no próprio processo)"""
+    global _grafo, _cache
+    _grafo = grafo
+    _cache = CacheRotas(tamanho_cache) if tamanho_cache > 0 else None
+
+
+def grafo() -> GrafoCompilado:
+    if _grafo is None:
+        raise RuntimeError('processo sem grafo (worker.iniciar não foi chamado)')
+    return _grafo
+
+
+def cache() -> CacheRotas | None:
+    """Cache de rotas do processo (None se desligado)"""
+    return _cache